@@ -153,6 +153,35 @@ class SpeedConfig(BaseModel):
     battery_drain_rate: float = 0.02
 
 
+class PerceptionModeConfig(BaseModel):
+    """Detector limits for one perception mode."""
+
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = True
+    max_imgsz: int = 960
+    tiled: bool = False
+    cadence_multiplier: int = 1
+
+
+class PerceptionConfig(BaseModel):
+    """Perception modes selected from mission phase and altitude.
+
+    ``ground`` applies on the pad and below ``ground_alt_m``; ``critical`` during takeoff,
+    transitions, landing, RTL and aborts; ``high_altitude`` in cruise at or above
+    ``high_altitude_m``; ``cruise`` otherwise.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    ground_alt_m: float = 2.0
+    high_altitude_m: float = 45.0
+    ground: PerceptionModeConfig = PerceptionModeConfig(max_imgsz=512, cadence_multiplier=8)
+    critical: PerceptionModeConfig = PerceptionModeConfig(max_imgsz=640, cadence_multiplier=2)
+    cruise: PerceptionModeConfig = PerceptionModeConfig()
+    high_altitude: PerceptionModeConfig = PerceptionModeConfig(tiled=True)
+
+
 # ---------------------------------------------------------------------------
 # Top-level profile
 # ---------------------------------------------------------------------------
@@ -172,6 +201,7 @@ class AirframeProfile(BaseModel):
     recovery: RecoveryConfig = RecoveryConfig()
     timing: TimingConfig = TimingConfig()
     speeds: SpeedConfig = SpeedConfig()
+    perception: PerceptionConfig = PerceptionConfig()
 
     @property
     def is_vtol(self) -> bool:
@@ -263,6 +293,22 @@ class AirframeProfile(BaseModel):
                 "sensor inconsistency thresholds must be > 0"
             )
 
+        perception_modes = (
+            self.perception.ground,
+            self.perception.critical,
+            self.perception.cruise,
+            self.perception.high_altitude,
+        )
+        if any(mode.cadence_multiplier < 1 or mode.max_imgsz < 32 for mode in perception_modes):
+            errors.append(
+                "perception cadence_multiplier must be >= 1 and max_imgsz >= 32"
+            )
+        if self.perception.ground_alt_m >= self.perception.high_altitude_m:
+            errors.append(
+                f"perception ground_alt({self.perception.ground_alt_m}m) "
+                f"must be < high_altitude({self.perception.high_altitude_m}m)"
+            )
+
         if errors:
             raise ValueError(
                 f"Airframe profile '{self.name}' has physical consistency errors:\n"
@@ -1 +1,8 @@
 """Arrakis core package."""
+import sys
+
+from config import REPO_ROOT
+
+# Root-level inference helpers (inference_core, object_tracker) are shared with the frontend and realtime runner.
+if str(REPO_ROOT) not in sys.path:
+    sys.path.append(str(REPO_ROOT))
@@ -59,7 +59,7 @@ class ArrakisController:
                 message=str(exc),
             )
             logger.exception("Adapter connect failed during controller initialization: %s", exc)
-        self.video_service = VideoService()
+        self.video_service = VideoService(profile.perception)
         self.telemetry_hub = TelemetryHub(self.adapter.get_snapshot(), self.video_service, profile)
         self.state_payload_assembler = StatePayloadAssembler(self.video_service)
         self.transition_diagnostics = TransitionDiagnosticsTracker()
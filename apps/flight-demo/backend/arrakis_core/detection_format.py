@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+
+from inference_core import Detections, columnar_detections
+from schemas import BoxPrecision, DetectionBox, DetectorState, StatePayload
+
+
+DETECTION_LABELS = ("person", "vehicle")
+_LABEL_TABLE = np.array(DETECTION_LABELS, dtype=object)
+_LABEL_IDS = {label: index for index, label in enumerate(DETECTION_LABELS)}
+
+
+def detections_from_boxes(boxes: list[DetectionBox]) -> Detections:
+    """Normalized DetectionBox models as parallel arrays; track ids are kept only if every box has one."""
+    track_ids = [box.track_id for box in boxes]
+    return Detections(
+        boxes=np.array([(box.x1, box.y1, box.x2, box.y2) for box in boxes], dtype=np.float32).reshape(-1, 4),
+        scores=np.array([box.confidence for box in boxes], dtype=np.float32),
+        class_ids=np.array([_LABEL_IDS[box.label] for box in boxes], dtype=np.int32),
+        names=_LABEL_TABLE,
+        track_ids=np.array(track_ids, dtype=np.int64) if boxes and None not in track_ids else None,
+    )
+
+
+def boxes_from_detections(detections: Detections) -> list[DetectionBox]:
+    boxes = np.clip(detections.boxes, 0.0, 1.0).tolist()
+    track_ids = [None] * len(detections) if detections.track_ids is None else detections.track_ids.tolist()
+    return [
+        DetectionBox(label=DETECTION_LABELS[class_id], confidence=score, x1=x1, y1=y1, x2=x2, y2=y2, track_id=track_id)
+        for (x1, y1, x2, y2), score, class_id, track_id in zip(
+            boxes, detections.scores.tolist(), detections.class_ids.tolist(), track_ids
+        )
+    ]
+
+
+def columnar_detector_state(state: DetectorState, precision: BoxPrecision = "f32") -> DetectorState:
+    """Move `current_detections` into parallel arrays; boxes stay normalized to the frame."""
+    columnar = columnar_detections(detections_from_boxes(state.current_detections), width=1, height=1, precision=precision)
+    return state.model_copy(update={"current_detections": [], "detections_columnar": columnar})
+
+
+def columnar_state_payload(payload: StatePayload, precision: BoxPrecision = "f32") -> StatePayload:
+    return payload.model_copy(update={"detector": columnar_detector_state(payload.detector, precision)})
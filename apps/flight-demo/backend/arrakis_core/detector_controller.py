@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+
+from airframe_profile import PerceptionConfig, PerceptionModeConfig
+from schemas import DetectorControllerState, MissionPhase
+
+
+logger = logging.getLogger("arrakis.detector.controller")
+
+# Weight of the newest sample in the latency averages.
+EWMA_ALPHA = 0.3
+# Consecutive over-budget inferences before stepping down to a cheaper level.
+STEP_DOWN_AFTER = 3
+# Consecutive inferences with headroom before stepping up to a richer level.
+STEP_UP_AFTER = 10
+# Step up only while the richer level's estimated latency stays under this fraction of the budget.
+STEP_UP_HEADROOM = 0.8
+# Rough cost of a tiled pass relative to a plain pass at the same imgsz.
+TILED_COST = 3.0
+
+GROUND_PHASES = frozenset({"IDLE", "STARTING", "ARMING", "COMPLETE"})
+CRUISE_PHASES = frozenset({"OUTBOUND", "RETURN"})
+
+
+@dataclass(frozen=True)
+class DetectorLevel:
+    """One rung of the controller's ladder, from richest (index 0) to cheapest."""
+
+    imgsz: int
+    tiled: bool
+    cadence: int
+    tracked_cadence: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.imgsz}{'-tiled' if self.tiled else ''}"
+
+    @property
+    def cost(self) -> float:
+        return (self.imgsz / 960) ** 2 * (TILED_COST if self.tiled else 1.0)
+
+
+PLAIN_LEVELS = (
+    DetectorLevel(imgsz=960, tiled=False, cadence=2, tracked_cadence=3),
+    DetectorLevel(imgsz=768, tiled=False, cadence=3, tracked_cadence=5),
+    DetectorLevel(imgsz=640, tiled=False, cadence=3, tracked_cadence=6),
+    DetectorLevel(imgsz=512, tiled=False, cadence=4, tracked_cadence=8),
+)
+TILED_LEVEL = DetectorLevel(imgsz=960, tiled=True, cadence=2, tracked_cadence=3)
+
+
+def detector_levels(tiling: bool) -> tuple[DetectorLevel, ...]:
+    return (TILED_LEVEL, *PLAIN_LEVELS) if tiling else PLAIN_LEVELS
+
+
+def select_perception_mode(config: PerceptionConfig, phase: MissionPhase, alt_m: float) -> str:
+    """Name of the `PerceptionConfig` mode that applies to this phase and altitude."""
+    if phase in GROUND_PHASES or alt_m < config.ground_alt_m:
+        return "ground"
+    if phase not in CRUISE_PHASES:
+        return "critical"
+    return "high_altitude" if alt_m >= config.high_altitude_m else "cruise"
+
+
+class LatencyController:
+    """Steps the detector's imgsz, tiling and cadence to hold capture-to-result latency under a budget.
+
+    `observe` takes each inference's queue age and inference time. The controller steps down after
+    `STEP_DOWN_AFTER` consecutive over-budget samples and back up only after `STEP_UP_AFTER` samples
+    whose latency, scaled to the richer level's estimated cost, would still fit the budget with headroom.
+    The simulator degrade step sets a floor: each step rules out one more of the richest levels.
+    The perception mode sets a ceiling: levels above its imgsz, or tiled ones it does not allow, are skipped.
+    """
+
+    def __init__(self, budget_ms: float, tiling: bool, tracking: bool) -> None:
+        self._budget_ms = budget_ms
+        self._levels = detector_levels(tiling)
+        self._tracking = tracking
+        self._index = 0
+        self._floor = 0
+        self._ceiling = 0
+        self._changes = 0
+        self._last_change: str | None = None
+        self._last_change_at: float | None = None
+        self.reset_measurements()
+
+    def reset_measurements(self) -> None:
+        self._latency_ms: float | None = None
+        self._inference_ms: float | None = None
+        self._queue_age_ms: float | None = None
+        self._over = 0
+        self._under = 0
+
+    @property
+    def level(self) -> DetectorLevel:
+        return self._levels[self._index]
+
+    @property
+    def cadence(self) -> int:
+        return self.level.tracked_cadence if self._tracking else self.level.cadence
+
+    def set_floor(self, degrade_step: int) -> bool:
+        """Apply the simulator degrade step; returns whether the floor changed."""
+        # The tiled rung sits above the ladder's plain 960 rung, so degrade steps count from the plain rungs.
+        offset = len(self._levels) - len(PLAIN_LEVELS)
+        floor = min(degrade_step + offset if degrade_step > 0 else 0, len(self._levels) - 1)
+        if floor == self._floor:
+            return False
+        self._floor = floor
+        if self._index < floor:
+            self._step(floor, f"simulator degrade step {degrade_step}")
+        return True
+
+    def start_at(self, imgsz: int, tiled: bool) -> None:
+        """Begin at the richest level no richer than a profiled operating point; `observe` adapts from there."""
+        index = next(
+            (index for index, level in enumerate(self._levels) if level.imgsz <= imgsz and (tiled or not level.tiled)),
+            len(self._levels) - 1,
+        )
+        self._index = max(index, self._floor, self._ceiling)
+
+    def set_ceiling(self, name: str, mode: PerceptionModeConfig) -> bool:
+        """Apply a perception mode's imgsz and tiling limits; returns whether the ceiling changed."""
+        allowed = [
+            index
+            for index, level in enumerate(self._levels)
+            if level.imgsz <= mode.max_imgsz and (mode.tiled or not level.tiled)
+        ]
+        ceiling = allowed[0] if allowed else len(self._levels) - 1
+        if ceiling == self._ceiling:
+            return False
+        self._ceiling = ceiling
+        if self._index < ceiling:
+            self._step(ceiling, f"{name} perception mode")
+        return True
+
+    def observe(self, inference_ms: float, queue_age_ms: float) -> None:
+        self._inference_ms = _ewma(self._inference_ms, inference_ms)
+        self._queue_age_ms = _ewma(self._queue_age_ms, queue_age_ms)
+        self._latency_ms = _ewma(self._latency_ms, inference_ms + queue_age_ms)
+
+        if self._latency_ms > self._budget_ms:
+            self._over += 1
+            self._under = 0
+        elif self._index > max(self._floor, self._ceiling) and self._latency_ms * self._cost_ratio(self._index - 1) < STEP_UP_HEADROOM * self._budget_ms:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= STEP_DOWN_AFTER and self._index < len(self._levels) - 1:
+            self._step(self._index + 1, f"latency {self._latency_ms:.0f}ms over {self._budget_ms:.0f}ms budget")
+        elif self._under >= STEP_UP_AFTER:
+            self._step(self._index - 1, f"latency {self._latency_ms:.0f}ms leaves headroom under {self._budget_ms:.0f}ms budget")
+
+    def state(self) -> DetectorControllerState:
+        level = self.level
+        return DetectorControllerState(
+            level=level.name,
+            level_index=self._index,
+            level_count=len(self._levels),
+            floor_index=self._floor,
+            ceiling_index=self._ceiling,
+            imgsz=level.imgsz,
+            tiled=level.tiled,
+            cadence=self.cadence,
+            budget_ms=self._budget_ms,
+            latency_ms=self._latency_ms or 0.0,
+            inference_ms=self._inference_ms or 0.0,
+            queue_age_ms=self._queue_age_ms or 0.0,
+            changes=self._changes,
+            last_change=self._last_change,
+            last_change_at=self._last_change_at,
+        )
+
+    def _cost_ratio(self, index: int) -> float:
+        return self._levels[index].cost / self.level.cost
+
+    def _step(self, index: int, reason: str) -> None:
+        previous = self.level
+        self._index = index
+        self._changes += 1
+        self._last_change = f"{previous.name} -> {self.level.name}: {reason}"
+        self._last_change_at = time.time()
+        logger.info("Detector level %s", self._last_change)
+        # Samples taken at the previous level say little about the new one.
+        self.reset_measurements()
+
+
+def _ewma(current: float | None, sample: float) -> float:
+    return sample if current is None else current + EWMA_ALPHA * (sample - current)
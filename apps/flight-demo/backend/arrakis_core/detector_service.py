@@ -5,17 +5,36 @@ import queue
 import threading
 import time
 from dataclasses import dataclass, field
-
-from config import DEFAULT_MODEL_CANDIDATES
-from schemas import DetectionBox, DetectorEvent
-
-from .perception_backends.base import InferenceResult, PerceptionBackend, resolve_model_path
+from pathlib import Path
+
+from airframe_profile import PerceptionConfig
+from config import (
+    DEFAULT_MODEL_CANDIDATES,
+    DETECTOR_FRAME_BUDGET_MS,
+    DETECTOR_PROFILE_PATH,
+    DETECTOR_RUNTIME,
+    DETECTOR_TILE_SIZE,
+    DETECTOR_TRACKING,
+)
+from deployment_profile import choose_operating_point, load_operating_points
+from object_tracker import BoxTracker
+from schemas import DetectionBox, DetectorControllerState, DetectorEvent, MissionPhase
+
+from .detection_format import boxes_from_detections, detections_from_boxes
+from .detector_controller import LatencyController, select_perception_mode
+from .perception_backends.base import InferenceResult, InferenceSettings, PerceptionBackend, resolve_model_path
+from .perception_backends.exported_backend import ExportedYoloPerceptionBackend
 from .perception_backends.synthetic_backend import SyntheticPerceptionBackend
 from .perception_backends.yolo_backend import YoloPerceptionBackend
 
 
 logger = logging.getLogger("arrakis.detector")
 
+# Frames between inferences, indexed by whether the degrade ladder is engaged, when the latency
+# controller is off. The tracker carries boxes across the skipped frames, so it can afford a sparser cadence.
+INFER_CADENCE = (2, 3)
+TRACKED_INFER_CADENCE = (3, 5)
+
 
 @dataclass
 class DetectorRuntime:
@@ -25,13 +44,27 @@ class DetectorRuntime:
     current_detections: list[DetectionBox] = field(default_factory=list)
     recent_events: list[DetectorEvent] = field(default_factory=list)
     degrade_step: int = 0
+    controller: DetectorControllerState | None = None
+    perception_mode: str = "cruise"
 
 
 class DetectorService:
-    def __init__(self) -> None:
+    def __init__(self, perception: PerceptionConfig | None = None) -> None:
         self.runtime = DetectorRuntime()
+        # Until flight context arrives the detector runs in cruise mode.
+        self._perception = perception or PerceptionConfig()
         self._queue: queue.Queue = queue.Queue(maxsize=1)
         self._lock = threading.Lock()
+        self._tracker = BoxTracker() if DETECTOR_TRACKING else None
+        self._controller = (
+            LatencyController(DETECTOR_FRAME_BUDGET_MS, tiling=DETECTOR_TILE_SIZE > 0, tracking=self._tracker is not None)
+            if DETECTOR_FRAME_BUDGET_MS > 0
+            else None
+        )
+        if self._controller is not None:
+            self._controller.set_ceiling(self.runtime.perception_mode, self._perception.cruise)
+            self._start_from_profile(self._controller)
+            self.runtime.controller = self._controller.state()
         self._fallback_backend = SyntheticPerceptionBackend()
         self._active_backend = self._create_backend()
         self.runtime.mode = self._active_backend.mode
@@ -50,12 +83,46 @@ class DetectorService:
                 except queue.Empty:
                     break
 
+    def swap_model(self, model_path: Path, allowed_dirs: list[Path] | None = None) -> str:
+        """Load a new YOLO checkpoint and atomically replace the active backend with it.
+
+        The detector loop keeps running on the previous backend while the new one loads. With
+        `allowed_dirs`, only checkpoints inside one of them are accepted.
+        """
+        model_path = model_path.resolve()
+        if allowed_dirs is not None and not any(model_path.is_relative_to(directory) for directory in allowed_dirs):
+            raise PermissionError(f"{model_path} is outside the registerable model directories")
+        if not model_path.exists():
+            raise FileNotFoundError(f"Detector model not found: {model_path}")
+        if model_path.suffix != ".pt":
+            raise ValueError(f"Unsupported detector model format: {model_path.suffix or model_path.name}")
+        logger.info("Hot swapping detector model -> %s", model_path)
+        backend = self._create_yolo_backend(model_path)
+        with self._lock:
+            previous = self._active_backend.mode
+            self._active_backend = backend
+            self.runtime.mode = backend.mode
+            if self._controller is not None:
+                self._controller.reset_measurements()
+        logger.info("Detector backend swapped %s -> %s", previous, backend.mode)
+        return backend.mode
+
     def set_degrade_step(self, step: int) -> None:
         with self._lock:
             if self.runtime.degrade_step != step:
                 logger.info("Detector degrade step %d -> %d", self.runtime.degrade_step, step)
             self.runtime.degrade_step = step
 
+    def set_flight_context(self, phase: MissionPhase, alt_m: float) -> None:
+        mode_name = select_perception_mode(self._perception, phase, alt_m)
+        with self._lock:
+            if mode_name == self.runtime.perception_mode:
+                return
+            logger.info("Detector perception mode %s -> %s (phase=%s alt=%.1fm)", self.runtime.perception_mode, mode_name, phase, alt_m)
+            self.runtime.perception_mode = mode_name
+            if self._controller is not None and self._controller.set_ceiling(mode_name, getattr(self._perception, mode_name)):
+                self.runtime.controller = self._controller.state()
+
     def export(self) -> DetectorRuntime:
         with self._lock:
             return DetectorRuntime(
@@ -65,6 +132,8 @@ class DetectorService:
                 current_detections=list(self.runtime.current_detections),
                 recent_events=list(self.runtime.recent_events),
                 degrade_step=self.runtime.degrade_step,
+                controller=self.runtime.controller,
+                perception_mode=self.runtime.perception_mode,
             )
 
     def clear(self) -> None:
@@ -72,20 +141,45 @@ class DetectorService:
             self.runtime.last_inference_ms = 0.0
             self.runtime.current_detections = []
             self.runtime.recent_events = []
+            if self._tracker is not None:
+                self._tracker.reset()
         logger.info("Detector runtime cleared")
 
     def _loop(self) -> None:
         frame_count = 0
+        was_enabled = True
         while True:
             frame, metadata, submitted_at = self._queue.get()
             frame_count += 1
-            degrade = self.export().degrade_step
-            cadence = 2 if degrade == 0 else 3
-            if frame_count % cadence != 0:
+            with self._lock:
+                degrade = self.runtime.degrade_step
+                mode = getattr(self._perception, self.runtime.perception_mode)
+                if self._controller is not None:
+                    if self._controller.set_floor(degrade):
+                        self.runtime.controller = self._controller.state()
+                    level, cadence = self._controller.level, self._controller.cadence
+                    settings = InferenceSettings(imgsz=level.imgsz, tiled=level.tiled)
+                else:
+                    cadence = (INFER_CADENCE if self._tracker is None else TRACKED_INFER_CADENCE)[degrade > 0]
+                    settings = InferenceSettings(imgsz=min(960 if degrade == 0 else 768, mode.max_imgsz), tiled=degrade == 0 and mode.tiled)
+            if not mode.enabled:
+                with self._lock:
+                    self.runtime.current_detections = []
+                    # Tracks from before a disabled stretch would be extrapolated across it once detection resumes.
+                    if was_enabled and self._tracker is not None:
+                        self._tracker.reset()
+                was_enabled = False
+                continue
+            was_enabled = True
+            if frame_count % (cadence * mode.cadence_multiplier) != 0:
+                if self._tracker is not None:
+                    with self._lock:
+                        self.runtime.current_detections = boxes_from_detections(self._tracker.predict(submitted_at))
                 continue
             started = time.time()
-            result = self._infer(frame, metadata, degrade)
+            result = self._infer(frame, metadata, degrade, settings)
             inference_ms = (time.time() - started) * 1000.0
+            queue_age_ms = (started - submitted_at) * 1000.0
             events = [
                 DetectorEvent(timestamp=time.time(), label=det.label, confidence=det.confidence, note="visible in camera")
                 for det in result.detections
@@ -93,33 +187,68 @@ class DetectorService:
             with self._lock:
                 self.runtime.mode = result.mode
                 self.runtime.last_inference_ms = inference_ms
-                self.runtime.current_detections = result.detections
+                self.runtime.current_detections = self._track(result.detections, submitted_at)
                 merged = [*self.runtime.recent_events, *events]
                 cutoff = time.time() - 10.0
                 self.runtime.recent_events = [event for event in merged if event.timestamp >= cutoff][-20:]
+                if self._controller is not None:
+                    self._controller.observe(inference_ms, queue_age_ms)
+                    self.runtime.controller = self._controller.state()
             logger.debug(
                 "Inference complete mode=%s detections=%d latency=%.1fms queue_age=%.1fms",
                 result.mode,
                 len(result.detections),
                 inference_ms,
-                (time.time() - submitted_at) * 1000.0,
+                queue_age_ms,
             )
 
+    def _start_from_profile(self, controller: LatencyController) -> None:
+        """Start the ladder at the deployment profile's best point for this runtime within the frame budget."""
+        try:
+            points = load_operating_points(DETECTOR_PROFILE_PATH)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable detector profile: %s", exc)
+            return
+        point = choose_operating_point(points, DETECTOR_FRAME_BUDGET_MS, DETECTOR_RUNTIME, tile_sizes={0, DETECTOR_TILE_SIZE})
+        if point is None:
+            return
+        controller.start_at(point.imgsz, point.tiled)
+        logger.info(
+            "Detector profile point imgsz=%d tile=%d (%.0fms, mAP50-95 %.3f) -> starting level %s",
+            point.imgsz,
+            point.tile_size,
+            point.mean_ms,
+            point.map50_95,
+            controller.level.name,
+        )
+
+    def _track(self, detections: list[DetectionBox], timestamp: float) -> list[DetectionBox]:
+        """Associate fresh detections with existing tracks; called with the lock held."""
+        if self._tracker is None:
+            return detections
+        self._tracker.update(detections_from_boxes(detections), timestamp)
+        return boxes_from_detections(self._tracker.predict(timestamp))
+
     def _create_backend(self) -> PerceptionBackend:
         model_path = resolve_model_path(DEFAULT_MODEL_CANDIDATES)
         if model_path and model_path.suffix == ".pt":
             try:
-                logger.info("Attempting YOLO backend with model=%s", model_path)
-                return YoloPerceptionBackend(model_path)
+                logger.info("Attempting YOLO backend with model=%s runtime=%s", model_path, DETECTOR_RUNTIME)
+                return self._create_yolo_backend(model_path)
             except Exception as exc:
                 logger.exception("YOLO backend init failed, falling back to synthetic: %s", exc)
                 return self._fallback_backend
         logger.info("No valid model found, using synthetic backend")
         return self._fallback_backend
 
-    def _infer(self, frame, metadata: dict[str, object], degrade: int) -> InferenceResult:
-        result = self._active_backend.infer(frame, metadata, degrade)
+    def _create_yolo_backend(self, model_path: Path) -> PerceptionBackend:
+        if DETECTOR_RUNTIME == "torch":
+            return YoloPerceptionBackend(model_path)
+        return ExportedYoloPerceptionBackend(model_path, DETECTOR_RUNTIME)
+
+    def _infer(self, frame, metadata: dict[str, object], degrade: int, settings: InferenceSettings) -> InferenceResult:
+        result = self._active_backend.infer(frame, metadata, degrade, settings)
         if result.detections:
             return result
-        fallback = self._fallback_backend.infer(frame, metadata, degrade)
+        fallback = self._fallback_backend.infer(frame, metadata, degrade, settings)
         return fallback if fallback.detections else result
@@ -18,13 +18,23 @@ class InferenceResult:
     mode: str
 
 
+@dataclass(frozen=True)
+class InferenceSettings:
+    """Per-call input size and tiling chosen by the detector's latency controller."""
+
+    imgsz: int
+    tiled: bool = False
+
+
 class PerceptionBackend(ABC):
     @property
     @abstractmethod
     def mode(self) -> str: ...
 
     @abstractmethod
-    def infer(self, frame: Any, metadata: dict[str, object], degrade_step: int) -> InferenceResult: ...
+    def infer(
+        self, frame: Any, metadata: dict[str, object], degrade_step: int, settings: InferenceSettings | None = None
+    ) -> InferenceResult: ...
 
 
 def resolve_model_path(candidates: list[Path]) -> Path | None:
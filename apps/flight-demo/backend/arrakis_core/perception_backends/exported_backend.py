@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from .yolo_backend import YOLO, YoloPerceptionBackend
+
+
+logger = logging.getLogger("arrakis.perception.exported")
+
+EXPORT_RUNTIMES = ("onnx", "openvino")
+
+
+class ExportedYoloPerceptionBackend(YoloPerceptionBackend):
+    """YOLO detector served from a cached ONNX Runtime or OpenVINO export of a `.pt` checkpoint."""
+
+    def __init__(self, model_path: Path, runtime: str) -> None:
+        if runtime not in EXPORT_RUNTIMES:
+            raise ValueError(f"Unsupported detector runtime: {runtime}")
+        self._runtime = runtime
+        super().__init__(model_path)
+
+    def _load_model(self, model_path: Path):
+        # Shares the frontend's export cache; imported here so the synthetic backend runs without torch.
+        from model_runtime import export_model
+
+        exported_path = export_model(model_path, self._runtime)
+        logger.info("Loading %s perception backend from %s", self._runtime, exported_path)
+        return YOLO(str(exported_path), task="detect")
+
+    @property
+    def mode(self) -> str:
+        return f"yolo-{self._runtime}:{self._model_path.name}"
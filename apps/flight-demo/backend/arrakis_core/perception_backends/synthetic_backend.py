@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 from schemas import DetectionBox
 
-from .base import InferenceResult, PerceptionBackend
+from .base import InferenceResult, InferenceSettings, PerceptionBackend
 
 
 logger = logging.getLogger("arrakis.perception.synthetic")
@@ -14,7 +14,9 @@ class SyntheticPerceptionBackend(PerceptionBackend):
     def mode(self) -> str:
         return "synthetic"
 
-    def infer(self, frame, metadata: dict[str, object], degrade_step: int) -> InferenceResult:
+    def infer(
+        self, frame, metadata: dict[str, object], degrade_step: int, settings: InferenceSettings | None = None
+    ) -> InferenceResult:
         logger.debug("Running synthetic inference degrade_step=%d metadata_items=%d", degrade_step, len(metadata.get("synthetic_detections", [])))
         detections: list[DetectionBox] = []
         for item in metadata.get("synthetic_detections", []):
@@ -3,9 +3,11 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
+from config import DETECTOR_TILE_OVERLAP, DETECTOR_TILE_SIZE
+from inference_core import TileSettings, class_ids_for, filter_detections, predict_detections, predict_tiled
 from schemas import DetectionBox
 
-from .base import InferenceResult, PerceptionBackend
+from .base import InferenceResult, InferenceSettings, PerceptionBackend
 
 try:
     from ultralytics import YOLO
@@ -14,6 +16,9 @@ except ImportError:  # pragma: no cover
 
 
 logger = logging.getLogger("arrakis.perception.yolo")
+TRACKED_LABELS = ("person", "vehicle")
+# Tiled inference keeps few-pixel VisDrone objects at native resolution; it is skipped while degraded.
+TILING = TileSettings(size=DETECTOR_TILE_SIZE, overlap=DETECTOR_TILE_OVERLAP) if DETECTOR_TILE_SIZE > 0 else None
 
 
 class YoloPerceptionBackend(PerceptionBackend):
@@ -21,31 +26,36 @@ class YoloPerceptionBackend(PerceptionBackend):
         if YOLO is None:
             raise RuntimeError("Ultralytics is not installed.")
         self._model_path = model_path
+        self._model = self._load_model(model_path)
+        self._tracked_class_ids = class_ids_for(self._model.names, TRACKED_LABELS)
+
+    def _load_model(self, model_path: Path):
         logger.info("Loading YOLO perception backend from %s", model_path)
-        self._model = YOLO(str(model_path))
+        return YOLO(str(model_path))
 
     @property
     def mode(self) -> str:
         return f"yolo:{self._model_path.name}"
 
-    def infer(self, frame, metadata: dict[str, object], degrade_step: int) -> InferenceResult:
-        target = 960 if degrade_step == 0 else 768
-        logger.debug("Running YOLO inference imgsz=%d degrade_step=%d", target, degrade_step)
-        result = self._model.predict(frame, imgsz=target, verbose=False, conf=0.25)[0]
-        detections: list[DetectionBox] = []
-        for box in result.boxes or []:
-            x1, y1, x2, y2 = box.xyxy[0].tolist()
-            label = str(result.names[int(box.cls.item())])
-            if label not in {"person", "vehicle"}:
-                continue
-            detections.append(
-                DetectionBox(
-                    label=label,
-                    confidence=float(box.conf.item()),
-                    x1=float(x1 / frame.shape[1]),
-                    y1=float(y1 / frame.shape[0]),
-                    x2=float(x2 / frame.shape[1]),
-                    y2=float(y2 / frame.shape[0]),
-                )
-            )
-        return InferenceResult(detections=detections, mode=self.mode)
+    def infer(
+        self, frame, metadata: dict[str, object], degrade_step: int, settings: InferenceSettings | None = None
+    ) -> InferenceResult:
+        if settings is None:
+            settings = InferenceSettings(imgsz=960 if degrade_step == 0 else 768, tiled=degrade_step == 0)
+        target = settings.imgsz
+        tiling = TILING if settings.tiled else None
+        logger.debug("Running YOLO inference imgsz=%d degrade_step=%d tiled=%s", target, degrade_step, tiling is not None)
+        if tiling is not None:
+            detections = predict_tiled(self._model, [frame], 0.25, target, tiling)[0]
+        else:
+            detections = predict_detections(self._model, [frame], 0.25, target)[0]
+        detections = filter_detections(detections, class_ids=self._tracked_class_ids)
+        height, width = frame.shape[:2]
+        boxes = detections.normalized_boxes(width, height).tolist()
+        return InferenceResult(
+            detections=[
+                DetectionBox(label=label, confidence=score, x1=x1, y1=y1, x2=x2, y2=y2)
+                for (x1, y1, x2, y2), score, label in zip(boxes, detections.scores.tolist(), detections.labels().tolist())
+            ],
+            mode=self.mode,
+        )
@@ -94,6 +94,7 @@ class TelemetryHub:
             self._telemetry = updated
 
         self.video_service.set_degrade_from_rtf(updated.sim_rtf)
+        self.video_service.set_flight_context(phase, updated.alt_m)
         if geofence_breached:
             logger.warning("Geofence breach detected at lat=%.6f lon=%.6f", updated.lat, updated.lon)
         battery_rtl = updated.telemetry_fresh and updated.mode_valid and should_trigger_battery_rtl(updated, profile=self.profile)
@@ -6,9 +6,10 @@ from dataclasses import dataclass
 
 import cv2
 
+from airframe_profile import PerceptionConfig
 from config import VideoConfig
 from flight_adapters.base import VideoFrame
-from schemas import DetectorState, SimulatorState
+from schemas import DetectorState, MissionPhase, SimulatorState
 
 from .detector_service import DetectorService
 
@@ -26,8 +27,8 @@ class VideoRuntime:
 
 
 class VideoService:
-    def __init__(self) -> None:
-        self.detector = DetectorService()
+    def __init__(self, perception: PerceptionConfig | None = None) -> None:
+        self.detector = DetectorService(perception)
         self._lock = threading.Lock()
         self._video_config = VideoConfig()
         self._video = VideoRuntime(encoded_jpeg=b"", fps=0.0, latency_ms=0.0, width=1280, height=720)
@@ -58,6 +59,9 @@ class VideoService:
         else:
             self.detector.set_degrade_step(0)
 
+    def set_flight_context(self, phase: MissionPhase, alt_m: float) -> None:
+        self.detector.set_flight_context(phase, alt_m)
+
     def on_video(self, frame: VideoFrame) -> None:
         self.detector.submit(frame.frame_bgr, frame.metadata)
         runtime = self.detector.export()
@@ -99,6 +103,8 @@ class VideoService:
             objects_visible=len(detector.current_detections),
             recent_events=detector.recent_events,
             current_detections=detector.current_detections,
+            controller=detector.controller,
+            perception_mode=detector.perception_mode,
         )
 
     def simulator_state(self, sim_rtf: float) -> SimulatorState:
@@ -9,6 +9,12 @@ from typing import Literal
 REPO_ROOT = Path(__file__).resolve().parents[3]
 LOG_LEVEL = os.getenv("ARRAKIS_LOG_LEVEL", "INFO").upper()
 ENV_MODEL_PATH = os.getenv("ARRAKIS_DETECTOR_MODEL_PATH")
+DETECTOR_RUNTIME = os.getenv("ARRAKIS_DETECTOR_RUNTIME", "torch").strip().lower()
+DETECTOR_TRACKING = os.getenv("ARRAKIS_DETECTOR_TRACKING", "1").strip() != "0"
+DETECTOR_TILE_SIZE = int(os.getenv("ARRAKIS_DETECTOR_TILE_SIZE", "0"))
+DETECTOR_TILE_OVERLAP = float(os.getenv("ARRAKIS_DETECTOR_TILE_OVERLAP", "0.2"))
+DETECTOR_FRAME_BUDGET_MS = float(os.getenv("ARRAKIS_DETECTOR_FRAME_BUDGET_MS", "150"))
+DETECTOR_PROFILE_PATH = os.getenv("ARRAKIS_DETECTOR_PROFILE")
 STATE_DUMP_PATH = os.getenv("ARRAKIS_STATE_DUMP_PATH")
 EVENT_LOG_PATH = os.getenv(
     "ARRAKIS_EVENT_LOG_PATH",
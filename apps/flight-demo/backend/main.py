@@ -6,20 +6,22 @@ import os
 import resource
 import time
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Iterator
 
-from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from airframe_profile import AirframeProfile, load_profile
 from arrakis_core.controller import ArrakisController
+from arrakis_core.detection_format import columnar_state_payload
 from flight_adapters.ardupilot import ArduPilotAdapter
 from flight_adapters.instrumented import InstrumentedFlightAdapter
 from flight_adapters.mock import MockAdapter
 from logging_utils import configure_logging
-from schemas import RoutePreview, RouteRequest
+from schemas import BoxPrecision, DetectionFormat, DetectorModelRequest, RoutePreview, RouteRequest, StatePayload
 
 
 logger = logging.getLogger("arrakis.api")
@@ -206,10 +208,44 @@ def recover_control_plane(request: Request) -> dict[str, object]:
     return {"status": "recovered" if not bootstrap.control_plane_fault else "faulted", "bootstrap": bootstrap.model_dump()}
 
 
+@app.post("/api/detector/model")
+def swap_detector_model(payload: DetectorModelRequest, request: Request) -> dict[str, str]:
+    controller = get_controller_from_scope(request)
+    logger.info("HTTP swap_detector_model called path=%s", payload.model_path)
+    # Imported here so the backend still starts without torch; checkpoints are unpickled by torch.load,
+    # so only operator-approved directories are accepted.
+    from model_registry import registerable_model_dirs
+
+    try:
+        mode = controller.video_service.detector.swap_model(
+            Path(payload.model_path).expanduser(),
+            allowed_dirs=registerable_model_dirs(),
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"status": "swapped", "mode": mode}
+
+
+def render_state(payload: StatePayload, detections: DetectionFormat, precision: BoxPrecision) -> dict[str, object]:
+    if detections == "columnar":
+        payload = columnar_state_payload(payload, precision)
+    return payload.model_dump()
+
+
 @app.get("/api/state")
-def get_state(request: Request) -> dict[str, object]:
+def get_state(
+    request: Request,
+    detections: DetectionFormat = Query(default="objects"),
+    precision: BoxPrecision = Query(default="f32"),
+) -> dict[str, object]:
     controller = get_controller_from_scope(request)
-    return controller.state_payload().model_dump()
+    return render_state(controller.state_payload(), detections, precision)
 
 
 def mjpeg_stream(controller: ArrakisController) -> Iterator[bytes]:
@@ -228,13 +264,17 @@ def get_mjpeg(request: Request) -> StreamingResponse:
 
 
 @app.websocket("/ws/state")
-async def websocket_state(websocket: WebSocket) -> None:
+async def websocket_state(
+    websocket: WebSocket,
+    detections: DetectionFormat = Query(default="objects"),
+    precision: BoxPrecision = Query(default="f32"),
+) -> None:
     controller = get_controller_from_scope(websocket)
     logger.info("WebSocket state stream opened")
     await websocket.accept()
     try:
         while True:
-            await websocket.send_json(controller.state_payload().model_dump())
+            await websocket.send_json(render_state(controller.state_payload(), detections, precision))
             await asyncio.sleep(0.2)
     except WebSocketDisconnect:
         logger.info("WebSocket state stream disconnected")
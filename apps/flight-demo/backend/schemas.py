@@ -26,6 +26,8 @@ MissionPhase = Literal[
 ]
 
 TelemetryState = Literal["fresh", "degraded", "lost"]
+DetectionFormat = Literal["objects", "columnar"]
+BoxPrecision = Literal["f32", "f16", "u16"]
 
 
 class LatLon(BaseModel):
@@ -122,6 +124,11 @@ class DetectionBox(BaseModel):
     y1: float
     x2: float
     y2: float
+    track_id: int | None = None
+
+
+class DetectorModelRequest(BaseModel):
+    model_path: str = Field(min_length=1)
 
 
 class DetectorEvent(BaseModel):
@@ -139,6 +146,24 @@ class RouteProgress(BaseModel):
     next_waypoint: LatLon | None
 
 
+class DetectorControllerState(BaseModel):
+    level: str
+    level_index: int
+    level_count: int
+    floor_index: int
+    ceiling_index: int
+    imgsz: int
+    tiled: bool
+    cadence: int
+    budget_ms: float
+    latency_ms: float
+    inference_ms: float
+    queue_age_ms: float
+    changes: int
+    last_change: str | None = None
+    last_change_at: float | None = None
+
+
 class DetectorState(BaseModel):
     enabled: bool
     mode: str
@@ -146,6 +171,12 @@ class DetectorState(BaseModel):
     objects_visible: int
     recent_events: list[DetectorEvent]
     current_detections: list[DetectionBox]
+    # Set instead of current_detections when a client asks for the columnar format.
+    detections_columnar: dict[str, object] | None = None
+    # Latency controller decisions; None when ARRAKIS_DETECTOR_FRAME_BUDGET_MS=0.
+    controller: DetectorControllerState | None = None
+    # Airframe perception mode picked from mission phase and altitude.
+    perception_mode: str | None = None
 
 
 class SimulatorState(BaseModel):
@@ -23,6 +23,15 @@ from flight_adapters.fault_injector import FaultProfile
 from flight_adapters.mock import MockAdapter
 
 
+@pytest.fixture(autouse=True)
+def _isolate_event_logs(monkeypatch, tmp_path: Path) -> None:
+    """Write flight event logs under tmp_path instead of the repo's runtime_logs/."""
+    import arrakis_core.flight_event_recorder as recorder_module
+
+    monkeypatch.setenv("ARRAKIS_EVENT_LOG_PATH", str(tmp_path))
+    monkeypatch.setattr(recorder_module, "EVENT_LOG_PATH", str(tmp_path))
+
+
 @pytest.fixture
 def vtol_profile() -> AirframeProfile:
     """Default VTOL profile."""
@@ -0,0 +1,432 @@
+"""Detector service tests: backend selection and model lifecycle.
+
+Real YOLO weights are not required; backends that would load Ultralytics
+models are replaced with lightweight fakes.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from arrakis_core import detector_service as detector_module
+from arrakis_core.detection_format import columnar_detector_state
+from airframe_profile import PerceptionConfig, PerceptionModeConfig, load_profile
+from arrakis_core.detector_controller import STEP_DOWN_AFTER, STEP_UP_AFTER, LatencyController, select_perception_mode
+from arrakis_core.detector_service import DetectorService
+from arrakis_core.perception_backends.base import InferenceResult, InferenceSettings, PerceptionBackend
+from arrakis_core.perception_backends import yolo_backend as yolo_module
+from deployment_profile import PROFILE_VERSION, OperatingPoint
+from inference_core import TileSettings
+from schemas import DetectionBox, DetectorState
+
+
+class _FakeYoloBackend(PerceptionBackend):
+    def __init__(self, model_path: Path) -> None:
+        self._model_path = model_path
+
+    @property
+    def mode(self) -> str:
+        return f"yolo:{self._model_path.name}"
+
+    def infer(
+        self, frame, metadata: dict[str, object], degrade_step: int, settings: InferenceSettings | None = None
+    ) -> InferenceResult:
+        return InferenceResult(detections=[], mode=self.mode)
+
+
+class _FakeExportedBackend(_FakeYoloBackend):
+    def __init__(self, model_path: Path, runtime: str) -> None:
+        super().__init__(model_path)
+        self._runtime = runtime
+
+    @property
+    def mode(self) -> str:
+        return f"yolo-{self._runtime}:{self._model_path.name}"
+
+
+@pytest.fixture
+def detector(monkeypatch) -> DetectorService:
+    monkeypatch.setattr(detector_module, "DEFAULT_MODEL_CANDIDATES", [])
+    monkeypatch.setattr(detector_module, "YoloPerceptionBackend", _FakeYoloBackend)
+    monkeypatch.setattr(detector_module, "ExportedYoloPerceptionBackend", _FakeExportedBackend)
+    return DetectorService()
+
+
+class TestModelHotSwap:
+    def test_starts_on_synthetic_without_weights(self, detector):
+        assert detector.export().mode == "synthetic"
+
+    def test_swap_replaces_active_backend(self, detector, tmp_path):
+        checkpoint = tmp_path / "candidate.pt"
+        checkpoint.write_bytes(b"weights")
+
+        mode = detector.swap_model(checkpoint)
+
+        assert mode == "yolo:candidate.pt"
+        assert detector.export().mode == "yolo:candidate.pt"
+        assert detector._active_backend.mode == "yolo:candidate.pt"
+
+    def test_swap_rejects_missing_checkpoint(self, detector, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            detector.swap_model(tmp_path / "missing.pt")
+        assert detector.export().mode == "synthetic"
+
+    def test_swap_rejects_unsupported_format(self, detector, tmp_path):
+        checkpoint = tmp_path / "weights.bin"
+        checkpoint.write_bytes(b"weights")
+        with pytest.raises(ValueError, match="Unsupported"):
+            detector.swap_model(checkpoint)
+        assert detector.export().mode == "synthetic"
+
+    def test_swap_rejects_checkpoint_outside_allowed_dirs(self, detector, tmp_path):
+        allowed = tmp_path / "models"
+        allowed.mkdir()
+        checkpoint = tmp_path / "outside.pt"
+        checkpoint.write_bytes(b"weights")
+        with pytest.raises(PermissionError):
+            detector.swap_model(checkpoint, allowed_dirs=[allowed])
+        with pytest.raises(PermissionError):
+            detector.swap_model(allowed / ".." / "outside.pt", allowed_dirs=[allowed])
+        with pytest.raises(PermissionError):
+            detector.swap_model(checkpoint, allowed_dirs=[])
+        assert detector.export().mode == "synthetic"
+
+
+class TestExportedRuntime:
+    def test_swap_uses_configured_export_runtime(self, detector, monkeypatch, tmp_path):
+        monkeypatch.setattr(detector_module, "DETECTOR_RUNTIME", "onnx")
+        checkpoint = tmp_path / "candidate.pt"
+        checkpoint.write_bytes(b"weights")
+
+        assert detector.swap_model(checkpoint) == "yolo-onnx:candidate.pt"
+        assert detector.export().mode == "yolo-onnx:candidate.pt"
+
+
+class _FakeBoxes:
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class _FakeResult:
+    def __init__(self, data: np.ndarray) -> None:
+        self.boxes = _FakeBoxes(data)
+
+
+class _FakeUltralyticsModel:
+    names = {0: "person", 1: "vehicle", 2: "bicycle"}
+
+    def __init__(self, path: str, task: str | None = None) -> None:
+        self.calls: list[tuple[int, int]] = []
+
+    def predict(self, frames, conf, imgsz, verbose, device):
+        self.calls.append((len(frames), imgsz))
+        data = np.array(
+            [
+                [64.0, 36.0, 128.0, 108.0, 0.9, 0.0],
+                [0.0, 0.0, 32.0, 32.0, 0.8, 2.0],
+                [320.0, 180.0, 640.0, 360.0, 0.5, 1.0],
+            ],
+            dtype=np.float32,
+        )
+        return [_FakeResult(data) for _ in frames]
+
+
+class TestYoloDecode:
+    def test_infer_decodes_filters_and_normalizes_boxes(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(yolo_module, "YOLO", _FakeUltralyticsModel)
+        backend = yolo_module.YoloPerceptionBackend(tmp_path / "best.pt")
+
+        result = backend.infer(np.zeros((360, 640, 3), dtype=np.uint8), {}, degrade_step=0)
+
+        assert [det.label for det in result.detections] == ["person", "vehicle"]
+        first, second = result.detections
+        assert first.confidence == pytest.approx(0.9)
+        assert (first.x1, first.y1, first.x2, first.y2) == pytest.approx((0.1, 0.1, 0.2, 0.3))
+        assert (second.x1, second.y1, second.x2, second.y2) == pytest.approx((0.5, 0.5, 1.0, 1.0))
+        assert backend._model.calls == [(1, 960)]
+
+    def test_infer_handles_empty_results(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(yolo_module, "YOLO", _FakeUltralyticsModel)
+        backend = yolo_module.YoloPerceptionBackend(tmp_path / "best.pt")
+        monkeypatch.setattr(backend._model, "predict", lambda frames, **kwargs: [_FakeResult(np.zeros((0, 6), np.float32))])
+
+        assert backend.infer(np.zeros((360, 640, 3), dtype=np.uint8), {}, degrade_step=1).detections == []
+
+
+class TestTiledInference:
+    def test_tiles_run_as_one_batch_and_merge_duplicates(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(yolo_module, "YOLO", _FakeUltralyticsModel)
+        monkeypatch.setattr(yolo_module, "TILING", TileSettings(size=320, overlap=0.0))
+        backend = yolo_module.YoloPerceptionBackend(tmp_path / "best.pt")
+
+        result = backend.infer(np.zeros((360, 640, 3), dtype=np.uint8), {}, degrade_step=0)
+
+        assert backend._model.calls == [(4, 320), (1, 960)]
+        boxes = [(det.label, round(det.x1, 3), round(det.y1, 3)) for det in result.detections]
+        # The top-left tile and the full-frame pass both see the same person; NMS keeps one.
+        assert boxes.count(("person", 0.1, 0.1)) == 1
+
+    def test_degraded_frames_skip_tiling(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(yolo_module, "YOLO", _FakeUltralyticsModel)
+        monkeypatch.setattr(yolo_module, "TILING", TileSettings(size=320, overlap=0.0))
+        backend = yolo_module.YoloPerceptionBackend(tmp_path / "best.pt")
+
+        backend.infer(np.zeros((360, 640, 3), dtype=np.uint8), {}, degrade_step=1)
+
+        assert backend._model.calls == [(1, 768)]
+
+
+def _detector_state(detections: list[DetectionBox]) -> DetectorState:
+    return DetectorState(
+        enabled=True,
+        mode="yolo:best.pt",
+        last_inference_ms=12.0,
+        objects_visible=len(detections),
+        recent_events=[],
+        current_detections=detections,
+    )
+
+
+class TestColumnarFormat:
+    DETECTIONS = [
+        DetectionBox(label="vehicle", confidence=0.5, x1=0.5, y1=0.5, x2=1.0, y2=1.0),
+        DetectionBox(label="person", confidence=0.9, x1=0.1, y1=0.1, x2=0.2, y2=0.3),
+    ]
+
+    def test_columnar_state_uses_parallel_arrays(self):
+        state = columnar_detector_state(_detector_state(self.DETECTIONS))
+
+        assert state.current_detections == []
+        columnar = state.detections_columnar
+        assert columnar["count"] == 2
+        assert columnar["label_table"] == {"0": "person", "1": "vehicle"}
+        assert columnar["class_ids"] == [1, 0]
+        assert columnar["scores"] == pytest.approx([0.5, 0.9])
+        assert columnar["boxes"] == pytest.approx([0.5, 0.5, 1.0, 1.0, 0.1, 0.1, 0.2, 0.3])
+
+    def test_u16_precision_quantizes_coordinates(self):
+        columnar = columnar_detector_state(_detector_state(self.DETECTIONS), "u16").detections_columnar
+
+        assert columnar["boxes"][:4] == [32768, 32768, 65535, 65535]
+        assert all(isinstance(value, int) for value in columnar["boxes"])
+
+    def test_empty_state_stays_valid(self):
+        columnar = columnar_detector_state(_detector_state([]), "f16").detections_columnar
+
+        assert columnar["count"] == 0
+        assert columnar["boxes"] == []
+        assert columnar["label_table"] == {}
+
+    def test_tracked_state_carries_track_ids(self):
+        tracked = [det.model_copy(update={"track_id": index + 7}) for index, det in enumerate(self.DETECTIONS)]
+
+        columnar = columnar_detector_state(_detector_state(tracked)).detections_columnar
+
+        assert columnar["track_ids"] == [7, 8]
+
+
+def _moving_box(x: float, track_id: int | None = None) -> DetectionBox:
+    return DetectionBox(label="person", confidence=0.8, x1=x, y1=0.4, x2=x + 0.1, y2=0.6, track_id=track_id)
+
+
+class TestTracking:
+    def test_detector_assigns_stable_track_ids(self, detector):
+        first = detector._track([_moving_box(0.1), _moving_box(0.6)], 0.0)
+        second = detector._track([_moving_box(0.62), _moving_box(0.12)], 0.2)
+
+        assert [det.track_id for det in first] == [1, 2]
+        assert sorted((det.x1 > 0.5, det.track_id) for det in second) == [(False, 1), (True, 2)]
+
+    def test_clear_resets_tracks(self, detector):
+        detector._track([_moving_box(0.1)], 0.0)
+        detector.clear()
+
+        assert detector._track([], 1.0) == []
+
+    def test_entering_a_disabled_mode_resets_tracks(self, monkeypatch):
+        monkeypatch.setattr(detector_module, "DEFAULT_MODEL_CANDIDATES", [])
+        monkeypatch.setattr(detector_module, "DETECTOR_TRACKING", True)
+        service = DetectorService(PerceptionConfig(ground=PerceptionModeConfig(enabled=False)))
+        service._track([_moving_box(0.1)], 0.0)
+        assert len(service._tracker) == 1
+
+        service.set_flight_context("IDLE", 0.0)
+        service.submit(np.zeros((8, 8, 3), dtype=np.uint8), {})
+
+        deadline = time.monotonic() + 5.0
+        while len(service._tracker):
+            assert time.monotonic() < deadline, "disabled mode kept the old tracks"
+            time.sleep(0.01)
+        assert service.export().current_detections == []
+
+
+class TestLatencyController:
+    def test_steps_down_after_sustained_overrun(self):
+        controller = LatencyController(budget_ms=100.0, tiling=False, tracking=True)
+        for _ in range(STEP_DOWN_AFTER - 1):
+            controller.observe(inference_ms=150.0, queue_age_ms=20.0)
+        assert controller.level.imgsz == 960
+
+        controller.observe(inference_ms=150.0, queue_age_ms=20.0)
+
+        state = controller.state()
+        assert (state.imgsz, state.cadence, state.changes) == (768, 5, 1)
+        assert "over 100ms budget" in state.last_change
+
+    def test_steps_up_only_with_headroom_for_the_richer_level(self):
+        controller = LatencyController(budget_ms=100.0, tiling=False, tracking=True)
+        for _ in range(STEP_DOWN_AFTER):
+            controller.observe(inference_ms=150.0, queue_age_ms=0.0)
+        assert controller.level.imgsz == 768
+
+        # 70ms at 768 would be ~110ms at 960: under budget now, but no room to step up.
+        for _ in range(STEP_UP_AFTER * 2):
+            controller.observe(inference_ms=70.0, queue_age_ms=0.0)
+        assert controller.level.imgsz == 768
+
+        for _ in range(STEP_UP_AFTER * 2):
+            controller.observe(inference_ms=40.0, queue_age_ms=0.0)
+        assert controller.level.imgsz == 960
+
+    def test_tiled_level_leads_the_ladder_when_configured(self):
+        controller = LatencyController(budget_ms=100.0, tiling=True, tracking=False)
+        assert controller.level.tiled
+
+        for _ in range(STEP_DOWN_AFTER):
+            controller.observe(inference_ms=150.0, queue_age_ms=0.0)
+
+        assert (controller.level.imgsz, controller.level.tiled, controller.cadence) == (960, False, 2)
+
+    def test_degrade_step_sets_a_floor(self):
+        controller = LatencyController(budget_ms=100.0, tiling=True, tracking=True)
+
+        assert controller.set_floor(1)
+        assert controller.level.imgsz == 768
+        for _ in range(STEP_UP_AFTER * 2):
+            controller.observe(inference_ms=1.0, queue_age_ms=0.0)
+        assert controller.level.imgsz == 768
+
+        controller.set_floor(0)
+        for _ in range(STEP_UP_AFTER):
+            controller.observe(inference_ms=1.0, queue_age_ms=0.0)
+        assert controller.level.imgsz == 960
+
+    def test_backend_runs_at_controller_settings(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(yolo_module, "YOLO", _FakeUltralyticsModel)
+        monkeypatch.setattr(yolo_module, "TILING", TileSettings(size=320, overlap=0.0))
+        backend = yolo_module.YoloPerceptionBackend(tmp_path / "best.pt")
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+
+        backend.infer(frame, {}, degrade_step=0, settings=InferenceSettings(imgsz=640))
+        backend.infer(frame, {}, degrade_step=0, settings=InferenceSettings(imgsz=512, tiled=True))
+
+        assert backend._model.calls == [(1, 640), (4, 320), (1, 512)]
+
+    def test_detector_reports_controller_state(self, detector):
+        state = detector.export().controller
+
+        assert state is not None
+        assert state.level_index == 0
+        assert state.budget_ms > 0
+
+    def test_start_at_stays_within_ceiling(self):
+        controller = LatencyController(budget_ms=100.0, tiling=True, tracking=True)
+        controller.start_at(700, tiled=False)
+        assert (controller.level.imgsz, controller.level.tiled) == (640, False)
+
+        controller.set_ceiling("critical", PerceptionModeConfig(max_imgsz=512))
+        controller.start_at(960, tiled=True)
+        assert controller.level.imgsz == 512
+
+
+def _operating_point(backend: str, imgsz: int, mean_ms: float, map50_95: float, tile_size: int = 0) -> OperatingPoint:
+    return OperatingPoint(
+        backend=backend, imgsz=imgsz, tile_size=tile_size, map50=map50_95 * 1.5, map50_95=map50_95, mean_ms=mean_ms, peak_rss_mb=500.0
+    )
+
+
+class TestDeploymentProfile:
+    POINTS = [
+        _operating_point("torch", 512, 40.0, 0.20),
+        _operating_point("torch", 640, 60.0, 0.24),
+        _operating_point("torch", 768, 90.0, 0.23),
+        _operating_point("torch", 960, 140.0, 0.28),
+        _operating_point("torch", 960, 400.0, 0.33, tile_size=640),
+        _operating_point("openvino", 960, 70.0, 0.27),
+    ]
+
+    def test_detector_starts_at_profiled_level(self, monkeypatch, tmp_path):
+        profile = tmp_path / "pareto_profile.json"
+        profile.write_text(json.dumps({"version": PROFILE_VERSION, "results": [asdict(point) for point in self.POINTS]}))
+        monkeypatch.setattr(detector_module, "DEFAULT_MODEL_CANDIDATES", [])
+        monkeypatch.setattr(detector_module, "DETECTOR_PROFILE_PATH", str(profile))
+        monkeypatch.setattr(detector_module, "DETECTOR_FRAME_BUDGET_MS", 100.0)
+
+        state = DetectorService().export().controller
+
+        assert (state.imgsz, state.tiled) == (640, False)
+
+    def test_unreadable_profile_is_ignored(self, monkeypatch, tmp_path):
+        profile = tmp_path / "pareto_profile.json"
+        profile.write_text(json.dumps({"version": PROFILE_VERSION + 1, "results": []}))
+        monkeypatch.setattr(detector_module, "DEFAULT_MODEL_CANDIDATES", [])
+        monkeypatch.setattr(detector_module, "DETECTOR_PROFILE_PATH", str(profile))
+
+        assert DetectorService().export().controller.level_index == 0
+
+
+class TestPerceptionModes:
+    def test_mode_follows_phase_and_altitude(self):
+        config = load_profile("default-vtol").perception
+
+        assert select_perception_mode(config, "IDLE", 0.0) == "ground"
+        assert select_perception_mode(config, "OUTBOUND", 0.5) == "ground"
+        assert select_perception_mode(config, "TRANSITION_FW", 40.0) == "critical"
+        assert select_perception_mode(config, "RTL_BATTERY", 60.0) == "critical"
+        assert select_perception_mode(config, "OUTBOUND", 30.0) == "cruise"
+        assert select_perception_mode(config, "RETURN", 60.0) == "high_altitude"
+
+    def test_thresholds_are_per_airframe(self):
+        assert select_perception_mode(load_profile("default-vtol").perception, "OUTBOUND", 60.0) == "high_altitude"
+        assert select_perception_mode(load_profile("large-vtol").perception, "OUTBOUND", 60.0) == "cruise"
+
+    def test_mode_caps_controller_ladder(self):
+        controller = LatencyController(budget_ms=100.0, tiling=True, tracking=True)
+        controller.set_ceiling("cruise", PerceptionModeConfig())
+        assert (controller.level.imgsz, controller.level.tiled) == (960, False)
+
+        assert controller.set_ceiling("critical", PerceptionModeConfig(max_imgsz=640))
+        assert controller.level.imgsz == 640
+        assert "critical" in controller.state().last_change
+
+        # Relaxing the ceiling does not jump back up; the latency loop climbs when there is headroom.
+        controller.set_ceiling("high_altitude", PerceptionModeConfig(tiled=True))
+        assert controller.level.imgsz == 640
+        for _ in range(STEP_UP_AFTER * 6):
+            controller.observe(inference_ms=5.0, queue_age_ms=0.0)
+        assert controller.level.tiled
+
+    def test_detector_switches_mode_from_flight_context(self, monkeypatch):
+        monkeypatch.setattr(detector_module, "DEFAULT_MODEL_CANDIDATES", [])
+        perception = PerceptionConfig(critical=PerceptionModeConfig(max_imgsz=512))
+        service = DetectorService(perception)
+        assert service.export().perception_mode == "cruise"
+
+        service.set_flight_context("TAKEOFF_MC", 10.0)
+
+        runtime = service.export()
+        assert runtime.perception_mode == "critical"
+        assert runtime.controller.imgsz == 512
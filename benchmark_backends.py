@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from image_store import STORE_SUFFIX, ImageStore
+from model_runtime import INT8_CALIBRATION_ENV_VAR, MODEL_BACKENDS, load_inference_model, resolve_device, resolve_model_path
+
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare latency (and optionally mAP) of the torch, ONNX and OpenVINO backends.")
+    parser.add_argument("--model", help="Checkpoint to benchmark. Defaults to the normal model resolution order.")
+    parser.add_argument("--backends", nargs="+", choices=MODEL_BACKENDS, default=["torch", "onnx", "openvino"], help="Backends to compare.")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640], help="Inference sizes to measure.")
+    parser.add_argument(
+        "--images",
+        type=Path,
+        help="Directory of sample frames, or an image store (.u8) built by the Kaggle script. Defaults to synthetic 720p noise.",
+    )
+    parser.add_argument("--frames", type=int, default=50, help="Timed frames per backend and imgsz.")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed frames before measuring.")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold.")
+    parser.add_argument("--data", type=Path, help="Dataset YAML. When set, also reports val mAP and its delta against torch.")
+    parser.add_argument(
+        "--calibration-data",
+        type=Path,
+        help="Dataset YAML for openvino-int8 calibration. Defaults to ARRAKIS_INT8_CALIBRATION_DATA, then --data.",
+    )
+    parser.add_argument("--output", type=Path, help="Optional JSON report path.")
+    return parser.parse_args()
+
+
+def load_frames(image_dir: Path | None, count: int) -> list[np.ndarray]:
+    if image_dir is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 256, size=(720, 1280, 3), dtype=np.uint8) for _ in range(min(count, 8))]
+    if image_dir.suffix == STORE_SUFFIX:
+        # Read-only views into the shared mapping; predict letterboxes into fresh arrays, so nothing is copied here.
+        store = ImageStore(image_dir)
+        return [store.image(position) for position in range(min(count, len(store)))]
+    paths = sorted(path for path in image_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)[:count]
+    frames = [frame for frame in (cv2.imread(str(path)) for path in paths) if frame is not None]
+    if not frames:
+        raise RuntimeError(f"No readable images found in {image_dir}")
+    return frames
+
+
+def measure(model, frames: list[np.ndarray], imgsz: int, args: argparse.Namespace, device: str) -> dict[str, float]:
+    for index in range(args.warmup):
+        model.predict(frames[index % len(frames)], conf=args.conf, imgsz=imgsz, verbose=False, device=device)
+    samples_ms = []
+    for index in range(args.frames):
+        started_at = time.perf_counter()
+        model.predict(frames[index % len(frames)], conf=args.conf, imgsz=imgsz, verbose=False, device=device)
+        samples_ms.append((time.perf_counter() - started_at) * 1000.0)
+    samples = np.asarray(samples_ms)
+    return {
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "fps": float(1000.0 / samples.mean()),
+    }
+
+
+def evaluate(model, data: Path, imgsz: int, device: str) -> dict[str, float]:
+    metrics = model.val(data=str(data), imgsz=imgsz, split="val", batch=1, device=device, plots=False, verbose=False)
+    return {"map50": float(metrics.box.map50), "map50_95": float(metrics.box.map)}
+
+
+def main() -> None:
+    args = parse_args()
+    checkpoint = resolve_model_path(args.model)
+    device = resolve_device()
+    frames = load_frames(args.images, args.frames)
+    print(f"Benchmarking {checkpoint} on {device} with {len(frames)} distinct frames")
+
+    report: dict[str, object] = {"model": str(checkpoint), "device": device, "results": []}
+    calibration_data = args.calibration_data or (None if os.getenv(INT8_CALIBRATION_ENV_VAR) else args.data)
+    baseline: dict[int, dict[str, float]] = {}
+    for backend in args.backends:
+        started_at = time.perf_counter()
+        model = load_inference_model(checkpoint, backend, calibration_data)
+        load_ms = (time.perf_counter() - started_at) * 1000.0
+        for imgsz in args.imgsz:
+            stats = measure(model, frames, imgsz, args, device)
+            if args.data:
+                stats.update(evaluate(model, args.data, imgsz, device))
+            if backend == "torch":
+                baseline[imgsz] = stats
+            reference = baseline.get(imgsz)
+            row = {"backend": backend, "imgsz": imgsz, "load_ms": load_ms, **stats}
+            row["speedup_vs_torch"] = reference["mean_ms"] / stats["mean_ms"] if reference else None
+            if args.data:
+                row["map50_95_delta_vs_torch"] = stats["map50_95"] - reference["map50_95"] if reference else None
+            report["results"].append(row)
+
+            line = (
+                f"{backend:>13} imgsz={imgsz:<4} mean={stats['mean_ms']:7.1f}ms "
+                f"p50={stats['p50_ms']:7.1f}ms p95={stats['p95_ms']:7.1f}ms fps={stats['fps']:5.1f}"
+            )
+            if args.data:
+                line += f" mAP50={stats['map50']:.3f} mAP50-95={stats['map50_95']:.3f}"
+            if reference:
+                line += f"  x{row['speedup_vs_torch']:.2f} vs torch"
+                if args.data:
+                    line += f", mAP50-95 {row['map50_95_delta_vs_torch']:+.3f}"
+            print(line)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
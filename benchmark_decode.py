@@ -0,0 +1,86 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from inference_core import decode_image, jpeg_size, reduced_decode_factor
+
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare full-resolution and reduced-scale JPEG decode per imgsz.")
+    parser.add_argument("--images", type=Path, help="Directory of JPEG uploads. Defaults to synthetic 4K screen-like frames.")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[512, 640, 960, 1280], help="Requested inference sizes.")
+    parser.add_argument("--iterations", type=int, default=20, help="Decodes per image and mode.")
+    parser.add_argument("--output", type=Path, help="Optional JSON report path.")
+    return parser.parse_args()
+
+
+def load_jpegs(image_dir: Path | None) -> list[bytes]:
+    if image_dir is None:
+        rng = np.random.default_rng(0)
+        frames = []
+        for _ in range(4):
+            # Flat panels with text-like noise compress like real screen captures.
+            frame = np.repeat(rng.integers(0, 256, size=(54, 96, 3), dtype=np.uint8), 40, axis=0).repeat(40, axis=1)
+            frame[::7, ::5] = 255
+            frames.append(cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 85])[1].tobytes())
+        return frames
+    paths = sorted(path for path in image_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        raise RuntimeError(f"No JPEG files found in {image_dir}")
+    return [path.read_bytes() for path in paths]
+
+
+def time_decode(payloads: list[bytes], imgsz: int | None, iterations: int) -> tuple[float, float]:
+    samples_ms = []
+    decoded_bytes = 0
+    for payload in payloads:
+        for _ in range(iterations):
+            started_at = time.perf_counter()
+            frame = decode_image(payload, imgsz)
+            samples_ms.append((time.perf_counter() - started_at) * 1000.0)
+        decoded_bytes += frame.image.nbytes
+    return float(np.mean(samples_ms)), decoded_bytes / len(payloads) / 1e6
+
+
+def main() -> None:
+    args = parse_args()
+    payloads = load_jpegs(args.images)
+    sizes = [jpeg_size(payload) for payload in payloads]
+    print(f"{len(payloads)} JPEGs, first is {sizes[0][0]}x{sizes[0][1]}")
+
+    full_ms, full_mb = time_decode(payloads, None, args.iterations)
+    print(f"full decode       {full_ms:7.2f} ms  {full_mb:6.1f} MB/frame")
+    rows = []
+    for imgsz in args.imgsz:
+        reduced_ms, reduced_mb = time_decode(payloads, imgsz, args.iterations)
+        factors = sorted({reduced_decode_factor(*size, imgsz) for size in sizes if size})
+        rows.append(
+            {
+                "imgsz": imgsz,
+                "factors": factors,
+                "full_ms": full_ms,
+                "reduced_ms": reduced_ms,
+                "speedup": full_ms / reduced_ms,
+                "full_mb": full_mb,
+                "reduced_mb": reduced_mb,
+            }
+        )
+        print(
+            f"imgsz={imgsz:<5} 1/{'/'.join(map(str, factors))}  {reduced_ms:7.2f} ms  {reduced_mb:6.1f} MB/frame  "
+            f"x{full_ms / reduced_ms:.2f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps({"frames": len(payloads), "results": rows}, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from image_store import STORE_SUFFIX, ImageStore
+from inference_core import Detections, TileSettings, predict_detections, predict_tiled
+from model_runtime import MODEL_BACKENDS, load_inference_model, resolve_backend, resolve_device, resolve_model_path
+from object_tracker import box_iou, greedy_match
+
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+SMALL_OBJECT_AREA_PX = 32 * 32
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare tiled inference with plain high-imgsz inference on recall and throughput.")
+    parser.add_argument("--model", help="Checkpoint to benchmark. Defaults to the normal model resolution order.")
+    parser.add_argument("--backend", choices=MODEL_BACKENDS, help="Inference runtime. Defaults to ARRAKIS_MODEL_BACKEND, then torch.")
+    parser.add_argument(
+        "--images",
+        type=Path,
+        required=True,
+        help=(
+            "YOLO-layout image directory, e.g. VisDrone/images/val, or an image store (.u8) of one. "
+            "Labels are read from the matching labels/ directory. Store frames are already resized to the store's imgsz."
+        ),
+    )
+    parser.add_argument("--max-images", type=int, default=100, help="Number of images to evaluate.")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640, 960, 1280], help="Plain inference sizes to compare.")
+    parser.add_argument("--tile-size", type=int, nargs="+", default=[640], help="Tile sizes to compare.")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="Fractional overlap between neighbouring tiles.")
+    parser.add_argument("--tile-imgsz", type=int, default=640, help="imgsz of the full-frame pass that accompanies the tiles.")
+    parser.add_argument("--no-full-frame", action="store_true", help="Run tiles only, without the full-frame pass.")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold.")
+    parser.add_argument("--match-iou", type=float, default=0.5, help="IoU at which a detection counts as a hit.")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed frames per configuration.")
+    parser.add_argument("--output", type=Path, help="Optional JSON report path.")
+    return parser.parse_args()
+
+
+def label_path(image_path: Path) -> Path:
+    parts = list(image_path.parts)
+    index = len(parts) - 1 - parts[::-1].index("images")
+    parts[index] = "labels"
+    return Path(*parts).with_suffix(".txt")
+
+
+def load_ground_truth(image_path: Path, width: int, height: int) -> Detections | None:
+    """YOLO-format labels as pixel xyxy boxes; None when the image has no label file."""
+    try:
+        path = label_path(image_path)
+    except ValueError:
+        return None
+    if not path.exists():
+        return None
+    rows = np.loadtxt(path, dtype=np.float32, ndmin=2).reshape(-1, 5)
+    centers, sizes = rows[:, 1:3], rows[:, 3:5]
+    scale = np.array([width, height, width, height], dtype=np.float32)
+    boxes = np.concatenate([centers - sizes / 2, centers + sizes / 2], axis=1) * scale
+    return Detections(boxes=boxes, scores=np.ones(len(rows), dtype=np.float32), class_ids=rows[:, 0].astype(np.int32))
+
+
+def load_samples(image_dir: Path, count: int) -> list[tuple[np.ndarray, Detections | None]]:
+    if image_dir.suffix == STORE_SUFFIX:
+        # YOLO labels are normalized, so they apply to the resized store frames unchanged.
+        store = ImageStore(image_dir)
+        frames = (store.image(position) for position in range(min(count, len(store))))
+        return [
+            (frame, load_ground_truth(store.source_path(position), frame.shape[1], frame.shape[0]))
+            for position, frame in enumerate(frames)
+        ]
+    paths = sorted(path for path in image_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)[:count]
+    samples = []
+    for path in paths:
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            samples.append((frame, load_ground_truth(path, frame.shape[1], frame.shape[0])))
+    if not samples:
+        raise RuntimeError(f"No readable images found in {image_dir}")
+    return samples
+
+
+def count_hits(predicted: Detections, truth: Detections, match_iou: float) -> np.ndarray:
+    """Boolean mask over ground-truth boxes matched by a same-class prediction."""
+    iou = box_iou(truth.boxes, predicted.boxes)
+    iou[truth.class_ids[:, None] != predicted.class_ids[None, :]] = 0.0
+    truth_rows, _ = greedy_match(iou, match_iou)
+    hits = np.zeros(len(truth), dtype=bool)
+    hits[truth_rows] = True
+    return hits
+
+
+def evaluate(predict, samples: list[tuple[np.ndarray, Detections | None]], args: argparse.Namespace) -> dict[str, object]:
+    for index in range(args.warmup):
+        predict(samples[index % len(samples)][0])
+
+    latencies_ms = []
+    truth_total = small_total = hit_total = small_hits = predicted_total = 0
+    labelled = False
+    for frame, truth in samples:
+        started_at = time.perf_counter()
+        detections = predict(frame)
+        latencies_ms.append((time.perf_counter() - started_at) * 1000.0)
+        predicted_total += len(detections)
+        if truth is None:
+            continue
+        labelled = True
+        hits = count_hits(detections, truth, args.match_iou)
+        small = np.prod(truth.boxes[:, 2:] - truth.boxes[:, :2], axis=1) < SMALL_OBJECT_AREA_PX
+        truth_total += len(truth)
+        hit_total += int(hits.sum())
+        small_total += int(small.sum())
+        small_hits += int(hits[small].sum())
+
+    latencies = np.asarray(latencies_ms)
+    return {
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "fps": float(1000.0 / latencies.mean()),
+        "detections_per_image": predicted_total / len(samples),
+        "recall": hit_total / truth_total if labelled and truth_total else None,
+        "small_recall": small_hits / small_total if labelled and small_total else None,
+        "precision": hit_total / predicted_total if labelled and predicted_total else None,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    checkpoint = resolve_model_path(args.model)
+    backend = resolve_backend(args.backend)
+    device = resolve_device()
+    model = load_inference_model(checkpoint, backend)
+    samples = load_samples(args.images, args.max_images)
+    labelled = sum(truth is not None for _, truth in samples)
+    print(f"Benchmarking {checkpoint} via {backend} on {device}: {len(samples)} images, {labelled} labelled")
+
+    configs = []
+    for imgsz in args.imgsz:
+        configs.append(
+            (
+                f"plain imgsz={imgsz}",
+                {"mode": "plain", "imgsz": imgsz},
+                lambda frame, imgsz=imgsz: predict_detections(model, [frame], args.conf, imgsz, device)[0],
+            )
+        )
+    for tile_size in args.tile_size:
+        tiling = TileSettings(size=tile_size, overlap=args.tile_overlap, full_frame=not args.no_full_frame)
+        configs.append(
+            (
+                f"tiled {tile_size}px",
+                {"mode": "tiled", "tile_size": tile_size, "tile_overlap": args.tile_overlap, "full_frame": tiling.full_frame},
+                lambda frame, tiling=tiling: predict_tiled(model, [frame], args.conf, args.tile_imgsz, tiling, device)[0],
+            )
+        )
+
+    report: dict[str, object] = {"model": str(checkpoint), "backend": backend, "device": device, "images": len(samples), "results": []}
+    for name, config, predict in configs:
+        stats = evaluate(predict, samples, args)
+        report["results"].append({**config, **stats})
+
+        line = f"{name:>20} mean={stats['mean_ms']:7.1f}ms p95={stats['p95_ms']:7.1f}ms fps={stats['fps']:5.1f}"
+        if stats["recall"] is not None:
+            small_recall = stats["small_recall"]
+            line += f" recall={stats['recall']:.3f} small={'n/a' if small_recall is None else f'{small_recall:.3f}'} precision={stats['precision'] or 0.0:.3f}"
+        else:
+            line += f" detections/image={stats['detections_per_image']:.1f}"
+        print(line)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
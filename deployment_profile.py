@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+
+PROFILE_ENV_VAR = "ARRAKIS_DEPLOYMENT_PROFILE"
+# Bump whenever the evaluate_pareto.py report layout changes.
+PROFILE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class OperatingPoint:
+    """One configuration measured by evaluate_pareto.py: backend, imgsz and tiling with its cost and accuracy."""
+
+    backend: str
+    imgsz: int
+    tile_size: int
+    map50: float
+    map50_95: float
+    mean_ms: float
+    peak_rss_mb: float
+
+    @property
+    def tiled(self) -> bool:
+        return self.tile_size > 0
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> OperatingPoint:
+        return cls(
+            backend=str(row["backend"]),
+            imgsz=int(row["imgsz"]),
+            tile_size=int(row["tile_size"]),
+            map50=float(row["map50"]),
+            map50_95=float(row["map50_95"]),
+            mean_ms=float(row["mean_ms"]),
+            peak_rss_mb=float(row["peak_rss_mb"]),
+        )
+
+
+def pareto_front(points: Iterable[OperatingPoint]) -> list[OperatingPoint]:
+    """Points that no other point beats on both latency and mAP50-95, fastest first."""
+    front: list[OperatingPoint] = []
+    for point in sorted(points, key=lambda point: (point.mean_ms, -point.map50_95)):
+        if not front or point.map50_95 > front[-1].map50_95:
+            front.append(point)
+    return front
+
+
+def load_operating_points(path: str | Path | None = None) -> list[OperatingPoint]:
+    """Every measured point of the report at `path`, or at ARRAKIS_DEPLOYMENT_PROFILE; empty when neither is set."""
+    path_value = path or os.getenv(PROFILE_ENV_VAR)
+    if not path_value:
+        return []
+    report_path = Path(path_value).expanduser()
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    if report.get("version") != PROFILE_VERSION:
+        raise ValueError(
+            f"{report_path} is a version {report.get('version')} profile; expected {PROFILE_VERSION}. Re-run evaluate_pareto.py."
+        )
+    return [OperatingPoint.from_row(row) for row in report["results"]]
+
+
+def choose_operating_point(
+    points: Iterable[OperatingPoint],
+    budget_ms: float | None = None,
+    backend: str | None = None,
+    tile_sizes: Iterable[int] | None = None,
+    max_rss_mb: float | None = None,
+) -> OperatingPoint | None:
+    """Most accurate point for this backend and tiling that fits the latency and memory budget.
+
+    When nothing fits, the fastest eligible point; None when the profile has no eligible point at all.
+    """
+    allowed_tiles = None if tile_sizes is None else set(tile_sizes)
+    candidates = [
+        point
+        for point in points
+        if (backend is None or point.backend == backend) and (allowed_tiles is None or point.tile_size in allowed_tiles)
+    ]
+    if not candidates:
+        return None
+    within = [
+        point
+        for point in candidates
+        if (budget_ms is None or point.mean_ms <= budget_ms) and (max_rss_mb is None or point.peak_rss_mb <= max_rss_mb)
+    ]
+    if not within:
+        return min(candidates, key=lambda point: point.mean_ms)
+    return max(within, key=lambda point: (point.map50_95, -point.mean_ms))
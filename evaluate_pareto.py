@@ -0,0 +1,221 @@
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from benchmark_tiling import load_samples
+from deployment_profile import PROFILE_ENV_VAR, PROFILE_VERSION, OperatingPoint, pareto_front
+from inference_core import Detections, TileSettings, predict_detections, predict_tiled
+from model_runtime import MODEL_BACKENDS, checkpoint_digest, export_model, load_inference_model, resolve_model_path
+from object_tracker import box_iou
+
+
+DEVICE = "cpu"
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+# COCO-style interpolation: precision is sampled at 101 evenly spaced recall levels.
+RECALL_POINTS = np.linspace(0.0, 1.0, 101)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sweep imgsz, tiling and export backend on CPU and write an accuracy-vs-latency Pareto profile."
+    )
+    parser.add_argument("--model", help="Checkpoint to evaluate. Defaults to the normal model resolution order.")
+    parser.add_argument(
+        "--images",
+        type=Path,
+        required=True,
+        help="YOLO-layout val image directory (labels from the matching labels/ directory), or an image store (.u8) of one.",
+    )
+    parser.add_argument("--max-images", type=int, default=200, help="Size of the val subset.")
+    parser.add_argument("--classes", nargs="+", default=["person", "vehicle"], help="Class names in label-id order.")
+    parser.add_argument("--backends", nargs="+", choices=MODEL_BACKENDS, default=["torch", "onnx", "openvino"], help="Backends to sweep.")
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[512, 640, 768, 960], help="Inference sizes to sweep.")
+    parser.add_argument("--tile-size", type=int, nargs="+", default=[0], help="Tile sizes to sweep; 0 is plain inference.")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="Fractional overlap between neighbouring tiles.")
+    parser.add_argument(
+        "--calibration-data",
+        type=Path,
+        help="Dataset YAML for openvino-int8 calibration. Defaults to ARRAKIS_INT8_CALIBRATION_DATA.",
+    )
+    parser.add_argument("--conf", type=float, default=0.001, help="Confidence threshold; keep it low for mAP.")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed frames per configuration.")
+    parser.add_argument("--output", type=Path, default=Path("pareto_profile.json"), help=f"Profile JSON path, read via {PROFILE_ENV_VAR}.")
+    return parser.parse_args()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def match_predictions(predicted: Detections, truth: Detections) -> np.ndarray:
+    """(N_pred, len(IOU_THRESHOLDS)) true-positive flags: by descending score, each prediction claims
+    the best-overlapping unclaimed same-class box at each threshold.
+    """
+    hits = np.zeros((len(predicted), len(IOU_THRESHOLDS)), dtype=bool)
+    if not len(predicted) or not len(truth):
+        return hits
+    iou = box_iou(predicted.boxes, truth.boxes)
+    iou[predicted.class_ids[:, None] != truth.class_ids[None, :]] = 0.0
+    order = np.argsort(-predicted.scores, kind="stable")
+    for column, threshold in enumerate(IOU_THRESHOLDS):
+        claimed = np.zeros(len(truth), dtype=bool)
+        for row in order:
+            overlap = np.where(claimed, 0.0, iou[row])
+            best = int(overlap.argmax())
+            if overlap[best] >= threshold:
+                claimed[best] = True
+                hits[row, column] = True
+    return hits
+
+
+def average_precision(hits: np.ndarray, scores: np.ndarray, truth_count: int) -> np.ndarray:
+    """AP at each IoU threshold from pooled prediction hits and scores of one class."""
+    if truth_count == 0:
+        return np.full(len(IOU_THRESHOLDS), np.nan)
+    if not len(scores):
+        return np.zeros(len(IOU_THRESHOLDS))
+    ordered = hits[np.argsort(-scores, kind="stable")]
+    true_positives = np.cumsum(ordered, axis=0)
+    recall = true_positives / truth_count
+    precision = true_positives / np.arange(1, len(ordered) + 1)[:, None]
+    # Precision envelope: the best precision at this recall or any higher one.
+    precision = np.maximum.accumulate(precision[::-1], axis=0)[::-1]
+    ap = np.empty(len(IOU_THRESHOLDS))
+    for column in range(len(IOU_THRESHOLDS)):
+        index = np.searchsorted(recall[:, column], RECALL_POINTS, side="left")
+        sampled = np.zeros(len(RECALL_POINTS))
+        inside = index < len(precision)
+        sampled[inside] = precision[index[inside], column]
+        ap[column] = sampled.mean()
+    return ap
+
+
+def to_label_ids(detections: Detections, classes: list[str]) -> Detections:
+    """Re-key predictions from the model's class ids to the label ids of `classes`, dropping other classes."""
+    label_ids = {name: label_id for label_id, name in enumerate(classes)}
+    mapped = np.array([label_ids.get(str(label), -1) for label in detections.labels().tolist()], dtype=np.int32)
+    keep = mapped >= 0
+    return Detections(boxes=detections.boxes[keep], scores=detections.scores[keep], class_ids=mapped[keep])
+
+
+def run_config(
+    checkpoint: Path,
+    backend: str,
+    calibration_data: Path | None,
+    args: argparse.Namespace,
+    imgsz: int,
+    tile_size: int,
+) -> dict[str, object]:
+    """Measure one configuration; runs in a fresh process so its peak RSS is its own."""
+    model = load_inference_model(checkpoint, backend, calibration_data)
+    samples = load_samples(args.images, args.max_images)
+    tiling = TileSettings(size=tile_size, overlap=args.tile_overlap) if tile_size > 0 else None
+
+    def predict(frame: np.ndarray) -> Detections:
+        if tiling is not None:
+            return predict_tiled(model, [frame], args.conf, imgsz, tiling, DEVICE)[0]
+        return predict_detections(model, [frame], args.conf, imgsz, DEVICE)[0]
+
+    for index in range(args.warmup):
+        predict(samples[index % len(samples)][0])
+
+    latencies_ms = []
+    hits, scores, class_ids = [], [], []
+    truth_counts = np.zeros(len(args.classes), dtype=np.int64)
+    for frame, truth in samples:
+        started_at = time.perf_counter()
+        detections = predict(frame)
+        latencies_ms.append((time.perf_counter() - started_at) * 1000.0)
+        if truth is None:
+            continue
+        detections = to_label_ids(detections, args.classes)
+        truth = truth.select(truth.class_ids < len(args.classes))
+        truth_counts += np.bincount(truth.class_ids, minlength=len(args.classes))
+        hits.append(match_predictions(detections, truth))
+        scores.append(detections.scores)
+        class_ids.append(detections.class_ids)
+
+    if not hits:
+        raise RuntimeError(f"No labelled images found in {args.images}; mAP needs the matching labels/ directory.")
+    hits_all, scores_all, class_ids_all = np.concatenate(hits), np.concatenate(scores), np.concatenate(class_ids)
+    per_class = {}
+    for label_id, name in enumerate(args.classes):
+        mask = class_ids_all == label_id
+        ap = average_precision(hits_all[mask], scores_all[mask], int(truth_counts[label_id]))
+        per_class[name] = {"instances": int(truth_counts[label_id]), "map50": float(ap[0]), "map50_95": float(ap.mean())}
+    evaluated = [stats for stats in per_class.values() if stats["instances"]]
+
+    latencies = np.asarray(latencies_ms)
+    return {
+        "backend": backend,
+        "imgsz": imgsz,
+        "tile_size": tile_size,
+        "tile_overlap": args.tile_overlap if tiling is not None else None,
+        "images": len(samples),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "fps": float(1000.0 / latencies.mean()),
+        "peak_rss_mb": peak_rss_mb(),
+        "map50": float(np.mean([stats["map50"] for stats in evaluated])) if evaluated else 0.0,
+        "map50_95": float(np.mean([stats["map50_95"] for stats in evaluated])) if evaluated else 0.0,
+        "classes": per_class,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    checkpoint = resolve_model_path(args.model)
+    # Export in this process so the one-time export cost stays out of every configuration's peak RSS.
+    for backend in args.backends:
+        if backend != "torch" and checkpoint.suffix == ".pt":
+            export_model(checkpoint, backend, args.calibration_data)
+
+    configs = [(backend, imgsz, tile_size) for backend in args.backends for imgsz in args.imgsz for tile_size in args.tile_size]
+    print(f"Evaluating {checkpoint} on {DEVICE}: {len(configs)} configurations, up to {args.max_images} images from {args.images}")
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for backend, imgsz, tile_size in configs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            row = executor.submit(run_config, checkpoint, backend, args.calibration_data, args, imgsz, tile_size).result()
+        results.append(row)
+        tiles = f"tile={tile_size}" if tile_size else "plain"
+        print(
+            f"{backend:>13} imgsz={imgsz:<4} {tiles:<9} mean={row['mean_ms']:7.1f}ms p95={row['p95_ms']:7.1f}ms "
+            f"rss={row['peak_rss_mb']:6.0f}MB mAP50={row['map50']:.3f} mAP50-95={row['map50_95']:.3f}"
+        )
+
+    front = {(point.backend, point.imgsz, point.tile_size) for point in pareto_front(OperatingPoint.from_row(row) for row in results)}
+    for row in results:
+        row["pareto"] = (row["backend"], row["imgsz"], row["tile_size"]) in front
+
+    print("\nPareto front (fastest first):")
+    for row in sorted((row for row in results if row["pareto"]), key=lambda row: row["mean_ms"]):
+        per_class = " ".join(f"{name}={stats['map50_95']:.3f}" for name, stats in row["classes"].items())
+        print(f"  {row['backend']:>13} imgsz={row['imgsz']:<4} tile={row['tile_size']:<4} {row['mean_ms']:7.1f}ms mAP50-95={row['map50_95']:.3f} ({per_class})")
+
+    report = {
+        "version": PROFILE_VERSION,
+        "model": str(checkpoint),
+        "model_digest": checkpoint_digest(checkpoint),
+        "device": DEVICE,
+        "images": str(args.images),
+        "classes": args.classes,
+        "conf": args.conf,
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}; point {PROFILE_ENV_VAR} at it to pick runtime defaults")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from inference_core import jpeg_size
+
+
+STORE_SUFFIX = ".u8"
+INDEX_SUFFIX = ".idx.npz"
+# Bump whenever the stored pixel layout changes so existing stores are rebuilt.
+STORE_VERSION = 1
+# JPEG SOF markers normally sit within the first few KiB; EXIF blocks are capped at 64 KiB.
+IMAGE_HEADER_BYTES = 1 << 16
+# Images decoded per pool task while filling a store.
+FILL_CHUNKSIZE = 16
+
+
+def resized_shape(height: int, width: int, imgsz: int) -> tuple[int, int]:
+    """Long side to `imgsz`, exactly as Ultralytics' BaseDataset.load_image resizes in rect mode."""
+    ratio = imgsz / max(height, width)
+    if ratio == 1:
+        return height, width
+    return min(math.ceil(height * ratio), imgsz), min(math.ceil(width * ratio), imgsz)
+
+
+def decode_resized(image_path: Path, imgsz: int) -> tuple[np.ndarray, tuple[int, int]]:
+    """BGR image resized for `imgsz`, plus its original (height, width)."""
+    image = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+    if image is None:
+        raise FileNotFoundError(f"Image Not Found {image_path}")
+    height, width = image.shape[:2]
+    shape = resized_shape(height, width, imgsz)
+    if shape != (height, width):
+        image = cv2.resize(image, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+    return image, (height, width)
+
+
+def read_image_shape(image_path: Path) -> tuple[int, int]:
+    """(height, width) from the image header, without decoding it."""
+    with image_path.open("rb") as image_file:
+        size = jpeg_size(image_file.read(IMAGE_HEADER_BYTES))
+    if size is None:
+        with Image.open(image_path) as image:
+            size = image.size
+    return size[1], size[0]
+
+
+def index_path(store_path: Path) -> Path:
+    return store_path.with_name(store_path.name.removesuffix(STORE_SUFFIX) + INDEX_SUFFIX)
+
+
+def store_key(image_paths: list[Path], imgsz: int) -> str:
+    """Digest of the store layout version, imgsz and every image's name, size and mtime."""
+    digest = hashlib.sha256(f"{STORE_VERSION}:{imgsz}".encode())
+    for image_path in image_paths:
+        stat = image_path.stat()
+        digest.update(f"\n{image_path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """Decoded, resized images packed into one flat uint8 file, memory-mapped read-only.
+
+    The index next to the file holds each image's name, byte offset, stored shape and original shape.
+    Every process maps the same file, so the pixels sit once in the page cache however many dataloader
+    workers or tools read them. Pickling carries only the path; unpickling maps the file again.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with np.load(index_path(self.path)) as index:
+            self.key = str(index["key"])
+            self.imgsz = int(index["imgsz"])
+            self.source_dir = Path(str(index["source_dir"]))
+            self.names = index["names"]
+            self.offsets = index["offsets"]
+            self.shapes = index["shapes"]
+            self.original_shapes = index["original_shapes"]
+        self.positions = {name: position for position, name in enumerate(self.names.tolist())}
+        self.data = np.memmap(self.path, dtype=np.uint8, mode="r")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getstate__(self) -> dict[str, object]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, object]) -> None:
+        self.__init__(state["path"])
+
+    def find(self, name: str) -> int | None:
+        return self.positions.get(name)
+
+    def image(self, position: int) -> np.ndarray:
+        """Read-only (height, width, 3) BGR view into the mapping; copy it before writing."""
+        height, width = self.shapes[position]
+        start = int(self.offsets[position])
+        return self.data[start : start + height * width * 3].reshape(height, width, 3)
+
+    def original_shape(self, position: int) -> tuple[int, int]:
+        height, width = self.original_shapes[position]
+        return int(height), int(width)
+
+    def source_path(self, position: int) -> Path:
+        return self.source_dir / str(self.names[position])
+
+
+def open_image_store(store_path: Path) -> ImageStore | None:
+    if not store_path.exists() or not index_path(store_path).exists():
+        return None
+    return ImageStore(store_path)
+
+
+def fill_store_record(store_path: Path, image_path: Path, offset: int, imgsz: int) -> tuple[tuple[int, int], tuple[int, int]]:
+    """Decode one image into its slot of the store; returns its stored and original (height, width)."""
+    image, original_shape = decode_resized(image_path, imgsz)
+    record = np.memmap(store_path, dtype=np.uint8, mode="r+", offset=offset, shape=image.size)
+    record[:] = image.reshape(-1)
+    record.flush()
+    return image.shape[:2], original_shape
+
+
+def build_image_store(image_paths: list[Path], store_path: Path, imgsz: int, workers: int = 1) -> ImageStore:
+    """Pack `image_paths`, resized for `imgsz`, into the store at `store_path`.
+
+    An existing store built from the same images at the same imgsz is reused as is. Slots are sized
+    from the image headers up front, so pool workers decode straight into the file without sending
+    pixels between processes.
+    """
+    key = store_key(image_paths, imgsz)
+    existing = open_image_store(store_path)
+    if existing is not None and existing.key == key:
+        return existing
+    if not image_paths:
+        raise ValueError(f"No images to pack into {store_path}")
+
+    expected = np.array(
+        [resized_shape(*read_image_shape(image_path), imgsz) for image_path in image_paths], dtype=np.int64
+    )
+    sizes = expected.prod(axis=1) * 3
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    total = int(sizes.sum())
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    free = shutil.disk_usage(store_path.parent).free + (store_path.stat().st_size if store_path.exists() else 0)
+    if free < total:
+        raise OSError(f"Image store needs {total / (1 << 30):.1f} GiB but only {free / (1 << 30):.1f} GiB is free at {store_path.parent}")
+
+    staged = store_path.with_name(f"{store_path.name}.part")
+    with staged.open("wb") as store_file:
+        store_file.truncate(total)
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        records = list(
+            executor.map(fill_store_record, repeat(staged), image_paths, offsets.tolist(), repeat(imgsz), chunksize=FILL_CHUNKSIZE)
+        )
+    # EXIF orientation is applied on decode, so a slot sized from the header may hold the transposed shape.
+    shapes = np.array([shape for shape, _ in records], dtype=np.int32)
+    original_shapes = np.array([original for _, original in records], dtype=np.int32)
+    if not np.array_equal(shapes.prod(axis=1), expected.prod(axis=1)):
+        staged.unlink()
+        raise ValueError(f"Decoded image sizes disagree with their headers while building {store_path}")
+
+    staged_index = staged.with_name(f"{staged.name}{INDEX_SUFFIX}")
+    with staged_index.open("wb") as index_file:
+        np.savez(
+            index_file,
+            key=np.array(key),
+            imgsz=np.array(imgsz),
+            source_dir=np.array(str(image_paths[0].parent)),
+            names=np.array([image_path.name for image_path in image_paths]),
+            offsets=offsets,
+            shapes=shapes,
+            original_shapes=original_shapes,
+        )
+    staged.replace(store_path)
+    staged_index.replace(index_path(store_path))
+    return ImageStore(store_path)
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Iterable
+
+import cv2
+import numpy as np
+
+
+BOX_PRECISIONS = ("f32", "f16", "u16")
+U16_SCALE = 65535.0
+JPEG_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF})
+REDUCED_DECODE_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+TILE_MERGE_IOS = 0.6
+
+
+@dataclass(frozen=True)
+class Detections:
+    """Detections for one frame as parallel arrays: pixel xyxy boxes, scores and class ids.
+
+    `names` is the model's label table (see label_table), shared by every frame of a batch.
+    `speed` carries Ultralytics' per-image preprocess/inference/postprocess milliseconds.
+    `track_ids` is set by object_tracker.BoxTracker for tracked detections.
+    """
+
+    boxes: np.ndarray
+    scores: np.ndarray
+    class_ids: np.ndarray
+    names: np.ndarray | None = None
+    speed: dict[str, float] | None = None
+    track_ids: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    def select(self, mask: np.ndarray) -> Detections:
+        return Detections(
+            boxes=self.boxes[mask],
+            scores=self.scores[mask],
+            class_ids=self.class_ids[mask],
+            names=self.names,
+            speed=self.speed,
+            track_ids=None if self.track_ids is None else self.track_ids[mask],
+        )
+
+    def labels(self) -> np.ndarray:
+        if self.names is None:
+            return self.class_ids.astype(str).astype(object)
+        return self.names[self.class_ids]
+
+    def normalized_boxes(self, width: int, height: int) -> np.ndarray:
+        return self.boxes / np.array([width, height, width, height], dtype=np.float32)
+
+    def rescaled(self, scale_x: float, scale_y: float) -> Detections:
+        if scale_x == 1.0 and scale_y == 1.0:
+            return self
+        return replace(self, boxes=self.boxes * np.array([scale_x, scale_y, scale_x, scale_y], dtype=np.float32))
+
+    def translated(self, dx: float, dy: float) -> Detections:
+        if dx == 0 and dy == 0:
+            return self
+        return replace(self, boxes=self.boxes + np.array([dx, dy, dx, dy], dtype=np.float32))
+
+
+@dataclass(frozen=True)
+class DecodedFrame:
+    """A decoded upload, possibly at a reduced scale, with the original image's dimensions."""
+
+    image: np.ndarray
+    width: int
+    height: int
+
+    @property
+    def scale_x(self) -> float:
+        return self.width / self.image.shape[1]
+
+    @property
+    def scale_y(self) -> float:
+        return self.height / self.image.shape[0]
+
+
+@dataclass(frozen=True)
+class TileSettings:
+    """Slice-based inference: overlapping `size` px tiles at native resolution, optionally plus a full-frame pass."""
+
+    size: int = 640
+    overlap: float = 0.2
+    full_frame: bool = True
+
+
+EMPTY_DETECTIONS = Detections(
+    boxes=np.zeros((0, 4), dtype=np.float32),
+    scores=np.zeros(0, dtype=np.float32),
+    class_ids=np.zeros(0, dtype=np.int32),
+)
+
+
+def jpeg_size(data: bytes) -> tuple[int, int] | None:
+    """(width, height) from a JPEG's SOF header, without decoding it. None for other formats."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            offset += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            if offset + 9 > len(data):
+                return None
+            height = int.from_bytes(data[offset + 5 : offset + 7], "big")
+            width = int.from_bytes(data[offset + 7 : offset + 9], "big")
+            return (width, height) if width and height else None
+        offset += 2 + int.from_bytes(data[offset + 2 : offset + 4], "big")
+    return None
+
+
+def reduced_decode_factor(width: int, height: int, imgsz: int) -> int:
+    """Largest libjpeg DCT scale (1/2, 1/4, 1/8) that keeps the long side at or above imgsz."""
+    for factor in sorted(REDUCED_DECODE_FLAGS, reverse=True):
+        if max(width, height) // factor >= imgsz:
+            return factor
+    return 1
+
+
+def decode_image(data: bytes, imgsz: int | None = None) -> DecodedFrame | None:
+    """Decode an upload; JPEGs much larger than `imgsz` are decoded at a reduced scale.
+
+    A scale is only used when the decoded long side is still at least `imgsz`, so the letterbox resize
+    still downsamples. The model input is resampled differently from a full decode plus resize (DCT
+    scaling instead of interpolation), so its pixels differ slightly.
+    """
+    size = jpeg_size(data) if imgsz else None
+    factor = reduced_decode_factor(*size, imgsz) if size else 1
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), REDUCED_DECODE_FLAGS.get(factor, cv2.IMREAD_COLOR))
+    if image is None:
+        return None
+    if size is None:
+        return DecodedFrame(image, image.shape[1], image.shape[0])
+    width, height = size
+    # EXIF orientation is applied after decoding, so the SOF size may be transposed.
+    if (image.shape[1] >= image.shape[0]) != (width >= height):
+        width, height = height, width
+    return DecodedFrame(image, width, height)
+
+
+def detections_from_result(result: Any, names: np.ndarray | None = None) -> Detections:
+    """Decode an Ultralytics result with a single device-to-host copy instead of one per box."""
+    boxes = getattr(result, "boxes", None)
+    speed = getattr(result, "speed", None)
+    if boxes is None or len(boxes) == 0:
+        return replace(EMPTY_DETECTIONS, names=names, speed=speed)
+    data = boxes.data
+    data = np.asarray(data.cpu().numpy() if hasattr(data, "cpu") else data, dtype=np.float32)
+    # Columns are x1, y1, x2, y2, [track_id,] conf, cls.
+    return Detections(
+        boxes=np.ascontiguousarray(data[:, :4]),
+        scores=np.ascontiguousarray(data[:, -2]),
+        class_ids=data[:, -1].astype(np.int32),
+        names=names,
+        speed=speed,
+    )
+
+
+def filter_detections(detections: Detections, conf: float = 0.0, class_ids: Iterable[int] | None = None) -> Detections:
+    mask = detections.scores >= conf
+    if class_ids is not None:
+        mask &= np.isin(detections.class_ids, np.fromiter(class_ids, dtype=np.int32))
+    return detections if mask.all() else detections.select(mask)
+
+
+def concat_detections(parts: list[Detections]) -> Detections:
+    """Stack detections from several crops of one frame, keeping the first label table present."""
+    if not parts:
+        return EMPTY_DETECTIONS
+    if len(parts) == 1:
+        return parts[0]
+    # Per-image stage times add up: the frame cost is the sum over its crops.
+    speed: dict[str, float] = {}
+    for part in parts:
+        for stage, milliseconds in (part.speed or {}).items():
+            speed[stage] = speed.get(stage, 0.0) + milliseconds
+    return Detections(
+        boxes=np.concatenate([part.boxes for part in parts]).astype(np.float32, copy=False),
+        scores=np.concatenate([part.scores for part in parts]).astype(np.float32, copy=False),
+        class_ids=np.concatenate([part.class_ids for part in parts]).astype(np.int32, copy=False),
+        names=next((part.names for part in parts if part.names is not None), None),
+        speed=speed or None,
+    )
+
+
+def nms_detections(detections: Detections, threshold: float, metric: str = "iou") -> Detections:
+    """Class-aware greedy NMS. `metric="ios"` (intersection over the smaller box) also suppresses
+    boxes a tile edge cut short, which plain IoU misses because the partial box is much smaller.
+    """
+    if len(detections) < 2:
+        return detections
+    order = np.argsort(-detections.scores, kind="stable")
+    boxes = detections.boxes[order].astype(np.float64)
+    class_ids = detections.class_ids[order]
+    areas = np.prod(np.clip(boxes[:, 2:] - boxes[:, :2], 0.0, None), axis=1)
+    suppressed = np.zeros(len(order), dtype=bool)
+    for index in range(len(order)):
+        if suppressed[index]:
+            continue
+        rest = np.arange(index + 1, len(order))
+        rest = rest[~suppressed[rest] & (class_ids[rest] == class_ids[index])]
+        if not rest.size:
+            continue
+        top_left = np.maximum(boxes[index, :2], boxes[rest, :2])
+        bottom_right = np.minimum(boxes[index, 2:], boxes[rest, 2:])
+        intersection = np.prod(np.clip(bottom_right - top_left, 0.0, None), axis=1)
+        if metric == "ios":
+            denominator = np.minimum(areas[index], areas[rest])
+        else:
+            denominator = areas[index] + areas[rest] - intersection
+        overlap = intersection / np.maximum(denominator, 1e-12)
+        suppressed[rest[overlap > threshold]] = True
+    keep = np.sort(order[~suppressed])
+    return detections.select(keep)
+
+
+def tile_origins(width: int, height: int, size: int, overlap: float) -> list[tuple[int, int]]:
+    """Top-left corners of overlapping size x size tiles covering the frame; edge tiles shift inward."""
+
+    def starts(length: int) -> list[int]:
+        if length <= size:
+            return [0]
+        stride = max(1, int(size * (1.0 - overlap)))
+        positions = list(range(0, length - size, stride))
+        return [*positions, length - size]
+
+    return [(x, y) for y in starts(height) for x in starts(width)]
+
+
+def label_table(names: dict[int, str] | list[str]) -> np.ndarray:
+    """Class names as an array indexable by class id."""
+    if isinstance(names, dict):
+        table = np.empty(max(names, default=-1) + 1, dtype=object)
+        for class_id, name in names.items():
+            table[class_id] = str(name)
+        return table
+    return np.asarray([str(name) for name in names], dtype=object)
+
+
+def class_ids_for(names: dict[int, str] | list[str], labels: Iterable[str]) -> list[int]:
+    wanted = set(labels)
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    return [int(class_id) for class_id, name in items if str(name) in wanted]
+
+
+def columnar_detections(
+    detections: Detections,
+    width: int,
+    height: int,
+    precision: str = "f32",
+    binary: bool = False,
+) -> dict[str, object]:
+    """Compact response body: parallel arrays plus a label table for the classes present.
+
+    `boxes` is flat xyxy. With f32/f16 boxes and scores keep their units at that float width;
+    u16 stores boxes normalized to the frame and scores, both scaled to 0..65535. `binary`
+    returns little-endian array bytes (for msgpack) instead of lists.
+    """
+    if precision == "u16":
+        boxes = np.rint(np.clip(detections.normalized_boxes(width, height), 0.0, 1.0) * U16_SCALE).astype("<u2")
+        scores = np.rint(np.clip(detections.scores, 0.0, 1.0) * U16_SCALE).astype("<u2")
+    elif precision in BOX_PRECISIONS:
+        dtype = "<f2" if precision == "f16" else "<f4"
+        boxes = detections.boxes.astype(dtype)
+        scores = detections.scores.astype(dtype)
+    else:
+        raise ValueError(f"Unknown precision {precision!r}. Choose one of: {', '.join(BOX_PRECISIONS)}")
+    class_ids = detections.class_ids.astype("<u2")
+    present = np.unique(class_ids)
+    labels = present.astype(str) if detections.names is None else detections.names[present]
+
+    def pack(values: np.ndarray) -> bytes | list:
+        return values.tobytes() if binary else values.tolist()
+
+    body = {
+        "format": "columnar",
+        "precision": precision,
+        "count": len(detections),
+        "label_table": {str(class_id): str(label) for class_id, label in zip(present.tolist(), labels.tolist())},
+        "boxes": pack(boxes.reshape(-1)),
+        "scores": pack(scores),
+        "class_ids": pack(class_ids),
+    }
+    if detections.track_ids is not None:
+        body["track_ids"] = pack(detections.track_ids.astype("<u4"))
+    return body
+
+
+def predict_detections(model: Any, frames: list[np.ndarray], conf: float, imgsz: int, device: str | None = None) -> list[Detections]:
+    """Run one batched predict over `frames` and return decoded detections per frame."""
+    results = model.predict(frames, conf=conf, imgsz=imgsz, verbose=False, device=device)
+    names = label_table(model.names)
+    return [detections_from_result(result, names) for result in results]
+
+
+def predict_tiled(
+    model: Any,
+    frames: list[np.ndarray],
+    conf: float,
+    imgsz: int,
+    tiling: TileSettings,
+    device: str | None = None,
+) -> list[Detections]:
+    """Run every tile of every frame as one batch, then merge each frame's tiles with cross-tile NMS.
+
+    Tiles are inferred at their native resolution so small objects keep their pixels; with
+    `tiling.full_frame` a regular pass at `imgsz` also runs to catch objects larger than a tile.
+    """
+    crops: list[np.ndarray] = []
+    placements: list[tuple[int, int, int]] = []
+    for frame_index, frame in enumerate(frames):
+        height, width = frame.shape[:2]
+        for x, y in tile_origins(width, height, tiling.size, tiling.overlap):
+            crops.append(frame[y : y + tiling.size, x : x + tiling.size])
+            placements.append((frame_index, x, y))
+
+    parts: list[list[Detections]] = [[] for _ in frames]
+    for (frame_index, x, y), detections in zip(placements, predict_detections(model, crops, conf, tiling.size, device)):
+        parts[frame_index].append(detections.translated(x, y))
+    if tiling.full_frame:
+        for frame_parts, detections in zip(parts, predict_detections(model, frames, conf, imgsz, device)):
+            frame_parts.append(detections)
+    return [nms_detections(concat_detections(frame_parts), TILE_MERGE_IOS, metric="ios") for frame_parts in parts]
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import numpy as np
+
+
+BATCH_WINDOW_ENV_VAR = "ARRAKIS_BATCH_WINDOW_MS"
+MAX_BATCH_ENV_VAR = "ARRAKIS_MAX_BATCH_SIZE"
+WORKERS_ENV_VAR = "ARRAKIS_INFER_WORKERS"
+QUEUE_DEPTH_ENV_VAR = "ARRAKIS_INFER_QUEUE_DEPTH"
+DEFAULT_BATCH_WINDOW_MS = 8.0
+DEFAULT_MAX_BATCH_SIZE = 4
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_DEPTH = 16
+WAIT_SAMPLE_SIZE = 1024
+
+# Decode receives the job's imgsz so it can skip resolution the model would discard; tiled jobs
+# pass None because their tiles run at native resolution.
+DecodeImage = Callable[[bytes, int | None], Any]
+# predict_batch(frames, conf, imgsz, model, tiling)
+PredictBatch = Callable[[list[Any], float, int, str, Any], list[Any]]
+Postprocess = Callable[[Any, Any, float, Any], Any]
+
+
+class SchedulerSaturated(RuntimeError):
+    def __init__(self, queued: int, retry_after_s: int) -> None:
+        super().__init__(f"Inference queue is full ({queued} waiting)")
+        self.queued = queued
+        self.retry_after_s = retry_after_s
+
+
+@dataclass
+class SchedulerSettings:
+    window_ms: float = DEFAULT_BATCH_WINDOW_MS
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    workers: int = DEFAULT_WORKERS
+    queue_depth: int = DEFAULT_QUEUE_DEPTH
+
+
+@dataclass
+class InferenceJob:
+    image_bytes: bytes
+    conf: float
+    imgsz: int
+    model: str
+    options: Any = None
+    tiling: Any = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class InferenceScheduler:
+    """Bounded inference executor that micro-batches concurrent requests by model, imgsz and tiling.
+
+    Jobs carry encoded image bytes; decode, the batched predict and postprocessing all run on the
+    scheduler's own worker threads so that inference never occupies the web server's threadpool.
+    A batch closes when `max_batch_size` jobs are waiting or `window_ms` has passed since the
+    oldest waiting job arrived. Each group runs at the lowest requested conf and `postprocess`
+    receives the job's own conf to re-apply, plus the opaque `options` it was submitted with.
+    `submit` raises `SchedulerSaturated` once `queue_depth` jobs are already waiting.
+
+    A job whose future is cancelled while it waits (e.g. a WebSocket client disconnecting) is dropped
+    when dequeued; once dequeued its future can no longer be cancelled.
+    """
+
+    def __init__(
+        self,
+        decode: DecodeImage,
+        predict_batch: PredictBatch,
+        postprocess: Postprocess,
+        settings: SchedulerSettings,
+    ) -> None:
+        if settings.max_batch_size < 1 or settings.workers < 1 or settings.queue_depth < 1:
+            raise ValueError("max_batch_size, workers and queue_depth must all be >= 1")
+        self._decode = decode
+        self._predict_batch = predict_batch
+        self._postprocess = postprocess
+        self.window_s = max(0.0, settings.window_ms) / 1000.0
+        self.max_batch_size = settings.max_batch_size
+        self.workers = settings.workers
+        self.queue_depth = settings.queue_depth
+        self._pending: deque[InferenceJob] = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._threads: list[threading.Thread] = []
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter[int] = Counter()
+        self._queue_waits_ms: deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._predict_calls = 0
+        self._frames = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._in_flight = 0
+        self._batch_ms_ewma = 0.0
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopped = False
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"inference-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            pending = list(self._pending)
+            self._pending.clear()
+            self._condition.notify_all()
+        for job in pending:
+            if job.future.set_running_or_notify_cancel():
+                _settle(job.future, exception=RuntimeError("Inference scheduler stopped"))
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._threads = []
+
+    def submit(
+        self,
+        image_bytes: bytes,
+        conf: float,
+        imgsz: int,
+        model: str,
+        options: Any = None,
+        tiling: Any = None,
+    ) -> Future:
+        job = InferenceJob(image_bytes=image_bytes, conf=conf, imgsz=imgsz, model=model, options=options, tiling=tiling)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Inference scheduler is not running")
+            queued = len(self._pending)
+            if queued >= self.queue_depth:
+                with self._stats_lock:
+                    self._rejected += 1
+                raise SchedulerSaturated(queued, self._retry_after_s(queued))
+            self._pending.append(job)
+            self._condition.notify_all()
+        with self._stats_lock:
+            self._submitted += 1
+        return job.future
+
+    def stats(self) -> dict[str, object]:
+        with self._stats_lock:
+            waits = np.asarray(self._queue_waits_ms, dtype=np.float64)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            predict_calls = self._predict_calls
+            frames = self._frames
+            counters = {
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "in_flight": self._in_flight,
+            }
+            batch_ms = self._batch_ms_ewma
+        with self._condition:
+            queued = len(self._pending)
+        return {
+            "window_ms": self.window_s * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "queued": queued,
+            **counters,
+            "frames": frames,
+            "predict_calls": predict_calls,
+            "mean_batch_size": frames / predict_calls if predict_calls else 0.0,
+            "batch_size_counts": batch_sizes,
+            "batch_ms_ewma": batch_ms,
+            "queue_wait_ms": {
+                "samples": int(waits.size),
+                "mean": float(waits.mean()) if waits.size else 0.0,
+                "p50": float(np.percentile(waits, 50)) if waits.size else 0.0,
+                "p95": float(np.percentile(waits, 95)) if waits.size else 0.0,
+                "max": float(waits.max()) if waits.size else 0.0,
+            },
+        }
+
+    def _retry_after_s(self, queued: int) -> int:
+        with self._stats_lock:
+            batch_ms = self._batch_ms_ewma
+        batches_ahead = math.ceil((queued + 1) / (self.max_batch_size * self.workers))
+        return max(1, math.ceil(batches_ahead * batch_ms / 1000.0))
+
+    def _collect_batch(self) -> list[InferenceJob]:
+        with self._condition:
+            while not self._pending and not self._stopped:
+                self._condition.wait()
+            if self._stopped:
+                return []
+
+            deadline = self._pending[0].enqueued_at + self.window_s
+            while 0 < len(self._pending) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch_size = min(len(self._pending), self.max_batch_size)
+            popped = [self._pending.popleft() for _ in range(batch_size)]
+        # Marks each future running so it can no longer be cancelled; cancelled ones are skipped.
+        batch = [job for job in popped if job.future.set_running_or_notify_cancel()]
+        if len(batch) < len(popped):
+            with self._stats_lock:
+                self._cancelled += len(popped) - len(batch)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                if self._stopped:
+                    return
+                continue
+
+            with self._stats_lock:
+                self._in_flight += len(batch)
+            try:
+                self._run_batch(batch)
+            except Exception as exc:
+                # A worker must outlive any single batch; settle whatever the batch left unsettled.
+                self._fail([job for job in batch if not job.future.done()], exc)
+            finally:
+                with self._stats_lock:
+                    self._in_flight -= len(batch)
+
+    def _run_batch(self, batch: list[InferenceJob]) -> None:
+        started_at = time.perf_counter()
+        with self._stats_lock:
+            self._queue_waits_ms.extend((started_at - job.enqueued_at) * 1000.0 for job in batch)
+
+        groups: dict[tuple[str, int, Any], list[tuple[InferenceJob, Any]]] = {}
+        for job in batch:
+            try:
+                frame = self._decode(job.image_bytes, None if job.tiling else job.imgsz)
+            except Exception as exc:
+                self._fail([job], exc)
+                continue
+            groups.setdefault((job.model, job.imgsz, job.tiling), []).append((job, frame))
+
+        for (model, imgsz, tiling), decoded in groups.items():
+            self._run_group(model, imgsz, tiling, decoded)
+
+        elapsed_ms = (time.perf_counter() - started_at) * 1000.0
+        with self._stats_lock:
+            self._batch_ms_ewma = elapsed_ms if self._batch_ms_ewma == 0.0 else 0.8 * self._batch_ms_ewma + 0.2 * elapsed_ms
+
+    def _run_group(self, model: str, imgsz: int, tiling: Any, decoded: list[tuple[InferenceJob, Any]]) -> None:
+        jobs = [job for job, _ in decoded]
+        frames = [frame for _, frame in decoded]
+        with self._stats_lock:
+            self._predict_calls += 1
+            self._frames += len(jobs)
+            self._batch_sizes[len(jobs)] += 1
+
+        try:
+            results = self._predict_batch(frames, min(job.conf for job in jobs), imgsz, model, tiling)
+            if len(results) != len(jobs):
+                raise RuntimeError(f"Batched predict returned {len(results)} results for {len(jobs)} frames")
+        except Exception as exc:
+            self._fail(jobs, exc)
+            return
+
+        for job, frame, result in zip(jobs, frames, results):
+            try:
+                response = self._postprocess(frame, result, job.conf, job.options)
+            except Exception as exc:
+                self._fail([job], exc)
+            else:
+                _settle(job.future, result=response)
+
+    def _fail(self, jobs: list[InferenceJob], exc: Exception) -> None:
+        with self._stats_lock:
+            self._failed += len(jobs)
+        for job in jobs:
+            _settle(job.future, exception=exc)
+
+
+def _settle(future: Future, result: Any = None, exception: BaseException | None = None) -> None:
+    """Complete `future` unless something else already did; never raises."""
+    if future.done():
+        return
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def scheduler_settings_from_env() -> SchedulerSettings:
+    return SchedulerSettings(
+        window_ms=float(os.getenv(BATCH_WINDOW_ENV_VAR, str(DEFAULT_BATCH_WINDOW_MS))),
+        max_batch_size=max(1, int(os.getenv(MAX_BATCH_ENV_VAR, str(DEFAULT_MAX_BATCH_SIZE)))),
+        workers=max(1, int(os.getenv(WORKERS_ENV_VAR, str(DEFAULT_WORKERS)))),
+        queue_depth=max(1, int(os.getenv(QUEUE_DEPTH_ENV_VAR, str(DEFAULT_QUEUE_DEPTH)))),
+    )
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import io
+import json
 import os
 import shutil
+import time
 import zipfile
-from pathlib import Path
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path, PurePosixPath
 
+import numpy as np
 import yaml
 from PIL import Image
 from ultralytics import YOLO
+from ultralytics.models.yolo.detect import DetectionTrainer
+
+from image_store import STORE_SUFFIX, ImageStore, build_image_store, open_image_store
+from inference_core import jpeg_size
 
 
 KAGGLE_INPUT_ROOT = Path("/kaggle/input")
@@ -22,6 +34,13 @@ ZIP_NAMES = {
     "test": "VisDrone2019-DET-test-dev.zip",
 }
 IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+# JPEG SOF markers normally sit within the first few KiB; EXIF blocks are capped at 64 KiB.
+IMAGE_HEADER_BYTES = 1 << 16
+# Annotation / label files handed to each pool worker per task.
+PREP_CHUNKSIZE = 64
+BUILD_MANIFEST_NAME = ".arrakis_build.json"
+# Bump whenever conversion or merge output changes so existing builds are redone.
+DATASET_BUILD_VERSION = 2
 
 MERGED_NAMES = {
     0: "person",
@@ -40,6 +59,7 @@ CLASS_MAP = {
     8: 1,  # bus -> vehicle
     9: 1,  # motor -> vehicle
 }
+CLASS_LOOKUP = np.array([CLASS_MAP.get(class_id, -1) for class_id in range(max(CLASS_MAP) + 1)], dtype=np.int64)
 
 
 def parse_args() -> argparse.Namespace:
@@ -77,10 +97,22 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--workers", type=int, default=4, help="Dataloader workers.")
     parser.add_argument("--device", type=str, default="0", help="Kaggle GPU device ids, e.g. 0 or 0,1.")
     parser.add_argument("--patience", type=int, default=20, help="Early stopping patience.")
-    parser.add_argument("--cache", action="store_true", help="Enable image caching.")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--cache", action="store_true", help="Enable Ultralytics' per-process image caching.")
+    cache_group.add_argument(
+        "--image-store",
+        type=Path,
+        help="Directory for memory-mapped stores of the resized train/val images, shared by every dataloader worker.",
+    )
     parser.add_argument("--save-period", type=int, default=1, help="Save a checkpoint every N epochs.")
     parser.add_argument("--seed", type=int, default=42, help="Random seed.")
     parser.add_argument("--exist-ok", action="store_true", help="Reuse an existing run directory.")
+    parser.add_argument(
+        "--prep-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used to convert annotations and merge labels.",
+    )
     return parser.parse_args()
 
 
@@ -128,8 +160,11 @@ def print_split_counts(title: str, counts: dict[str, dict[str, int]]) -> None:
         print(f"  {split}: images={split_counts['images']}, labels={split_counts['labels']}, nonempty_labels={split_counts['nonempty_labels']}")
 
 
-def validate_nonempty_training_data(data_root: Path, dataset_name: str) -> dict[str, dict[str, int]]:
-    counts = collect_split_counts(data_root)
+def validate_nonempty_training_data(
+    data_root: Path, dataset_name: str, counts: dict[str, dict[str, int]] | None = None
+) -> dict[str, dict[str, int]]:
+    """Check every split has images and labeled boxes; `counts` skips the directory scan when already known."""
+    counts = counts or collect_split_counts(data_root)
     print_split_counts(f"{dataset_name} counts:", counts)
 
     missing_images = [split for split, split_counts in counts.items() if split_counts["images"] == 0]
@@ -172,22 +207,142 @@ def remove_path(path: Path) -> None:
         shutil.rmtree(path)
 
 
-def link_or_copy_images(source_dir: Path, dest_dir: Path) -> int:
-    """Create hardlinks (or copies) of images, avoiding symlinks that confuse YOLO label derivation."""
+def link_or_copy_images(source_dir: Path, dest_dir: Path) -> tuple[int, int]:
+    """Create hardlinks (or copies) of images, avoiding symlinks that confuse YOLO label derivation.
+
+    Up-to-date destination images are kept and ones no longer in `source_dir` are removed.
+    Returns (images linked or copied, images in the split).
+    """
     source_dir = source_dir.resolve()
     dest_dir.mkdir(parents=True, exist_ok=True)
     count = 0
+    names: set[str] = set()
     for img_file in sorted(source_dir.iterdir()):
         if img_file.is_file() and img_file.suffix.lower() in IMAGE_SUFFIXES:
+            names.add(img_file.name)
             dest_file = dest_dir / img_file.name
             if dest_file.exists():
-                continue
+                if image_is_current(img_file, dest_file):
+                    continue
+                dest_file.unlink()
             try:
                 os.link(img_file, dest_file)
             except OSError:
                 shutil.copy2(img_file, dest_file)
             count += 1
-    return count
+    for dest_file in dest_dir.iterdir():
+        if dest_file.name not in names:
+            remove_path(dest_file)
+    return count, len(names)
+
+
+def image_is_current(source_file: Path, dest_file: Path) -> bool:
+    """True when `dest_file` is a hardlink of `source_file`, or a copy with matching size and mtime."""
+    if os.path.samefile(source_file, dest_file):
+        return True
+    return stat_signature(source_file) == stat_signature(dest_file)
+
+
+def stat_signature(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def fingerprint_file(
+    path: Path, previous: dict[str, object] | None, dependency: Path | None = None
+) -> dict[str, object]:
+    """Content hash of a small source file; `previous` is reused while the file's size and mtime match it.
+
+    Other fields of `previous` are carried over, so a touched but unchanged file keeps its recorded outputs.
+    `dependency` (such as the image an annotation is normalized by) is tracked by size and mtime only.
+    """
+    signature = stat_signature(path)
+    if previous is not None and previous.get("stat") == signature and "digest" in previous:
+        entry = dict(previous)
+    else:
+        entry = {**(previous or {}), "stat": signature, "digest": f"sha256:{hashlib.sha256(path.read_bytes()).hexdigest()}"}
+    if dependency is not None:
+        entry["depends"] = stat_signature(dependency)
+    return entry
+
+
+def fingerprint_zip_member(
+    info: zipfile.ZipInfo, previous: dict[str, object] | None, dependency: zipfile.ZipInfo | None = None
+) -> dict[str, object]:
+    """Fingerprint of an archive member from its stored CRC-32, without reading it."""
+    entry = {**(previous or {}), "stat": [info.file_size], "digest": f"crc32:{info.CRC:08x}"}
+    if dependency is not None:
+        entry["depends"] = [dependency.file_size, dependency.CRC]
+    return entry
+
+
+def build_key(stage: str, source: Path) -> str:
+    """Identity of a build stage's inputs other than the files themselves; a new key rebuilds the split."""
+    payload = {
+        "stage": stage,
+        "version": DATASET_BUILD_VERSION,
+        "class_map": CLASS_MAP,
+        "names": MERGED_NAMES,
+        "source": str(source),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_build_manifest(root: Path) -> dict[str, object]:
+    try:
+        return json.loads((root / BUILD_MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_build_manifest(root: Path, manifest: dict[str, object]) -> None:
+    path = root / BUILD_MANIFEST_NAME
+    staged = path.with_name(f"{path.name}.tmp")
+    staged.write_text(json.dumps(manifest), encoding="utf-8")
+    staged.replace(path)
+
+
+def plan_split_update(
+    manifest: dict[str, object],
+    split: str,
+    key: str,
+    outputs_dir: Path,
+    names: Iterable[str],
+    fingerprint: Callable[[str, dict[str, object] | None], dict[str, object]],
+) -> tuple[dict[str, dict[str, object]], list[str], int]:
+    """Fingerprint a split's sources against the manifest and drop outputs whose source is gone.
+
+    Each output in `outputs_dir` is named like its source; `fingerprint(name, previous_entry)` returns
+    the source's new manifest entry. Returns the per-file entries, the names whose outputs must be
+    rebuilt, and how many outputs were removed. A split built under a different key, or never recorded,
+    has its outputs cleared and is rebuilt in full.
+    """
+    names = list(names)
+    previous = manifest.get(split)
+    if not isinstance(previous, dict) or previous.get("key") != key:
+        prepare_clean_dir(outputs_dir)
+        previous_files: dict[str, dict[str, object]] = {}
+        removed = 0
+    else:
+        previous_files = previous["files"]
+        stale = previous_files.keys() - set(names)
+        for name in stale:
+            (outputs_dir / name).unlink(missing_ok=True)
+        removed = len(stale)
+
+    entries: dict[str, dict[str, object]] = {}
+    changed: list[str] = []
+    for name in names:
+        old = previous_files.get(name)
+        entry = entries[name] = fingerprint(name, old)
+        if (
+            old is None
+            or old.get("digest") != entry.get("digest")
+            or old.get("depends") != entry.get("depends")
+            or not (outputs_dir / name).exists()
+        ):
+            changed.append(name)
+    return entries, changed, removed
 
 
 def delete_yolo_cache_files(root: Path) -> None:
@@ -228,12 +383,6 @@ def verify_label_mapping(data_root: Path, split: str = "train", sample_size: int
             print(f"    WARN resolved label: {resolved_label} (exists={Path(resolved_label).exists()})")
 
 
-def prepare_merged_root(merged_root: Path) -> None:
-    merged_root.mkdir(parents=True, exist_ok=True)
-    remove_path(merged_root / "images")
-    remove_path(merged_root / "labels")
-
-
 def _has_label_files(labels_dir: Path) -> bool:
     return labels_dir.is_dir() and any(labels_dir.glob("*.txt"))
 
@@ -284,12 +433,81 @@ def prepare_clean_dir(path: Path) -> Path:
     return path
 
 
-def find_image_for_annotation(images_dir: Path, stem: str) -> Path | None:
-    for suffix in IMAGE_SUFFIXES:
-        candidate = images_dir / f"{stem}{suffix}"
-        if candidate.exists():
-            return candidate
-    return None
+def index_images(images_dir: Path) -> dict[str, Path]:
+    """Image path by stem, preferring suffixes in IMAGE_SUFFIXES order."""
+    images: dict[str, Path] = {}
+    for path in images_dir.iterdir():
+        suffix = path.suffix.lower()
+        if suffix not in IMAGE_SUFFIXES:
+            continue
+        current = images.get(path.stem)
+        if current is None or IMAGE_SUFFIXES.index(suffix) < IMAGE_SUFFIXES.index(current.suffix.lower()):
+            images[path.stem] = path
+    return images
+
+
+def read_image_size(image_path: Path) -> tuple[int, int]:
+    """(width, height) from the JPEG SOF header; other formats fall back to PIL."""
+    with image_path.open("rb") as image_file:
+        size = jpeg_size(image_file.read(IMAGE_HEADER_BYTES))
+    if size is None:
+        with Image.open(image_path) as image:
+            size = image.size
+    return size
+
+
+def parse_visdrone_annotations(text: str) -> np.ndarray:
+    """(N, 6) float array of x, y, w, h, score, category rows; malformed rows are dropped."""
+    rows = [line.replace(",", " ").split() for line in text.splitlines() if line.strip()]
+    columns = {len(row) for row in rows}
+    if len(columns) == 1 and min(columns) >= 6:
+        return np.array(rows, dtype=np.float64)[:, :6]
+    # Ragged files: a matching token total does not mean aligned rows, so keep the complete rows one by one.
+    return np.array([row[:6] for row in rows if len(row) >= 6], dtype=np.float64).reshape(-1, 6)
+
+
+def format_yolo_labels(class_ids: np.ndarray, boxes: np.ndarray) -> str:
+    if not len(class_ids):
+        return ""
+    buffer = io.StringIO()
+    np.savetxt(buffer, np.column_stack([class_ids, boxes]), fmt="%d %.6f %.6f %.6f %.6f")
+    return buffer.getvalue()
+
+
+def convert_annotation_file(ann_file: Path, image_path: Path, labels_dir: Path) -> int:
+    """Write the YOLO label for one VisDrone annotation file; returns the number of boxes kept."""
+    image_width, image_height = read_image_size(image_path)
+    return write_yolo_label(ann_file.read_text(encoding="utf-8"), image_width, image_height, labels_dir / ann_file.name)
+
+
+def write_yolo_label(text: str, image_width: int, image_height: int, label_path: Path) -> int:
+    """Convert VisDrone annotation text to a YOLO label file; returns the number of boxes kept."""
+    rows = parse_visdrone_annotations(text) if text.strip() else np.zeros((0, 6))
+
+    # Integer truncation matches the annotation tool's pixel grid; score 0 marks ignored regions.
+    x, y, w, h = rows[:, :4].astype(np.int64).T
+    class_ids = rows[:, 5].astype(np.int64) - 1
+    x1 = np.maximum(x, 0)
+    y1 = np.maximum(y, 0)
+    x2 = np.minimum(x + w, image_width)
+    y2 = np.minimum(y + h, image_height)
+    keep = (rows[:, 4] != 0) & (class_ids >= 0) & (class_ids <= 9) & (x2 > x1) & (y2 > y1)
+
+    x1, y1, x2, y2 = x1[keep], y1[keep], x2[keep], y2[keep]
+    w_clamped = x2 - x1
+    h_clamped = y2 - y1
+    dw = 1.0 / image_width
+    dh = 1.0 / image_height
+    boxes = np.column_stack(
+        [(x1 + w_clamped / 2) * dw, (y1 + h_clamped / 2) * dh, w_clamped * dw, h_clamped * dh]
+    )
+    label_path.write_text(format_yolo_labels(class_ids[keep], boxes), encoding="utf-8")
+    return int(keep.sum())
+
+
+def print_throughput(action: str, files: int, boxes: int, elapsed_s: float) -> None:
+    rate = files / elapsed_s if elapsed_s > 0 else float("inf")
+    print(f"{action}: {files} files, {boxes} boxes in {elapsed_s:.2f}s ({rate:.0f} files/s)")
 
 
 def _unwrap_nested_dir(source_dir: Path) -> Path:
@@ -303,7 +521,13 @@ def _unwrap_nested_dir(source_dir: Path) -> Path:
     return source_dir
 
 
-def convert_visdrone_det_split(source_dir: Path, split_name: str, out_root: Path) -> None:
+def convert_visdrone_det_split(
+    source_dir: Path, split_name: str, out_root: Path, workers: int = 1, manifest: dict[str, object] | None = None
+) -> bool:
+    """Write YOLO labels for one raw split; returns whether any label changed.
+
+    With a `manifest`, only annotations whose content or image changed since the recorded build are converted.
+    """
     source_dir = _unwrap_nested_dir(source_dir)
     source_images = source_dir / "images"
     if not source_images.is_dir():
@@ -326,46 +550,189 @@ def convert_visdrone_det_split(source_dir: Path, split_name: str, out_root: Path
     ensure_symlink(source_images, images_link)
     labels_dir.mkdir(parents=True, exist_ok=True)
 
-    for ann_file in sorted(annotations_dir.glob("*.txt")):
-        image_path = find_image_for_annotation(images_link, ann_file.stem)
-        if image_path is None:
-            continue
+    images = index_images(source_images)
+    annotations = {
+        ann_file.name: ann_file for ann_file in sorted(annotations_dir.glob("*.txt")) if ann_file.stem in images
+    }
+    sources = {name: images[ann_file.stem] for name, ann_file in annotations.items()}
+    manifest = {} if manifest is None else manifest
+    key = build_key("convert", source_dir)
+    entries, changed, removed = plan_split_update(
+        manifest,
+        split_name,
+        key,
+        labels_dir,
+        annotations,
+        lambda name, previous: fingerprint_file(annotations[name], previous, sources[name]),
+    )
 
-        with Image.open(image_path) as image:
-            image_width, image_height = image.size
+    started_at = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        kept = executor.map(
+            convert_annotation_file,
+            [annotations[name] for name in changed],
+            [sources[name] for name in changed],
+            repeat(labels_dir),
+            chunksize=PREP_CHUNKSIZE,
+        )
+        for name, boxes in zip(changed, kept):
+            entries[name]["boxes"] = boxes
+    print_throughput(
+        f"Converted {split_name} annotations ({len(entries) - len(changed)} unchanged, {removed} removed)",
+        len(changed),
+        sum(entries[name]["boxes"] for name in changed),
+        time.perf_counter() - started_at,
+    )
+    manifest[split_name] = {"key": key, "files": entries}
+    return bool(changed or removed)
 
-        dw = 1.0 / image_width
-        dh = 1.0 / image_height
-        yolo_lines: list[str] = []
 
-        for raw_line in ann_file.read_text(encoding="utf-8").splitlines():
-            row = [value.strip() for value in raw_line.strip().split(",")]
-            if len(row) < 6 or row[4] == "0":
-                continue
+_open_archives: dict[str, zipfile.ZipFile] = {}
+
+
+def open_archive(zip_path: Path) -> zipfile.ZipFile:
+    """Per-process archive handle, so pool workers read the central directory once rather than per task."""
+    archive = _open_archives.get(str(zip_path))
+    if archive is None:
+        archive = _open_archives[str(zip_path)] = zipfile.ZipFile(zip_path)
+    return archive
+
+
+def extract_member(archive: zipfile.ZipFile, member: str, destination: Path) -> None:
+    staged = destination.with_name(f"{destination.name}.part")
+    with archive.open(member) as source, staged.open("wb") as target:
+        shutil.copyfileobj(source, target, 1 << 20)
+    staged.replace(destination)
 
-            x, y, w, h = (int(float(v)) for v in row[:4])
-            class_id = int(float(row[5])) - 1
-            if class_id < 0 or class_id > 9:
-                continue
 
-            x1 = max(0, x)
-            y1 = max(0, y)
-            x2 = min(image_width, x + w)
-            y2 = min(image_height, y + h)
-            if x2 <= x1 or y2 <= y1:
+def read_member_image_size(archive: zipfile.ZipFile, member: str) -> tuple[int, int]:
+    """(width, height) from the first bytes of an archived image; other formats fall back to PIL."""
+    with archive.open(member) as image_file:
+        size = jpeg_size(image_file.read(IMAGE_HEADER_BYTES))
+    if size is None:
+        with archive.open(member) as image_file, Image.open(image_file) as image:
+            size = image.size
+    return size
+
+
+def convert_zip_annotation(
+    zip_path: Path, ann_member: str, image_member: str, labels_dir: Path, images_dir: Path, extract_image: bool
+) -> int:
+    """Write one YOLO label straight from the archive; the image is extracted only when `extract_image`."""
+    archive = open_archive(zip_path)
+    if extract_image:
+        image_path = images_dir / PurePosixPath(image_member).name
+        extract_member(archive, image_member, image_path)
+        image_width, image_height = read_image_size(image_path)
+    else:
+        image_width, image_height = read_member_image_size(archive, image_member)
+    text = archive.read(ann_member).decode("utf-8")
+    return write_yolo_label(text, image_width, image_height, labels_dir / PurePosixPath(ann_member).name)
+
+
+def index_zip_split(zip_path: Path) -> tuple[dict[str, zipfile.ZipInfo], dict[str, zipfile.ZipInfo]]:
+    """Image members by stem and annotation members by file name, at any nesting depth in the archive."""
+    images: dict[str, zipfile.ZipInfo] = {}
+    annotations: dict[str, zipfile.ZipInfo] = {}
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            member = PurePosixPath(info.filename)
+            if info.is_dir():
                 continue
-            w_clamped = x2 - x1
-            h_clamped = y2 - y1
-            x_center = (x1 + w_clamped / 2) * dw
-            y_center = (y1 + h_clamped / 2) * dh
-            w_norm = w_clamped * dw
-            h_norm = h_clamped * dh
-            yolo_lines.append(f"{class_id} {x_center:.6f} {y_center:.6f} {w_norm:.6f} {h_norm:.6f}")
+            if member.parent.name == "images" and member.suffix.lower() in IMAGE_SUFFIXES:
+                images.setdefault(member.stem, info)
+            elif member.parent.name == "annotations" and member.suffix == ".txt":
+                annotations[member.name] = info
+    return images, annotations
+
+
+def convert_visdrone_det_zip(
+    zip_path: Path, split_name: str, out_root: Path, workers: int = 1, manifest: dict[str, object] | None = None
+) -> bool:
+    """Write YOLO labels for one raw split directly from its zip; returns whether any label changed.
+
+    Only images that have an annotation are extracted, and only when they are missing or their archive
+    member changed, so a re-run touches nothing on disk for unchanged data.
+    """
+    images, annotations = index_zip_split(zip_path)
+    if not annotations:
+        raise FileNotFoundError(
+            f"No VisDrone annotations found in {zip_path}\n"
+            "Use a dataset with VisDrone-DET annotation files, or supply pre-converted YOLO labels via --data-root."
+        )
+    annotations = {name: info for name, info in sorted(annotations.items()) if PurePosixPath(name).stem in images}
+    sources = {name: images[PurePosixPath(name).stem] for name in annotations}
+    image_names = {name: PurePosixPath(info.filename).name for name, info in sources.items()}
+
+    images_dir = out_root / "images" / split_name
+    labels_dir = out_root / "labels" / split_name
+    if images_dir.is_symlink():
+        images_dir.unlink()
+    images_dir.mkdir(parents=True, exist_ok=True)
+    labels_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {} if manifest is None else manifest
+    key = build_key("convert", zip_path)
+    previous = manifest.get(split_name)
+    previous_files = previous["files"] if isinstance(previous, dict) and previous.get("key") == key else {}
+    entries, changed, removed = plan_split_update(
+        manifest,
+        split_name,
+        key,
+        labels_dir,
+        annotations,
+        lambda name, previous_entry: fingerprint_zip_member(annotations[name], previous_entry, sources[name]),
+    )
+    missing = {name for name in entries if not (images_dir / image_names[name]).exists()}
+    changed = sorted(set(changed) | missing)
+    extract = [
+        name in missing or previous_files.get(name, {}).get("depends") != entries[name]["depends"] for name in changed
+    ]
+    wanted = set(image_names.values())
+    for image_file in images_dir.iterdir():
+        if image_file.name not in wanted:
+            remove_path(image_file)
+
+    started_at = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        kept = executor.map(
+            convert_zip_annotation,
+            repeat(zip_path),
+            [annotations[name].filename for name in changed],
+            [sources[name].filename for name in changed],
+            repeat(labels_dir),
+            repeat(images_dir),
+            extract,
+            chunksize=PREP_CHUNKSIZE,
+        )
+        for name, boxes in zip(changed, kept):
+            entries[name]["boxes"] = boxes
+    print_throughput(
+        f"Converted {split_name} annotations from {zip_path.name} "
+        f"({len(entries) - len(changed)} unchanged, {removed} removed, {sum(extract)} images extracted)",
+        len(changed),
+        sum(entries[name]["boxes"] for name in changed),
+        time.perf_counter() - started_at,
+    )
+    manifest[split_name] = {"key": key, "files": entries}
+    return bool(changed or removed)
+
 
-        payload = "\n".join(yolo_lines)
-        if payload:
-            payload += "\n"
-        (labels_dir / ann_file.name).write_text(payload, encoding="utf-8")
+def extract_zip_images(zip_path: Path, images_dir: Path) -> int:
+    """Extract a split's images that are missing or differ in size; returns how many were written."""
+    if images_dir.is_symlink():
+        images_dir.unlink()
+    images_dir.mkdir(parents=True, exist_ok=True)
+    images, _ = index_zip_split(zip_path)
+    count = 0
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in images.values():
+            destination = images_dir / PurePosixPath(info.filename).name
+            if destination.exists() and destination.stat().st_size == info.file_size:
+                continue
+            extract_member(archive, info.filename, destination)
+            count += 1
+    return count
 
 
 def prepare_yolo_data_root(args: argparse.Namespace) -> Path:
@@ -385,80 +752,198 @@ def prepare_yolo_data_root(args: argparse.Namespace) -> Path:
         validate_visdrone_root(detected_root)
         return detected_root.resolve()
 
-    converted_yolo_root = prepare_clean_dir(args.converted_yolo_root.resolve())
+    converted_yolo_root = args.converted_yolo_root.resolve()
+    converted_yolo_root.mkdir(parents=True, exist_ok=True)
 
+    manifest = load_build_manifest(converted_yolo_root)
     if detected_format == "raw_zip":
-        extracted_raw_root = prepare_clean_dir(KAGGLE_WORKING_ROOT / "visdrone_raw")
-        for split_key in ("train", "val", "test"):
+        # Read the archives in place: no extraction pass, and only annotated images ever land on disk.
+        for split_key in ("train", "val"):
             zip_path = detected_root / ZIP_NAMES[split_key]
-            if zip_path.exists():
-                print(f"Extracting {zip_path} -> {extracted_raw_root}")
-                with zipfile.ZipFile(zip_path, "r") as zip_file:
-                    zip_file.extractall(extracted_raw_root, filter="data")
-        raw_root = extracted_raw_root
+            convert_visdrone_det_zip(zip_path, split_key, converted_yolo_root, args.prep_workers, manifest)
+        test_zip = detected_root / ZIP_NAMES["test"]
+        if test_zip.exists():
+            count = extract_zip_images(test_zip, converted_yolo_root / "images" / "test")
+            print(f"Extracted {count} test images from {test_zip.name}")
     else:
         raw_root = detected_root.resolve()
-
-    convert_visdrone_det_split(raw_root / RAW_TRAIN_DIR_NAME, "train", converted_yolo_root)
-    convert_visdrone_det_split(raw_root / RAW_VAL_DIR_NAME, "val", converted_yolo_root)
-
-    for test_dir_name in RAW_TEST_DIR_NAMES:
-        test_dir = raw_root / test_dir_name
-        if test_dir.exists():
-            ensure_symlink(test_dir / "images", converted_yolo_root / "images" / "test")
-            break
+        convert_visdrone_det_split(raw_root / RAW_TRAIN_DIR_NAME, "train", converted_yolo_root, args.prep_workers, manifest)
+        convert_visdrone_det_split(raw_root / RAW_VAL_DIR_NAME, "val", converted_yolo_root, args.prep_workers, manifest)
+        for test_dir_name in RAW_TEST_DIR_NAMES:
+            test_dir = raw_root / test_dir_name
+            if test_dir.exists():
+                ensure_symlink(test_dir / "images", converted_yolo_root / "images" / "test")
+                break
+    save_build_manifest(converted_yolo_root, manifest)
 
     validate_visdrone_root(converted_yolo_root)
     print(f"Converted raw VisDrone into YOLO format: {converted_yolo_root}")
     return converted_yolo_root
 
 
-def merge_label_file(source_file: Path, destination_file: Path) -> None:
-    merged_lines: list[str] = []
-
-    if source_file.exists():
-        for raw_line in source_file.read_text(encoding="utf-8").splitlines():
-            line = raw_line.strip()
-            if not line:
-                continue
-            parts = line.split()
-            class_id = int(float(parts[0]))
-            mapped_class = CLASS_MAP.get(class_id)
-            if mapped_class is None:
-                continue
-            merged_lines.append(" ".join([str(mapped_class), *parts[1:5]]))
+def split_label_table(text: str) -> np.ndarray:
+    """(N, 5) string array of a YOLO label's class and box columns."""
+    rows = [line.split() for line in text.splitlines() if line.strip()]
+    if all(len(row) == 5 for row in rows):
+        return np.array(rows).reshape(-1, 5)
+    # Rows with extra columns (e.g. segment points) keep only the box; truncated rows are dropped.
+    return np.array([row[:5] for row in rows if len(row) >= 5]).reshape(-1, 5)
+
+
+def merge_label_file(source_file: Path, destination_file: Path) -> int:
+    """Rewrite one YOLO label with CLASS_MAP applied; returns the number of boxes kept.
+
+    Coordinates are copied as text so merged labels keep the source precision.
+    """
+    text = source_file.read_text(encoding="utf-8") if source_file.exists() else ""
+    payload = ""
+    kept = 0
+    if text.strip():
+        table = split_label_table(text)
+        class_ids = table[:, 0].astype(np.float64).astype(np.int64)
+        in_range = (class_ids >= 0) & (class_ids < len(CLASS_LOOKUP))
+        mapped = np.where(in_range, CLASS_LOOKUP[np.where(in_range, class_ids, 0)], -1)
+        keep = mapped >= 0
+        table = table[keep]
+        table[:, 0] = mapped[keep].astype(str)
+        kept = len(table)
+        payload = "".join(f"{' '.join(row)}\n" for row in table.tolist())
 
     destination_file.parent.mkdir(parents=True, exist_ok=True)
-    payload = "\n".join(merged_lines)
-    if payload:
-        payload += "\n"
     destination_file.write_text(payload, encoding="utf-8")
+    return kept
 
 
-def build_merged_dataset(data_root: Path, merged_root: Path) -> Path:
+def build_merged_dataset(data_root: Path, merged_root: Path, workers: int = 1) -> tuple[Path, bool]:
+    """Incrementally build the person/vehicle dataset; returns its root and whether anything changed.
+
+    The build manifest in `merged_root` records each source label's hash, the class map and the build
+    version, plus split counts for `validate_nonempty_training_data`. Unchanged labels are not rewritten.
+    """
     merged_root = merged_root.resolve()
-    prepare_merged_root(merged_root)
+    merged_root.mkdir(parents=True, exist_ok=True)
+    manifest = load_build_manifest(merged_root)
+    key = build_key("merge", data_root)
+    source_counts: dict[str, dict[str, int]] = {}
+    merged_counts: dict[str, dict[str, int]] = {}
+    updated = False
 
     for split in ("train", "val"):
         src_images = data_root / "images" / split
-        n = link_or_copy_images(src_images, merged_root / "images" / split)
-        print(f"Linked/copied {n} images for {split} split")
+        linked, image_count = link_or_copy_images(src_images, merged_root / "images" / split)
+        print(f"Linked/copied {linked} images for {split} split ({image_count - linked} already current)")
 
         source_labels_dir = data_root / "labels" / split
         destination_labels_dir = merged_root / "labels" / split
         destination_labels_dir.mkdir(parents=True, exist_ok=True)
 
-        for label_file in source_labels_dir.glob("*.txt"):
-            merge_label_file(label_file, destination_labels_dir / label_file.name)
+        sources = {label_file.name: label_file for label_file in sorted(source_labels_dir.glob("*.txt"))}
+        entries, changed, removed = plan_split_update(
+            manifest,
+            split,
+            key,
+            destination_labels_dir,
+            sources,
+            lambda name, previous: fingerprint_file(sources[name], previous),
+        )
+        started_at = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+            kept = executor.map(
+                merge_label_file,
+                [sources[name] for name in changed],
+                [destination_labels_dir / name for name in changed],
+                chunksize=PREP_CHUNKSIZE,
+            )
+            for name, boxes in zip(changed, kept):
+                entries[name]["boxes"] = boxes
+        print_throughput(
+            f"Merged {split} labels ({len(entries) - len(changed)} unchanged, {removed} removed)",
+            len(changed),
+            sum(entries[name]["boxes"] for name in changed),
+            time.perf_counter() - started_at,
+        )
+        manifest[split] = {"key": key, "files": entries}
+        updated = updated or bool(linked or changed or removed)
+
+        source_counts[split] = {
+            "images": image_count,
+            "labels": len(entries),
+            "nonempty_labels": sum(1 for entry in entries.values() if entry["stat"][0] > 0),
+        }
+        merged_counts[split] = {
+            **source_counts[split],
+            "nonempty_labels": sum(1 for entry in entries.values() if entry["boxes"] > 0),
+        }
 
     test_images_dir = data_root / "images" / "test"
     if test_images_dir.exists():
         ensure_symlink(test_images_dir, merged_root / "images" / "test")
 
-    return merged_root
+    manifest["counts"] = {"source": source_counts, "merged": merged_counts}
+    save_build_manifest(merged_root, manifest)
+    return merged_root, updated
+
+
+def build_image_stores(data_root: Path, store_dir: Path, imgsz: int, workers: int = 1) -> dict[str, str]:
+    """Pack each split's images into `<store_dir>/<split>-<imgsz>.u8`; unchanged splits keep their store."""
+    stores = {}
+    for split in ("train", "val"):
+        images_dir = data_root / "images" / split
+        image_paths = sorted(path for path in images_dir.iterdir() if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES)
+        store_path = store_dir.resolve() / f"{split}-{imgsz}{STORE_SUFFIX}"
+        started_at = time.perf_counter()
+        store = build_image_store(image_paths, store_path, imgsz, workers)
+        elapsed_s = time.perf_counter() - started_at
+        print(f"Image store {store_path}: {len(store)} images, {store.data.nbytes / (1 << 30):.2f} GiB ({elapsed_s:.1f}s)")
+        stores[split] = str(store_path)
+    return stores
+
+
+class ImageStoreLoader:
+    """Stands in for a YOLODataset's load_image, reading resized pixels from an ImageStore instead of decoding.
+
+    Images missing from the store, and non-rect loads, fall through to the dataset's own decoder.
+    """
+
+    def __init__(self, dataset, store: ImageStore) -> None:
+        self.dataset = dataset
+        self.store = store
+        self.decode = dataset.load_image
+        self.positions = [store.find(Path(image_file).name) for image_file in dataset.im_files]
+
+    def __call__(self, i: int, rect_mode: bool = True, resize_short: bool = False):
+        position = self.positions[i]
+        if position is None or not rect_mode or resize_short:
+            return self.decode(i, rect_mode, resize_short)
+        # Augmentations such as RandomHSV write into the image, so each sample copies out of the shared pages.
+        image = np.array(self.store.image(position))
+        dataset = self.dataset
+        if dataset.augment:
+            # Mosaic picks its partner images from this buffer, as it does for uncached datasets.
+            dataset.buffer.append(i)
+            if 1 < len(dataset.buffer) >= dataset.max_buffer_length:
+                dataset.buffer.pop(0)
+        return image, self.store.original_shape(position), image.shape[:2]
+
+
+class ImageStoreTrainer(DetectionTrainer):
+    """DetectionTrainer that serves train/val images from the stores listed under `image_store` in the dataset YAML."""
+
+    def build_dataset(self, img_path: str, mode: str = "train", batch: int | None = None):
+        dataset = super().build_dataset(img_path, mode, batch)
+        for split, store_path in (self.data.get("image_store") or {}).items():
+            if not isinstance(img_path, str) or Path(str(self.data.get(split))) != Path(img_path):
+                continue
+            store = open_image_store(Path(store_path))
+            if store is not None and store.imgsz == dataset.imgsz and dataset.channels == 3:
+                dataset.load_image = ImageStoreLoader(dataset, store)
+                print(f"{mode}: reading {len(store)} images from {store_path}")
+            else:
+                print(f"{mode}: image store {store_path} is missing or built for another imgsz; decoding images")
+        return dataset
 
 
-def write_dataset_yaml(data_root: Path, output_yaml: Path) -> Path:
+def write_dataset_yaml(data_root: Path, output_yaml: Path, image_stores: dict[str, str] | None = None) -> Path:
     output_yaml = output_yaml.resolve()
     payload = {
         "path": str(data_root.resolve()),
@@ -468,6 +953,8 @@ def write_dataset_yaml(data_root: Path, output_yaml: Path) -> Path:
     }
     if (data_root / "images" / "test").exists():
         payload["test"] = "images/test"
+    if image_stores:
+        payload["image_store"] = image_stores
     output_yaml.write_text(yaml.safe_dump(payload, sort_keys=False, allow_unicode=False), encoding="utf-8")
     return output_yaml
 
@@ -475,17 +962,22 @@ def write_dataset_yaml(data_root: Path, output_yaml: Path) -> Path:
 def main() -> None:
     args = parse_args()
     data_root = prepare_yolo_data_root(args)
-    validate_nonempty_training_data(data_root, "Prepared YOLO dataset")
-    merged_root = build_merged_dataset(data_root, args.merged_root)
-    validate_nonempty_training_data(merged_root, "Merged person/vehicle dataset")
-    data_yaml = write_dataset_yaml(merged_root, args.output_yaml)
+    merged_root, updated = build_merged_dataset(data_root, args.merged_root, args.prep_workers)
+    counts = load_build_manifest(merged_root)["counts"]
+    validate_nonempty_training_data(data_root, "Prepared YOLO dataset", counts["source"])
+    validate_nonempty_training_data(merged_root, "Merged person/vehicle dataset", counts["merged"])
+    image_stores = None
+    if args.image_store:
+        image_stores = build_image_stores(merged_root, args.image_store, args.imgsz, args.prep_workers)
+    data_yaml = write_dataset_yaml(merged_root, args.output_yaml, image_stores)
 
     # Verify YOLO can derive label paths from image paths
     verify_label_mapping(merged_root, "train")
     verify_label_mapping(merged_root, "val")
 
     # Remove stale cache files that may contain wrong label mappings
-    delete_yolo_cache_files(merged_root)
+    if updated:
+        delete_yolo_cache_files(merged_root)
     if running_on_kaggle():
         delete_yolo_cache_files(KAGGLE_INPUT_ROOT)
 
@@ -521,10 +1013,10 @@ def main() -> None:
             raise FileNotFoundError(f"Resume checkpoint not found: {resume_path}")
         print(f"Resuming from checkpoint: {resume_path}")
         model = YOLO(str(resume_path))
-        model.train(resume=True)
+        model.train(resume=True, trainer=ImageStoreTrainer)
     else:
         model = YOLO(args.weights)
-        model.train(pretrained=True, **train_kwargs)
+        model.train(pretrained=True, trainer=ImageStoreTrainer, **train_kwargs)
 
     trainer = getattr(model, "trainer", None)
     if trainer is None:
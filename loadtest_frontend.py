@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import cv2
+import httpx
+import numpy as np
+
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+READY_TIMEOUT_S = 300.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay frames against /api/infer and report latency, throughput and shedding.")
+    parser.add_argument("--url", help="Base URL of a running frontend, e.g. http://127.0.0.1:8000. Defaults to an in-process app.")
+    parser.add_argument("--images", type=Path, help="Directory of frames to replay. Defaults to synthetic frames.")
+    parser.add_argument("--synthetic-size", default="1280x720", help="WIDTHxHEIGHT of synthetic frames.")
+    parser.add_argument("--endpoint", choices=("binary", "base64"), default="binary", help="Upload path to exercise.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum requests in flight.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Target requests per second. 0 sends as fast as concurrency allows.")
+    parser.add_argument("--requests", type=int, default=200, help="Total timed requests.")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests sent first.")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold.")
+    parser.add_argument("--imgsz", type=int, default=640, help="Inference image size.")
+    parser.add_argument("--format", choices=("objects", "columnar"), default="objects", help="Response format.")
+    parser.add_argument("--output", type=Path, help="Optional JSON report path.")
+    return parser.parse_args()
+
+
+def load_payloads(args: argparse.Namespace) -> list[bytes]:
+    if args.images is None:
+        width, height = (int(value) for value in args.synthetic_size.lower().split("x"))
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8) for _ in range(8)]
+        return [cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 72])[1].tobytes() for frame in frames]
+    paths = sorted(path for path in args.images.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        raise RuntimeError(f"No images found in {args.images}")
+    return [path.read_bytes() for path in paths]
+
+
+def build_request(payload: bytes, args: argparse.Namespace) -> dict[str, object]:
+    if args.endpoint == "base64":
+        image = "data:image/jpeg;base64," + base64.b64encode(payload).decode("ascii")
+        body = {"image": image, "conf": args.conf, "imgsz": args.imgsz, "format": args.format}
+        return {"method": "POST", "url": "/api/infer", "json": body}
+    params = {"conf": args.conf, "imgsz": args.imgsz, "format": args.format}
+    return {
+        "method": "POST",
+        "url": "/api/infer/binary",
+        "params": params,
+        "content": payload,
+        "headers": {"Content-Type": "application/octet-stream"},
+    }
+
+
+@asynccontextmanager
+async def open_client(args: argparse.Namespace):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60.0) as client:
+            yield client
+        return
+
+    from yolo_frontend_app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60.0) as client:
+            yield client
+
+
+async def wait_until_ready(client: httpx.AsyncClient) -> dict[str, object]:
+    deadline = time.perf_counter() + READY_TIMEOUT_S
+    while True:
+        health = (await client.get("/health")).json()
+        if health["status"] in ("ok", "saturated"):
+            return health
+        if health["status"] == "failed":
+            raise RuntimeError(f"Model failed to load: {health['readiness']['error']}")
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Model did not become ready in time")
+        await asyncio.sleep(0.25)
+
+
+async def run_phase(client: httpx.AsyncClient, payloads: list[bytes], count: int, args: argparse.Namespace) -> list[tuple[int, float]]:
+    """Send `count` requests with at most `args.concurrency` in flight, paced by `args.rate` when set."""
+    samples: list[tuple[int, float]] = []
+    next_index = 0
+    started_at = time.perf_counter()
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            if args.rate > 0:
+                delay = started_at + index / args.rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            request = build_request(payloads[index % len(payloads)], args)
+            sent_at = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                status = response.status_code
+                await response.aread()
+            except httpx.HTTPError:
+                status = 0
+            samples.append((status, (time.perf_counter() - sent_at) * 1000.0))
+
+    await asyncio.gather(*(worker() for _ in range(max(1, args.concurrency))))
+    return samples
+
+
+def summarize(samples: list[tuple[int, float]], wall_s: float, cpu_s: float) -> dict[str, object]:
+    statuses = Counter(status for status, _ in samples)
+    ok_latencies = np.asarray([latency for status, latency in samples if status == 200], dtype=np.float64)
+    total = len(samples)
+    shed = statuses.get(503, 0)
+    errors = total - statuses.get(200, 0) - shed
+
+    def percentile(value: float) -> float:
+        return float(np.percentile(ok_latencies, value)) if ok_latencies.size else 0.0
+
+    return {
+        "requests": total,
+        "wall_s": wall_s,
+        "throughput_rps": ok_latencies.size / wall_s if wall_s else 0.0,
+        "latency_ms": {
+            "mean": float(ok_latencies.mean()) if ok_latencies.size else 0.0,
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "max": float(ok_latencies.max()) if ok_latencies.size else 0.0,
+        },
+        "shed_rate": shed / total if total else 0.0,
+        "error_rate": errors / total if total else 0.0,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "cpu_ms_per_request": cpu_s * 1000.0 / total if total else 0.0,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, object]:
+    payloads = load_payloads(args)
+    async with open_client(args) as client:
+        health = await wait_until_ready(client)
+        if args.warmup:
+            await run_phase(client, payloads, args.warmup, args)
+
+        cpu_started = time.process_time()
+        started_at = time.perf_counter()
+        samples = await run_phase(client, payloads, args.requests, args)
+        wall_s = time.perf_counter() - started_at
+        cpu_s = time.process_time() - cpu_started
+
+    report = summarize(samples, wall_s, cpu_s)
+    report["config"] = {
+        "target": args.url or "in-process",
+        # In-process runs count server and client CPU together; against --url only the client is measured.
+        "cpu_scope": "client" if args.url else "server+client",
+        "cpu_count": os.cpu_count(),
+        "endpoint": args.endpoint,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "imgsz": args.imgsz,
+        "format": args.format,
+        "frames": len(payloads),
+        "mean_upload_kb": sum(len(payload) for payload in payloads) / len(payloads) / 1024.0,
+        "model": health.get("model"),
+        "device": health.get("device"),
+        "backend": health.get("backend"),
+    }
+    return report
+
+
+def main() -> None:
+    args = parse_args()
+    report = asyncio.run(run(args))
+    latency = report["latency_ms"]
+    print(
+        f"{report['requests']} requests in {report['wall_s']:.1f}s: {report['throughput_rps']:.1f} req/s, "
+        f"p50={latency['p50']:.1f}ms p95={latency['p95']:.1f}ms p99={latency['p99']:.1f}ms, "
+        f"shed={report['shed_rate']:.1%} errors={report['error_rate']:.1%}, "
+        f"cpu={report['cpu_ms_per_request']:.1f}ms/request ({report['config']['cpu_scope']})"
+    )
+    print(f"Status counts: {report['status_counts']}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from model_runtime import BASE_DIR, DEFAULT_MODEL_NAMES, normalize_model_path, resolve_model_path
+
+
+REGISTRY_ENV_VAR = "ARRAKIS_MODEL_REGISTRY"
+MAX_LOADED_MODELS_ENV_VAR = "ARRAKIS_MAX_LOADED_MODELS"
+MEMORY_BUDGET_ENV_VAR = "ARRAKIS_MODEL_MEMORY_MB"
+REGISTERABLE_DIRS_ENV_VAR = "ARRAKIS_REGISTERABLE_MODEL_DIRS"
+DEFAULT_MAX_LOADED_MODELS = 2
+
+ModelLoader = Callable[[Path], Any]
+
+
+@dataclass
+class LoadedModel:
+    name: str
+    path: Path
+    model: Any
+    size_bytes: int
+    load_ms: float
+    loaded_at: float = field(default_factory=time.time)
+    last_used_at: float = field(default_factory=time.time)
+    # Ultralytics predictors are not thread-safe, so callers hold this around predict().
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def estimate_model_bytes(model: Any, path: Path) -> int:
+    module = getattr(model, "model", None)
+    parameters = getattr(module, "parameters", None)
+    if callable(parameters):
+        try:
+            return sum(param.numel() * param.element_size() for param in parameters())
+        except (AttributeError, TypeError):
+            pass
+    return path.stat().st_size if path.is_file() else 0
+
+
+class ModelRegistry:
+    """Named checkpoints with lazy loading, LRU eviction and an atomically swappable active model.
+
+    At most `max_loaded` models stay in memory, and their estimated size stays under
+    `memory_budget_bytes` when a budget is set. The active model is never evicted. A model that
+    is evicted while a request still holds it is released once that request finishes.
+    """
+
+    def __init__(
+        self,
+        loader: ModelLoader,
+        active_name: str,
+        paths: dict[str, Path],
+        max_loaded: int = DEFAULT_MAX_LOADED_MODELS,
+        memory_budget_bytes: int = 0,
+    ) -> None:
+        if active_name not in paths:
+            raise KeyError(f"Active model {active_name!r} is not registered")
+        self._loader = loader
+        self._paths = dict(paths)
+        self._active_name = active_name
+        self.max_loaded = max(1, max_loaded)
+        self.memory_budget_bytes = max(0, memory_budget_bytes)
+        self._loaded: OrderedDict[str, LoadedModel] = OrderedDict()
+        self._load_locks: dict[str, threading.Lock] = {name: threading.Lock() for name in paths}
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._swaps = 0
+
+    @property
+    def active_name(self) -> str:
+        return self._active_name
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._paths)
+
+    def path_for(self, name: str) -> Path:
+        with self._lock:
+            if name not in self._paths:
+                raise KeyError(f"Unknown model {name!r}")
+            return self._paths[name]
+
+    def register(self, name: str, path: str | Path, allowed_dirs: list[Path] | None = None) -> Path:
+        """Register `path` as `name`; with `allowed_dirs`, only checkpoints inside one of them are accepted."""
+        resolved = normalize_model_path(path).resolve()
+        if allowed_dirs is not None and not any(resolved.is_relative_to(directory) for directory in allowed_dirs):
+            raise PermissionError(f"{resolved} is outside the registerable model directories")
+        if not resolved.exists():
+            raise FileNotFoundError(f"Model checkpoint not found: {resolved}")
+        with self._lock:
+            if name == self._active_name and self._paths.get(name) != resolved:
+                raise ValueError(f"Cannot re-point the active model {name!r}; activate another model first")
+            if self._paths.get(name) != resolved:
+                self._loaded.pop(name, None)
+            self._paths[name] = resolved
+            self._load_locks.setdefault(name, threading.Lock())
+        return resolved
+
+    def acquire(self, name: str | None = None) -> LoadedModel:
+        name = name or self._active_name
+        with self._lock:
+            if name not in self._paths:
+                raise KeyError(f"Unknown model {name!r}")
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+                entry.last_used_at = time.time()
+                return entry
+            load_lock = self._load_locks[name]
+            path = self._paths[name]
+            # Make room before loading so peak memory stays within max_loaded models.
+            self._evict_locked(keep=name, reserve=1)
+
+        # Load outside the registry lock so requests for already-loaded models keep flowing.
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(name)
+            if entry is None:
+                started_at = time.perf_counter()
+                model = self._loader(path)
+                entry = LoadedModel(
+                    name=name,
+                    path=path,
+                    model=model,
+                    size_bytes=estimate_model_bytes(model, path),
+                    load_ms=(time.perf_counter() - started_at) * 1000.0,
+                )
+                with self._lock:
+                    self._loaded[name] = entry
+                    self._evict_locked(keep=name)
+        return entry
+
+    def activate(self, name: str, prepare: Callable[[LoadedModel], None] | None = None) -> LoadedModel:
+        """Load (and optionally warm) `name`, then make it the default for new requests."""
+        entry = self.acquire(name)
+        if prepare is not None:
+            with entry.lock:
+                prepare(entry)
+        with self._lock:
+            if self._active_name != name:
+                self._active_name = name
+                self._swaps += 1
+            if name not in self._loaded:
+                self._loaded[name] = entry
+            self._loaded.move_to_end(name)
+            self._evict_locked()
+        return entry
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            if name == self._active_name:
+                raise ValueError("The active model cannot be evicted")
+            removed = self._loaded.pop(name, None) is not None
+            if removed:
+                self._evictions += 1
+            return removed
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            loaded = {
+                name: {
+                    "path": str(entry.path),
+                    "size_mb": entry.size_bytes / 1e6,
+                    "load_ms": entry.load_ms,
+                    "last_used_at": entry.last_used_at,
+                }
+                for name, entry in self._loaded.items()
+            }
+            return {
+                "active": self._active_name,
+                "registered": {name: str(path) for name, path in self._paths.items()},
+                "loaded": loaded,
+                "lru_order": list(self._loaded),
+                "max_loaded": self.max_loaded,
+                "memory_budget_mb": self.memory_budget_bytes / 1e6,
+                "loaded_mb": sum(entry.size_bytes for entry in self._loaded.values()) / 1e6,
+                "evictions": self._evictions,
+                "swaps": self._swaps,
+            }
+
+    def _evict_locked(self, keep: str | None = None, reserve: int = 0) -> None:
+        """Evict least recently used models until the limits hold with `reserve` more slots taken.
+
+        Neither the active model nor `keep`, the model being acquired, is evicted, so a registry at its
+        limit may briefly hold one model too many rather than drop the model a request is about to use.
+        """
+
+        def over_budget() -> bool:
+            if len(self._loaded) + reserve > self.max_loaded:
+                return True
+            if self.memory_budget_bytes:
+                return sum(entry.size_bytes for entry in self._loaded.values()) > self.memory_budget_bytes
+            return False
+
+        while over_budget():
+            victim = next((name for name in self._loaded if name not in (self._active_name, keep)), None)
+            if victim is None:
+                return
+            del self._loaded[victim]
+            self._evictions += 1
+
+
+def registerable_model_dirs() -> list[Path]:
+    """Directories from ARRAKIS_REGISTERABLE_MODEL_DIRS (os.pathsep-separated); empty when it is unset."""
+    spec = os.getenv(REGISTERABLE_DIRS_ENV_VAR, "")
+    return [Path(item).expanduser().resolve() for item in spec.split(os.pathsep) if item.strip()]
+
+
+def parse_registry_spec(spec: str) -> dict[str, Path]:
+    """Parse `name=path,name2=path2` as used by ARRAKIS_MODEL_REGISTRY and --extra-model."""
+    paths: dict[str, Path] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, separator, path_value = item.partition("=")
+        if not separator or not name.strip() or not path_value.strip():
+            raise ValueError(f"Expected name=path, got {item!r}")
+        paths[name.strip()] = normalize_model_path(path_value.strip()).resolve()
+    return paths
+
+
+def build_registry(
+    loader: ModelLoader,
+    explicit_path: str | Path | None = None,
+    extra_models: dict[str, Path] | None = None,
+) -> ModelRegistry:
+    """Registry whose active model follows resolve_model_path, plus every default and configured checkpoint."""
+    active_path = resolve_model_path(explicit_path)
+    paths: dict[str, Path] = {}
+    for model_name in DEFAULT_MODEL_NAMES:
+        candidate = BASE_DIR / model_name
+        if candidate.exists():
+            paths[candidate.stem] = candidate.resolve()
+    paths.update(parse_registry_spec(os.getenv(REGISTRY_ENV_VAR, "")))
+    paths.update(extra_models or {})
+
+    active_name = next((name for name, path in paths.items() if path == active_path), None)
+    if active_name is None:
+        active_name = active_path.stem if active_path.stem not in paths else f"{active_path.parent.name}-{active_path.stem}"
+        paths[active_name] = active_path
+
+    memory_budget_mb = float(os.getenv(MEMORY_BUDGET_ENV_VAR, "0"))
+    return ModelRegistry(
+        loader,
+        active_name,
+        paths,
+        max_loaded=int(os.getenv(MAX_LOADED_MODELS_ENV_VAR, str(DEFAULT_MAX_LOADED_MODELS))),
+        memory_budget_bytes=int(memory_budget_mb * 1e6),
+    )
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
+import hashlib
+import importlib.util
 import os
+import shutil
 from pathlib import Path
 
 import torch
+import yaml
+from ultralytics import YOLO
 
 
 BASE_DIR = Path(__file__).resolve().parent
 MODEL_ENV_VAR = "ARRAKIS_MODEL_PATH"
+BACKEND_ENV_VAR = "ARRAKIS_MODEL_BACKEND"
 DEFAULT_MODEL_NAMES = ("best.pt", "yolo26s.pt")
+INT8_CALIBRATION_ENV_VAR = "ARRAKIS_INT8_CALIBRATION_DATA"
+MODEL_BACKENDS = ("torch", "onnx", "openvino", "openvino-int8")
+EXPORT_FORMATS = {"onnx": "onnx", "openvino": "openvino", "openvino-int8": "openvino"}
+EXPORT_CACHE_DIR_NAME = ".arrakis_exports"
+EXPORT_TRACE_IMGSZ = 640
+CALIBRATION_IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+BACKEND_REQUIREMENTS = {
+    "onnx": ("onnx", "onnxruntime"),
+    "openvino": ("openvino",),
+    "openvino-int8": ("openvino", "nncf"),
+}
 
 
-def _normalize_model_path(path_value: str | Path) -> Path:
+def normalize_model_path(path_value: str | Path) -> Path:
     candidate = Path(path_value).expanduser()
     if candidate.is_absolute():
         return candidate
@@ -22,11 +39,11 @@ def resolve_model_path(explicit_path: str | Path | None = None) -> Path:
     candidates: list[Path] = []
 
     if explicit_path:
-        candidates.append(_normalize_model_path(explicit_path))
+        candidates.append(normalize_model_path(explicit_path))
 
     env_model_path = os.getenv(MODEL_ENV_VAR)
     if env_model_path:
-        candidates.append(_normalize_model_path(env_model_path))
+        candidates.append(normalize_model_path(env_model_path))
 
     candidates.extend(BASE_DIR / model_name for model_name in DEFAULT_MODEL_NAMES)
 
@@ -48,3 +65,128 @@ def resolve_device() -> str:
     if torch.backends.mps.is_available():
         return "mps"
     return "cpu"
+
+
+def resolve_backend(explicit_backend: str | None = None) -> str:
+    backend = (explicit_backend or os.getenv(BACKEND_ENV_VAR) or "torch").strip().lower()
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}. Choose one of: {', '.join(MODEL_BACKENDS)}")
+    return backend
+
+
+def resolve_calibration_data(explicit_path: str | Path | None = None) -> Path:
+    """Dataset YAML whose val split calibrates INT8 exports, e.g. the one written by the Kaggle script."""
+    path_value = explicit_path or os.getenv(INT8_CALIBRATION_ENV_VAR)
+    if not path_value:
+        raise RuntimeError(
+            f"The openvino-int8 backend needs calibration data. Set {INT8_CALIBRATION_ENV_VAR} to the "
+            "dataset YAML written by kaggle_train_visdrone_yolo26s.py (its val split is used)."
+        )
+    data_path = normalize_model_path(path_value).resolve()
+    if not data_path.exists():
+        raise FileNotFoundError(f"Calibration dataset YAML not found: {data_path}")
+    return data_path
+
+
+def checkpoint_digest(checkpoint_path: Path) -> str:
+    digest = hashlib.sha256()
+    with checkpoint_path.open("rb") as checkpoint_file:
+        for chunk in iter(lambda: checkpoint_file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def calibration_digest(data_path: Path) -> str:
+    """Hash of a dataset YAML's contents and of its val images' names and sizes.
+
+    A dataset rebuilt or re-split at the same path therefore gets a fresh INT8 export.
+    """
+    digest = hashlib.sha256(data_path.read_bytes())
+    config = yaml.safe_load(data_path.read_text(encoding="utf-8")) or {}
+    root = data_path.parent / (config.get("path") or "")
+    val_entries = config.get("val") or []
+    for entry in [val_entries] if isinstance(val_entries, str) else val_entries:
+        val_path = root / entry
+        if val_path.is_dir():
+            images = sorted(path for path in val_path.rglob("*") if path.suffix.lower() in CALIBRATION_IMAGE_SUFFIXES)
+            for image in images:
+                digest.update(f"{image.relative_to(val_path).as_posix()}:{image.stat().st_size}\n".encode())
+        elif val_path.is_file():
+            # An image list file (one path per line), as Ultralytics accepts for val.
+            digest.update(val_path.read_bytes())
+    return digest.hexdigest()[:8]
+
+
+def exported_model_path(checkpoint_path: Path, backend: str, calibration_data: Path | None = None) -> Path:
+    """Cache location for an export of `checkpoint_path`, keyed by the checkpoint's content hash.
+
+    INT8 exports are additionally keyed by the calibration dataset they were quantized against.
+    """
+    stem = f"{checkpoint_path.stem}-{checkpoint_digest(checkpoint_path)}"
+    if calibration_data is not None:
+        stem += f"-int8-{calibration_digest(calibration_data)}"
+    cache_dir = checkpoint_path.parent / EXPORT_CACHE_DIR_NAME
+    export_format = EXPORT_FORMATS[backend]
+    if export_format == "openvino":
+        return cache_dir / f"{stem}_openvino_model"
+    return cache_dir / f"{stem}.{export_format}"
+
+
+def _require_backend_packages(backend: str) -> None:
+    missing = [name for name in BACKEND_REQUIREMENTS.get(backend, ()) if importlib.util.find_spec(name) is None]
+    if missing:
+        raise RuntimeError(f"The {backend} backend needs: pip install {' '.join(missing)}")
+
+
+def export_model(checkpoint_path: Path, backend: str, calibration_data: str | Path | None = None) -> Path:
+    """Export a .pt checkpoint to `backend` once and reuse the cached artifact afterwards.
+
+    `openvino-int8` runs post-training static quantization, calibrated on the val split of
+    `calibration_data` (see resolve_calibration_data).
+    """
+    int8 = backend == "openvino-int8"
+    data_path = resolve_calibration_data(calibration_data) if int8 else None
+    target = exported_model_path(checkpoint_path, backend, data_path)
+    if target.exists():
+        return target
+
+    _require_backend_packages(backend)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Ultralytics writes exports next to the checkpoint it was given, so export from a link
+    # named after the cache key inside the cache directory.
+    cache_stem = target.name.removesuffix("_openvino_model").removesuffix(f".{EXPORT_FORMATS[backend]}")
+    staged_checkpoint = target.parent / f"{cache_stem}.pt"
+    if not staged_checkpoint.exists():
+        try:
+            os.link(checkpoint_path, staged_checkpoint)
+        except OSError:
+            shutil.copy2(checkpoint_path, staged_checkpoint)
+    export_kwargs = {"int8": True, "data": str(data_path)} if int8 else {}
+    try:
+        exported = Path(
+            YOLO(str(staged_checkpoint)).export(
+                format=EXPORT_FORMATS[backend],
+                imgsz=EXPORT_TRACE_IMGSZ,
+                dynamic=True,
+                half=False,
+                verbose=False,
+                **export_kwargs,
+            )
+        )
+    finally:
+        staged_checkpoint.unlink(missing_ok=True)
+    if exported.resolve() != target.resolve():
+        shutil.move(str(exported), str(target))
+    return target
+
+
+def load_inference_model(
+    checkpoint_path: Path,
+    backend: str | None = None,
+    calibration_data: str | Path | None = None,
+) -> YOLO:
+    """Return an Ultralytics model for `checkpoint_path` that runs on the requested backend."""
+    backend = resolve_backend(backend)
+    if backend == "torch" or checkpoint_path.suffix != ".pt":
+        return YOLO(str(checkpoint_path))
+    return YOLO(str(export_model(checkpoint_path, backend, calibration_data)), task="detect")
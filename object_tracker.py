@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import numpy as np
+
+from inference_core import Detections
+
+
+STATE_DIM = 8
+MEASUREMENT_DIM = 4
+# Noise standard deviations as fractions of the box size, per second for the process terms.
+POSITION_STD = 0.05
+VELOCITY_STD = 0.1
+MEASUREMENT_STD = 0.05
+MAX_STEP_S = 1.0
+
+_OBSERVATION = np.eye(MEASUREMENT_DIM, STATE_DIM, dtype=np.float64)
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes."""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0.0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-12), 0.0)
+
+
+def greedy_match(iou: np.ndarray, threshold: float) -> tuple[np.ndarray, np.ndarray]:
+    """Pair rows and columns by descending IoU above `threshold`, each used at most once."""
+    rows, columns = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, columns], kind="stable")
+    used_rows: set[int] = set()
+    used_columns: set[int] = set()
+    matches: list[tuple[int, int]] = []
+    for row, column in zip(rows[order].tolist(), columns[order].tolist()):
+        if row in used_rows or column in used_columns:
+            continue
+        used_rows.add(row)
+        used_columns.add(column)
+        matches.append((row, column))
+    pairs = np.asarray(matches, dtype=np.int64).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _to_state(boxes: np.ndarray) -> np.ndarray:
+    sizes = boxes[:, 2:] - boxes[:, :2]
+    centers = boxes[:, :2] + sizes / 2
+    return np.concatenate([centers, sizes, np.zeros_like(centers), np.zeros_like(sizes)], axis=1)
+
+
+def _to_boxes(states: np.ndarray) -> np.ndarray:
+    half = np.clip(states[:, 2:4], 0.0, None) / 2
+    return np.concatenate([states[:, :2] - half, states[:, :2] + half], axis=1).astype(np.float32)
+
+
+def _size_scale(states: np.ndarray) -> np.ndarray:
+    """Per-component (w, h, w, h) scale so noise is relative to each box's size."""
+    width = np.maximum(states[:, 2], 1e-6)
+    height = np.maximum(states[:, 3], 1e-6)
+    return np.stack([width, height, width, height], axis=1)
+
+
+class BoxTracker:
+    """IoU association plus a constant-velocity Kalman filter over (cx, cy, w, h), vectorized across tracks.
+
+    Call `update` with fresh detections and their frame's timestamp (seconds) on inferred frames, and
+    `predict` with any later timestamp to extrapolate the tracks to the frame being shown; `predict`
+    does not change the filter state, so it can run at the display rate. Both return the visible tracks
+    as Detections with `track_ids`. Only tracks matched by the latest update are returned; unmatched
+    tracks are kept for `max_misses` more updates so an object that blinks out for one inference
+    keeps its ID.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_misses: int = 2) -> None:
+        self._iou_threshold = iou_threshold
+        self._max_misses = max_misses
+        self._next_id = 1
+        self._last_timestamp: float | None = None
+        self._names: np.ndarray | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        self._states = np.zeros((0, STATE_DIM), dtype=np.float64)
+        self._covariances = np.zeros((0, STATE_DIM, STATE_DIM), dtype=np.float64)
+        self._scores = np.zeros(0, dtype=np.float32)
+        self._class_ids = np.zeros(0, dtype=np.int32)
+        self._track_ids = np.zeros(0, dtype=np.int64)
+        self._misses = np.zeros(0, dtype=np.int32)
+        self._last_timestamp = None
+
+    def __len__(self) -> int:
+        return int(self._track_ids.shape[0])
+
+    def predict(self, timestamp: float) -> Detections:
+        visible = self._visible()
+        if self._last_timestamp is None or not len(visible):
+            return visible
+        dt = min(max(timestamp - self._last_timestamp, 0.0), MAX_STEP_S)
+        velocities = self._states[self._misses == 0, 4:]
+        # Box corners move with the center velocity and spread with half the size velocity.
+        shift = np.concatenate([velocities[:, :2] - velocities[:, 2:] / 2, velocities[:, :2] + velocities[:, 2:] / 2], axis=1)
+        return replace(visible, boxes=(visible.boxes + shift * dt).astype(np.float32))
+
+    def update(self, detections: Detections, timestamp: float) -> Detections:
+        self._advance(timestamp)
+        if detections.names is not None:
+            self._names = detections.names
+
+        iou = box_iou(_to_boxes(self._states), detections.boxes.astype(np.float32))
+        iou[self._class_ids[:, None] != detections.class_ids[None, :]] = 0.0
+        track_rows, detection_rows = greedy_match(iou, self._iou_threshold)
+
+        if track_rows.size:
+            self._correct(track_rows, detections.boxes[detection_rows].astype(np.float64))
+            self._scores[track_rows] = detections.scores[detection_rows]
+        self._misses += 1
+        self._misses[track_rows] = 0
+
+        keep = self._misses <= self._max_misses
+        self._select(keep)
+
+        unmatched = np.ones(len(detections), dtype=bool)
+        unmatched[detection_rows] = False
+        if unmatched.any():
+            self._spawn(detections.select(unmatched))
+        return self._visible()
+
+    def _advance(self, timestamp: float) -> None:
+        dt = 0.0 if self._last_timestamp is None else min(max(timestamp - self._last_timestamp, 0.0), MAX_STEP_S)
+        self._last_timestamp = timestamp
+        if dt == 0.0 or not len(self):
+            return
+        transition = np.eye(STATE_DIM)
+        transition[:4, 4:] = np.eye(4) * dt
+        scale = _size_scale(self._states)
+        process_std = np.concatenate([POSITION_STD * scale, VELOCITY_STD * scale], axis=1) * np.sqrt(dt)
+        self._states = self._states @ transition.T
+        self._covariances = transition @ self._covariances @ transition.T + _diagonal(process_std**2)
+
+    def _correct(self, rows: np.ndarray, measured_boxes: np.ndarray) -> None:
+        states = self._states[rows]
+        covariances = self._covariances[rows]
+        measurements = _to_state(measured_boxes)[:, :MEASUREMENT_DIM]
+        noise = _diagonal((MEASUREMENT_STD * _size_scale(states)) ** 2)
+
+        innovation_cov = _OBSERVATION @ covariances @ _OBSERVATION.T + noise
+        gain = covariances @ _OBSERVATION.T @ np.linalg.inv(innovation_cov)
+        innovation = measurements - states[:, :MEASUREMENT_DIM]
+        self._states[rows] = states + np.einsum("nij,nj->ni", gain, innovation)
+        self._covariances[rows] = (np.eye(STATE_DIM) - gain @ _OBSERVATION) @ covariances
+
+    def _spawn(self, detections: Detections) -> None:
+        count = len(detections)
+        states = _to_state(detections.boxes.astype(np.float64))
+        scale = _size_scale(states)
+        initial_std = np.concatenate([2 * MEASUREMENT_STD * scale, 10 * VELOCITY_STD * scale], axis=1)
+        self._states = np.concatenate([self._states, states])
+        self._covariances = np.concatenate([self._covariances, _diagonal(initial_std**2)])
+        self._scores = np.concatenate([self._scores, detections.scores.astype(np.float32)])
+        self._class_ids = np.concatenate([self._class_ids, detections.class_ids.astype(np.int32)])
+        self._track_ids = np.concatenate([self._track_ids, np.arange(self._next_id, self._next_id + count)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int32)])
+        self._next_id += count
+
+    def _select(self, mask: np.ndarray) -> None:
+        self._states = self._states[mask]
+        self._covariances = self._covariances[mask]
+        self._scores = self._scores[mask]
+        self._class_ids = self._class_ids[mask]
+        self._track_ids = self._track_ids[mask]
+        self._misses = self._misses[mask]
+
+    def _visible(self) -> Detections:
+        visible = self._misses == 0
+        return Detections(
+            boxes=_to_boxes(self._states[visible]),
+            scores=self._scores[visible].copy(),
+            class_ids=self._class_ids[visible].copy(),
+            names=self._names,
+            track_ids=self._track_ids[visible].copy(),
+        )
+
+
+def _diagonal(values: np.ndarray) -> np.ndarray:
+    """Stack of diagonal matrices from an (N, D) array of diagonals."""
+    matrices = np.zeros((*values.shape, values.shape[-1]), dtype=np.float64)
+    index = np.arange(values.shape[-1])
+    matrices[:, index, index] = values
+    return matrices
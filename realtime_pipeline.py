@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from inference_core import EMPTY_DETECTIONS, Detections, concat_detections
+from object_tracker import BoxTracker
+
+
+STATS_WINDOW_S = 2.0
+LATENCY_SAMPLES = 240
+POLL_TIMEOUT_S = 0.05
+GATE_GRID = (16, 9)
+GATE_TILE_PX = 8
+GATE_MAX_PARTIAL_AREA = 0.5
+
+# A frame reader returns None once a finite source (video file, image directory) is exhausted.
+OpenReader = Callable[[], AbstractContextManager[Callable[[], np.ndarray | None]]]
+Infer = Callable[[np.ndarray], Detections]
+Render = Callable[[np.ndarray, Detections], np.ndarray]
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    index: int
+    image: np.ndarray
+    captured_at: float
+    # When the read began; `total` latency is measured from here, as in the serial loop.
+    read_at: float
+
+
+@dataclass(frozen=True)
+class InferredFrame:
+    frame: CapturedFrame
+    detections: Detections
+    inferred_at: float
+
+
+class LatestSlot:
+    """Single-slot buffer: writers overwrite, readers wait for an item newer than the last one they saw.
+
+    Slow readers never queue up stale frames; they skip straight to the newest one. `dropped` counts
+    items overwritten before any reader took them.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._item: Any = None
+        self._version = 0
+        self._taken_version = 0
+        self._closed = False
+        self.dropped = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def put(self, item: Any) -> None:
+        with self._condition:
+            if self._version > self._taken_version:
+                self.dropped += 1
+            self._item = item
+            self._version += 1
+            self._condition.notify_all()
+
+    def latest(self) -> tuple[int, Any]:
+        with self._condition:
+            self._taken_version = self._version
+            return self._version, self._item
+
+    def get_newer(self, version: int, timeout: float) -> tuple[int, Any] | None:
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > version or self._closed, timeout)
+            if self._version > version:
+                self._taken_version = self._version
+                return self._version, self._item
+            return None
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class StageStats:
+    """Rolling per-stage FPS over the last few seconds plus latency percentiles.
+
+    Latencies keep the last `max_samples` observations; None keeps all of them for a full-run report.
+    """
+
+    def __init__(self, window_s: float = STATS_WINDOW_S, max_samples: int | None = LATENCY_SAMPLES) -> None:
+        self._window_s = window_s
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._ticks: dict[str, deque[float]] = {}
+        self._latencies: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+
+    def tick(self, stage: str, now: float | None = None) -> None:
+        now = time.perf_counter() if now is None else now
+        with self._lock:
+            ticks = self._ticks.setdefault(stage, deque())
+            ticks.append(now)
+            while ticks and now - ticks[0] > self._window_s:
+                ticks.popleft()
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def observe(self, name: str, milliseconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=self._max_samples)).append(milliseconds)
+
+    def fps(self, stage: str) -> float:
+        with self._lock:
+            ticks = list(self._ticks.get(stage, ()))
+        if len(ticks) < 2 or ticks[-1] == ticks[0]:
+            return 0.0
+        return (len(ticks) - 1) / (ticks[-1] - ticks[0])
+
+    def latency(self, name: str) -> dict[str, float]:
+        with self._lock:
+            samples = np.asarray(self._latencies.get(name, ()), dtype=np.float64)
+        if not samples.size:
+            return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "mean": float(samples.mean()),
+            "p50": float(np.percentile(samples, 50)),
+            "p95": float(np.percentile(samples, 95)),
+            "p99": float(np.percentile(samples, 99)),
+            "max": float(samples.max()),
+        }
+
+    def summary(self) -> dict[str, object]:
+        with self._lock:
+            stages = list(self._ticks)
+            names = list(self._latencies)
+            counts = dict(self._counts)
+        return {
+            "fps": {stage: self.fps(stage) for stage in stages},
+            "frames": counts,
+            "latency_ms": {name: self.latency(name) for name in names},
+        }
+
+    def overlay_text(self) -> str:
+        end_to_end = self.latency("end_to_end")["p50"]
+        detection_age = self.latency("detection_age")["p50"]
+        return (
+            f"cap {self.fps('capture'):.0f} inf {self.fps('infer'):.1f} show {self.fps('render'):.0f} fps  "
+            f"e2e {end_to_end:.0f}ms det {detection_age:.0f}ms"
+        )
+
+
+class ChangeGate:
+    """Skip inference when the frame barely differs from the last inferred one.
+
+    Frames are compared as a downsampled grayscale grid: each tile's mean absolute difference (0-255)
+    against the reference is checked against `threshold`. Below it everywhere, the previous detections
+    are reused. With `partial`, a small changed area is re-inferred on its own crop and merged with the
+    previous detections outside it; larger changes fall back to a full inference.
+    """
+
+    def __init__(
+        self,
+        infer: Infer,
+        threshold: float,
+        partial: bool = False,
+        grid: tuple[int, int] = GATE_GRID,
+        max_partial_area: float = GATE_MAX_PARTIAL_AREA,
+    ) -> None:
+        self._infer = infer
+        self._threshold = threshold
+        self._partial = partial
+        self._grid = grid
+        self._max_partial_area = max_partial_area
+        self._reference: np.ndarray | None = None
+        self._detections = EMPTY_DETECTIONS
+        self.counts = {"full": 0, "partial": 0, "skipped": 0}
+
+    def __call__(self, frame: np.ndarray) -> Detections:
+        thumbnail = self._thumbnail(frame)
+        if self._reference is None or self._reference.shape != thumbnail.shape:
+            return self._infer_full(frame, thumbnail)
+
+        changed = self._tile_difference(thumbnail) > self._threshold
+        if not changed.any():
+            self.counts["skipped"] += 1
+            return self._detections
+        if not self._partial or changed.mean() > self._max_partial_area:
+            return self._infer_full(frame, thumbnail)
+        return self._infer_partial(frame, thumbnail, changed)
+
+    def reset(self) -> None:
+        """Force a full inference on the next frame."""
+        self._reference = None
+
+    def describe(self) -> str:
+        total = sum(self.counts.values())
+        return f"gate skip {self.counts['skipped']}/{total} partial {self.counts['partial']}"
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        columns, rows = self._grid
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (columns * GATE_TILE_PX, rows * GATE_TILE_PX), interpolation=cv2.INTER_AREA)
+
+    def _tile_difference(self, thumbnail: np.ndarray) -> np.ndarray:
+        columns, rows = self._grid
+        difference = cv2.absdiff(thumbnail, self._reference).astype(np.float32)
+        return difference.reshape(rows, GATE_TILE_PX, columns, GATE_TILE_PX).mean(axis=(1, 3))
+
+    def _infer_full(self, frame: np.ndarray, thumbnail: np.ndarray) -> Detections:
+        self.counts["full"] += 1
+        self._reference = thumbnail
+        self._detections = self._infer(frame)
+        return self._detections
+
+    def _infer_partial(self, frame: np.ndarray, thumbnail: np.ndarray, changed: np.ndarray) -> Detections:
+        columns, rows = self._grid
+        height, width = frame.shape[:2]
+        tile_rows, tile_columns = np.nonzero(changed)
+        # Pad the changed tiles by one so objects straddling the edge of the change are re-detected whole.
+        row0, row1 = max(int(tile_rows.min()) - 1, 0), min(int(tile_rows.max()) + 2, rows)
+        column0, column1 = max(int(tile_columns.min()) - 1, 0), min(int(tile_columns.max()) + 2, columns)
+        x0, x1 = column0 * width // columns, column1 * width // columns
+        y0, y1 = row0 * height // rows, row1 * height // rows
+
+        fresh = self._infer(np.ascontiguousarray(frame[y0:y1, x0:x1])).translated(x0, y0)
+        previous = self._detections
+        centers_x = (previous.boxes[:, 0] + previous.boxes[:, 2]) / 2
+        centers_y = (previous.boxes[:, 1] + previous.boxes[:, 3]) / 2
+        outside = (centers_x < x0) | (centers_x >= x1) | (centers_y < y0) | (centers_y >= y1)
+
+        self.counts["partial"] += 1
+        self._detections = concat_detections([previous.select(outside), fresh])
+        region = np.s_[row0 * GATE_TILE_PX : row1 * GATE_TILE_PX, column0 * GATE_TILE_PX : column1 * GATE_TILE_PX]
+        self._reference = self._reference.copy()
+        self._reference[region] = thumbnail[region]
+        return self._detections
+
+
+class RealtimePipeline:
+    """Capture and inference threads feeding the caller's render loop through single-slot buffers.
+
+    Capture runs at the source rate and inference always picks up the newest captured frame, so the
+    preview keeps the capture rate while boxes refresh at the inference rate. `total` latency is read
+    start to display of the shown frame, as the serial loop reports it; `end_to_end` is the same span
+    from capture, and `detection_age` is capture to display of the frame the shown boxes were inferred on.
+
+    `infer_every` runs inference on at most every Nth captured frame. With a `tracker`, each new result
+    updates it and every shown frame gets the tracks extrapolated to its capture time, so boxes keep
+    moving between inferences.
+
+    When a finite source ends, the last frame is shown again once the inference still running on it
+    finishes, so its final detections are always displayed before `finished` turns true.
+    """
+
+    def __init__(
+        self,
+        open_reader: OpenReader,
+        infer: Infer,
+        render: Render,
+        infer_every: int = 1,
+        tracker: BoxTracker | None = None,
+        stats: StageStats | None = None,
+    ) -> None:
+        self._open_reader = open_reader
+        self._infer = infer
+        self._render = render
+        self._infer_every = max(1, infer_every)
+        self._tracker = tracker
+        self._result_version = 0
+        self._frames = LatestSlot()
+        self._results = LatestSlot()
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._threads: list[threading.Thread] = []
+        self._frame_version = 0
+        self._frame: CapturedFrame | None = None
+        self.stats = stats or StageStats()
+
+    def start(self) -> None:
+        for name, target in (("capture", self._capture_loop), ("infer", self._inference_loop)):
+            thread = threading.Thread(target=self._run_stage, args=(target,), name=f"realtime-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._frames.close()
+        self._results.close()
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._threads.clear()
+        self.raise_errors()
+
+    @property
+    def finished(self) -> bool:
+        """True once a finite source is exhausted and its last frame has been shown with the last detections."""
+        return (
+            self._results.closed
+            and self._frame_version == self._frames.version
+            and self._result_version == self._results.version
+        )
+
+    def raise_errors(self) -> None:
+        if self._errors:
+            raise self._errors[0]
+
+    def next_preview(self) -> np.ndarray | None:
+        """Render the newest captured frame with the latest detections, or None if nothing new arrived."""
+        self.raise_errors()
+        item = self._frames.get_newer(self._frame_version, POLL_TIMEOUT_S)
+        if item is not None:
+            self._frame_version, self._frame = item
+        elif not self._frames.closed or self._frame is None:
+            return None
+        # The source has ended: wait for inference still running on its last frames.
+        elif self._results.get_newer(self._result_version, POLL_TIMEOUT_S) is None:
+            return None
+        frame = self._frame
+        result_version, result = self._results.latest()
+        if self._tracker is None:
+            detections = EMPTY_DETECTIONS if result is None else result.detections
+        else:
+            if result is not None and result_version != self._result_version:
+                self._tracker.update(result.detections, result.frame.captured_at)
+            detections = self._tracker.predict(frame.captured_at)
+        self._result_version = result_version
+        render_started = time.perf_counter()
+        preview = self._render(frame.image, detections)
+
+        now = time.perf_counter()
+        self.stats.observe("plot", (now - render_started) * 1000.0)
+        self.stats.tick("render", now)
+        self.stats.observe("total", (now - frame.read_at) * 1000.0)
+        self.stats.observe("end_to_end", (now - frame.captured_at) * 1000.0)
+        if result is not None:
+            self.stats.observe("detection_age", (now - result.frame.captured_at) * 1000.0)
+        return preview
+
+    def _run_stage(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except BaseException as error:
+            self._errors.append(error)
+            self._stop.set()
+        finally:
+            self._frames.close()
+
+    def _capture_loop(self) -> None:
+        # The reader is opened on this thread because screen-capture handles are thread-bound on some platforms.
+        with self._open_reader() as read_frame:
+            index = 0
+            while not self._stop.is_set():
+                started_at = time.perf_counter()
+                image = read_frame()
+                if image is None:
+                    return
+                captured_at = time.perf_counter()
+                self._frames.put(CapturedFrame(index, image, captured_at, started_at))
+                self.stats.tick("capture", captured_at)
+                self.stats.observe("capture", (captured_at - started_at) * 1000.0)
+                index += 1
+
+    def _inference_loop(self) -> None:
+        try:
+            self._infer_frames()
+        finally:
+            self._results.close()
+
+    def _infer_frames(self) -> None:
+        version = 1 - self._infer_every
+        while not self._stop.is_set():
+            item = self._frames.get_newer(version + self._infer_every - 1, POLL_TIMEOUT_S)
+            if item is None:
+                if self._frames.closed:
+                    return
+                continue
+            version, frame = item
+            started_at = time.perf_counter()
+            detections = self._infer(frame.image)
+            inferred_at = time.perf_counter()
+            self._results.put(InferredFrame(frame, detections, inferred_at))
+            self.stats.tick("infer", inferred_at)
+            self.stats.observe("infer", (inferred_at - started_at) * 1000.0)
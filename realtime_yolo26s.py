@@ -1,28 +1,106 @@
 import argparse
+import json
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
+from typing import Callable, Iterator
 
 import cv2
 import numpy as np
 from mss import mss
-from ultralytics import YOLO
 
-from model_runtime import MODEL_ENV_VAR, resolve_device, resolve_model_path
+from inference_core import Detections, TileSettings, predict_detections, predict_tiled
+from model_registry import ModelRegistry, build_registry, parse_registry_spec
+from model_runtime import BACKEND_ENV_VAR, MODEL_BACKENDS, MODEL_ENV_VAR, load_inference_model, resolve_backend, resolve_device
+from object_tracker import BoxTracker
+from realtime_pipeline import ChangeGate, RealtimePipeline, StageStats
+
+
+VIDEO_SOURCE_PREFIX = "video:"
+IMAGES_SOURCE_PREFIX = "images:"
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def source_spec(value: str) -> str:
+    if value in ("webcam", "screen") or value.startswith((VIDEO_SOURCE_PREFIX, IMAGES_SOURCE_PREFIX)):
+        return value
+    raise argparse.ArgumentTypeError(f"Unknown source {value!r}. Use webcam, screen, video:<path> or images:<dir>.")
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Run realtime YOLO26s inference from a webcam or the screen.")
+    parser = argparse.ArgumentParser(description="Run realtime YOLO26s inference from a webcam, the screen, a video or images.")
     parser.add_argument(
         "--model",
         help=f"Optional checkpoint path. Defaults to {MODEL_ENV_VAR}, then ./best.pt, then ./yolo26s.pt.",
     )
-    parser.add_argument("--source", choices=("webcam", "screen"), default="webcam", help="Input source type.")
+    parser.add_argument(
+        "--extra-model",
+        action="append",
+        default=[],
+        metavar="NAME=PATH",
+        help="Additional checkpoint to register for hot swapping. Press 'm' in the preview to cycle models.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=MODEL_BACKENDS,
+        help=f"Inference runtime. Defaults to {BACKEND_ENV_VAR}, then torch. onnx/openvino export the checkpoint once and cache it.",
+    )
+    parser.add_argument(
+        "--source",
+        type=source_spec,
+        default="webcam",
+        help="Input source: webcam, screen, video:<path> or images:<dir>. Video and image sources stop at their last frame.",
+    )
     parser.add_argument("--camera", type=int, default=0, help="Webcam index to open.")
     parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold.")
     parser.add_argument("--imgsz", type=int, default=640, help="Inference image size.")
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=0,
+        help="Run overlapping tiles of this many pixels as one batch (plus a full-frame pass at --imgsz). 0 disables.",
+    )
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="Fractional overlap between neighbouring tiles.")
     parser.add_argument("--monitor", type=int, default=1, help="Monitor index for screen capture.")
     parser.add_argument("--select-region", action="store_true", help="Interactively select the screen region to capture.")
     parser.add_argument("--view", choices=("annotated", "split"), default="annotated", help="Preview layout.")
     parser.add_argument("--preview-scale", type=float, default=1.0, help="Preview window scale factor.")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run capture and inference on their own threads so the preview keeps the capture rate.",
+    )
+    parser.add_argument(
+        "--change-threshold",
+        type=float,
+        default=3.0,
+        help="Screen source only: reuse the previous detections while no tile's mean gray-level change exceeds this. 0 disables.",
+    )
+    parser.add_argument(
+        "--change-tiles",
+        action="store_true",
+        help="With the change gate, re-infer only the changed area when it covers at most half the frame.",
+    )
+    parser.add_argument("--infer-every", type=int, default=1, help="Run inference on every Nth frame only.")
+    parser.add_argument(
+        "--track",
+        action="store_true",
+        help="Track boxes with IoU association and a Kalman filter so they keep moving between inferred frames.",
+    )
+    parser.add_argument("--headless", action="store_true", help="Do not open a preview window; frames are still drawn and timed.")
+    parser.add_argument("--max-frames", type=int, default=0, help="Stop after this many shown frames. 0 runs until the source ends or 'q'.")
+    parser.add_argument(
+        "--report",
+        choices=("text", "json"),
+        default="text",
+        help=(
+            "Format of the summary printed on exit: capture, infer, plot and total latency plus sustained FPS. "
+            "Pipelined runs also report end_to_end and detection_age."
+        ),
+    )
+    parser.add_argument("--output", type=Path, help="Optional JSON report path.")
     parser.add_argument("--left", type=int, default=0, help="Screen capture left offset in pixels.")
     parser.add_argument("--top", type=int, default=0, help="Screen capture top offset in pixels.")
     parser.add_argument("--width", type=int, default=0, help="Screen capture width. 0 uses the full monitor width.")
@@ -70,12 +148,86 @@ def read_screen_frame(screen_capture: mss, region: dict[str, int]) -> np.ndarray
     return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
 
 
+def list_images(directory: Path) -> list[Path]:
+    paths = sorted(path for path in directory.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        raise RuntimeError(f"No images found in {directory}")
+    return paths
+
+
+@contextmanager
+def open_frame_reader(
+    capture: cv2.VideoCapture | None,
+    region: dict[str, int] | None,
+    image_paths: list[Path] | None = None,
+    live: bool = True,
+    pace_fps: float = 0.0,
+) -> Iterator[Callable[[], np.ndarray | None]]:
+    """Yield a frame reader for the configured source. It returns None once a finite source is exhausted.
+
+    `pace_fps` throttles a video file to its native rate, as a camera would deliver it.
+    """
+    if image_paths is not None:
+        remaining = iter(image_paths)
+
+        def read_image_frame() -> np.ndarray | None:
+            for path in remaining:
+                frame = cv2.imread(str(path))
+                if frame is not None:
+                    return frame
+            return None
+
+        yield read_image_frame
+        return
+
+    if capture is not None:
+        next_due = time.perf_counter()
+
+        def read_capture_frame() -> np.ndarray | None:
+            nonlocal next_due
+            if pace_fps > 0:
+                time.sleep(max(0.0, next_due - time.perf_counter()))
+                next_due = max(next_due + 1.0 / pace_fps, time.perf_counter())
+            ok, frame = capture.read()
+            if not ok:
+                if live:
+                    raise RuntimeError("Failed to read a frame from the webcam")
+                return None
+            return frame
+
+        yield read_capture_frame
+        return
+
+    # mss handles are bound to the thread that created them, so each reader opens its own.
+    with mss() as screen_capture:
+        yield lambda: read_screen_frame(screen_capture, region)
+
+
 def add_label(frame: np.ndarray, text: str) -> np.ndarray:
     labeled = frame.copy()
     cv2.putText(labeled, text, (16, 32), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2, cv2.LINE_AA)
     return labeled
 
 
+def draw_detections(frame: np.ndarray, detections: Detections) -> np.ndarray:
+    annotated = frame.copy()
+    boxes = detections.boxes.round().astype(np.int32).tolist()
+    labels = detections.labels().tolist()
+    if detections.track_ids is not None:
+        labels = [f"#{track_id} {label}" for track_id, label in zip(detections.track_ids.tolist(), labels)]
+    for (x1, y1, x2, y2), score, label in zip(boxes, detections.scores.tolist(), labels):
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 200, 255), 2)
+        cv2.putText(annotated, f"{label} {score:.2f}", (x1, max(12, y1 - 6)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 200, 255), 1, cv2.LINE_AA)
+    return annotated
+
+
+def draw_status(preview_frame: np.ndarray, text: str) -> np.ndarray:
+    y = preview_frame.shape[0] - 12
+    cv2.putText(preview_frame, text, (12, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 3, cv2.LINE_AA)
+    cv2.putText(preview_frame, text, (12, y), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 1, cv2.LINE_AA)
+    return preview_frame
+
+
 def build_preview_frame(frame: np.ndarray, annotated_frame: np.ndarray, args: argparse.Namespace) -> np.ndarray:
     if args.view == "split":
         original = add_label(frame, "Input")
@@ -106,55 +258,208 @@ def place_preview_window(
     cv2.moveWindow(window_name, int(x), int(y))
 
 
+def start_model_swap(registry: ModelRegistry) -> threading.Thread:
+    names = registry.names()
+    next_name = names[(names.index(registry.active_name) + 1) % len(names)]
+
+    def swap() -> None:
+        entry = registry.activate(next_name)
+        print(f"Switched realtime model to {entry.name}: {entry.path}")
+
+    print(f"Loading realtime model {next_name} in the background...")
+    thread = threading.Thread(target=swap, name="model-swap", daemon=True)
+    thread.start()
+    return thread
+
+
+def build_report(stats: StageStats, frames: int, wall_s: float, args: argparse.Namespace, model: str, device: str, backend: str) -> dict[str, object]:
+    summary = stats.summary()
+    return {
+        "frames": frames,
+        "wall_s": wall_s,
+        "sustained_fps": frames / wall_s if wall_s else 0.0,
+        "inferences": summary["frames"].get("infer", 0),
+        "latency_ms": summary["latency_ms"],
+        "config": {
+            "source": args.source,
+            "model": model,
+            "backend": backend,
+            "device": device,
+            "imgsz": args.imgsz,
+            "tile_size": args.tile_size,
+            "tile_overlap": args.tile_overlap,
+            "conf": args.conf,
+            "infer_every": args.infer_every,
+            "track": args.track,
+            "pipeline": args.pipeline,
+            "headless": args.headless,
+        },
+    }
+
+
+def print_report(report: dict[str, object], report_format: str) -> None:
+    if report_format == "json":
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['frames']} frames in {report['wall_s']:.1f}s: {report['sustained_fps']:.1f} fps sustained, {report['inferences']} inferences")
+    for name, latency in report["latency_ms"].items():
+        print(f"{name:>13} mean={latency['mean']:7.1f}ms p50={latency['p50']:7.1f}ms p95={latency['p95']:7.1f}ms p99={latency['p99']:7.1f}ms")
+
+
 def main() -> None:
     args = parse_args()
-    model_path = resolve_model_path(args.model)
+    if args.infer_every < 1:
+        raise ValueError("--infer-every must be at least 1")
+    extra_models = parse_registry_spec(",".join(args.extra_model))
+    backend = resolve_backend(args.backend)
+    registry = build_registry(lambda path: load_inference_model(path, backend), args.model, extra_models)
     device = resolve_device()
-    model = YOLO(str(model_path))
-    print(f"Loaded realtime model: {model_path} on {device}")
+    # Keep stdout clean for a JSON report.
+    log_stream = sys.stderr if args.report == "json" else sys.stdout
+    entry = registry.acquire()
+    print(f"Loaded realtime model {entry.name}: {entry.path} on {device} via {backend}", file=log_stream)
+    if len(registry.names()) > 1 and not args.headless:
+        print(f"Registered models: {', '.join(registry.names())} (press 'm' to cycle)", file=log_stream)
+    swap_thread: threading.Thread | None = None
     capture = None
-    screen_capture = None
     region = None
     monitor = None
+    image_paths = None
 
     if args.source == "webcam":
         capture = cv2.VideoCapture(args.camera)
         if not capture.isOpened():
             raise RuntimeError(f"Could not open webcam index {args.camera}")
+    elif args.source.startswith(VIDEO_SOURCE_PREFIX):
+        video_path = Path(args.source.removeprefix(VIDEO_SOURCE_PREFIX)).expanduser()
+        capture = cv2.VideoCapture(str(video_path))
+        if not capture.isOpened():
+            raise RuntimeError(f"Could not open video {video_path}")
+    elif args.source.startswith(IMAGES_SOURCE_PREFIX):
+        image_paths = list_images(Path(args.source.removeprefix(IMAGES_SOURCE_PREFIX)).expanduser())
     else:
-        screen_capture = mss()
-        monitor = get_monitor(screen_capture, args.monitor)
-        region = select_screen_region(screen_capture, args) if args.select_region else get_screen_region(screen_capture, args)
+        with mss() as screen_capture:
+            monitor = get_monitor(screen_capture, args.monitor)
+            region = select_screen_region(screen_capture, args) if args.select_region else get_screen_region(screen_capture, args)
+
+    # Pipelined runs play video at its native rate so frames can be dropped as they would be live;
+    # serial runs read as fast as inference allows.
+    pace_fps = 0.0
+    if args.pipeline and args.source.startswith(VIDEO_SOURCE_PREFIX):
+        pace_fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+
+    def open_reader():
+        return open_frame_reader(capture, region, image_paths, live=args.source == "webcam", pace_fps=pace_fps)
+
+    tiling = TileSettings(size=args.tile_size, overlap=args.tile_overlap) if args.tile_size > 0 else None
+
+    def predict(frame: np.ndarray) -> Detections:
+        # The active model only changes once a background swap has finished loading it.
+        entry = registry.acquire()
+        if tiling is not None:
+            return predict_tiled(entry.model, [frame], args.conf, args.imgsz, tiling, device)[0]
+        return predict_detections(entry.model, [frame], args.conf, args.imgsz, device)[0]
+
+    # Static screen regions (paused video, idle UI) reuse the last detections instead of re-inferring.
+    gate = None
+    if args.source == "screen" and args.change_threshold > 0:
+        gate = ChangeGate(predict, args.change_threshold, args.change_tiles)
+    infer = predict if gate is None else gate
+    active_model = registry.active_name
+
+    def render(frame: np.ndarray, detections: Detections) -> np.ndarray:
+        return build_preview_frame(frame, draw_detections(frame, detections), args)
 
     window_name = "YOLO26s Realtime"
-    cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+    if not args.headless:
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
     window_placed = False
+    # Keep every latency sample so the exit report covers the whole run.
+    stats = StageStats(max_samples=None)
+    tracker = BoxTracker() if args.track else None
+    pipeline = None
+    if args.pipeline:
+        pipeline = RealtimePipeline(open_reader, infer, render, args.infer_every, tracker, stats)
+    frames_shown = 0
+    detections: Detections | None = None
 
+    started_at = time.perf_counter()
     try:
-        while True:
-            if args.source == "webcam":
-                ok, frame = capture.read()
-                if not ok:
-                    raise RuntimeError("Failed to read a frame from the webcam")
+        with ExitStack() as stack:
+            if pipeline is None:
+                read_frame = stack.enter_context(open_reader())
             else:
-                frame = read_screen_frame(screen_capture, region)
-
-            result = model.predict(frame, conf=args.conf, imgsz=args.imgsz, verbose=False, device=device)[0]
-            annotated_frame = result.plot()
-            preview_frame = build_preview_frame(frame, annotated_frame, args)
-
-            cv2.imshow(window_name, preview_frame)
-            if args.source == "screen" and not window_placed:
-                place_preview_window(window_name, preview_frame, region, monitor)
-                window_placed = True
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+                pipeline.start()
+                stack.callback(pipeline.stop)
+            while not args.max_frames or frames_shown < args.max_frames:
+                if pipeline is None:
+                    frame_started = time.perf_counter()
+                    frame = read_frame()
+                    if frame is None:
+                        break
+                    captured_at = time.perf_counter()
+                    if frames_shown % args.infer_every == 0:
+                        detections = infer(frame)
+                        if tracker is not None:
+                            tracker.update(detections, captured_at)
+                        inferred_at = time.perf_counter()
+                        stats.tick("infer", inferred_at)
+                        stats.observe("infer", (inferred_at - captured_at) * 1000.0)
+                    shown = detections if tracker is None else tracker.predict(captured_at)
+                    plot_started = time.perf_counter()
+                    preview_frame = render(frame, shown)
+                    rendered_at = time.perf_counter()
+                    stats.observe("capture", (captured_at - frame_started) * 1000.0)
+                    stats.observe("plot", (rendered_at - plot_started) * 1000.0)
+                    stats.observe("total", (rendered_at - frame_started) * 1000.0)
+                    stats.tick("render", rendered_at)
+                else:
+                    preview_frame = pipeline.next_preview()
+                    if preview_frame is None and pipeline.finished:
+                        break
+
+                if preview_frame is not None:
+                    frames_shown += 1
+                if registry.active_name != active_model:
+                    # Cached detections and tracks came from the previous model.
+                    active_model = registry.active_name
+                    for state in (gate, tracker):
+                        if state is not None:
+                            state.reset()
+                if args.headless:
+                    continue
+
+                if preview_frame is not None:
+                    status = [pipeline.stats.overlay_text()] if pipeline is not None else []
+                    if gate is not None:
+                        status.append(gate.describe())
+                    if status:
+                        draw_status(preview_frame, "  ".join(status))
+                    cv2.imshow(window_name, preview_frame)
+                    if args.source == "screen" and not window_placed:
+                        place_preview_window(window_name, preview_frame, region, monitor)
+                        window_placed = True
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord("q"):
+                    break
+                if key == ord("m") and len(registry.names()) > 1 and (swap_thread is None or not swap_thread.is_alive()):
+                    swap_thread = start_model_swap(registry)
+        wall_s = time.perf_counter() - started_at
+        if gate is not None:
+            print(
+                f"Change gate: {gate.counts['skipped']} skipped, {gate.counts['partial']} partial, {gate.counts['full']} full inferences",
+                file=log_stream,
+            )
+        report = build_report(stats, frames_shown, wall_s, args, str(registry.acquire().path), device, backend)
+        print_report(report, args.report)
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2))
+            print(f"Wrote {args.output}", file=log_stream)
     finally:
         if capture is not None:
             capture.release()
-        if screen_capture is not None:
-            screen_capture.close()
-        cv2.destroyAllWindows()
+        if not args.headless:
+            cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
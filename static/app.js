@@ -8,9 +8,11 @@ const confInput = document.getElementById("confInput");
 const confValue = document.getElementById("confValue");
 const imgszSelect = document.getElementById("imgszSelect");
 const fpsSelect = document.getElementById("fpsSelect");
+const transportSelect = document.getElementById("transportSelect");
 const objectsValue = document.getElementById("objectsValue");
 const latencyValue = document.getElementById("latencyValue");
 const throughputValue = document.getElementById("throughputValue");
+const uploadValue = document.getElementById("uploadValue");
 
 const captureCanvas = document.createElement("canvas");
 const captureCtx = captureCanvas.getContext("2d");
@@ -19,6 +21,11 @@ let sharedStream = null;
 let inferenceTimer = null;
 let requestInFlight = false;
 let lastInferenceAt = 0;
+let backoffUntil = 0;
+let inferSocket = null;
+let frameSeq = 0;
+let lastDrawnSeq = 0;
+const pendingFrames = new Map();
 
 function setStatus(message) {
   statusEl.textContent = message;
@@ -33,73 +40,219 @@ function syncCanvasSize() {
   captureCanvas.height = height;
 }
 
-function drawDetections(detections) {
+function detectionCount(payload) {
+  return payload.format === "columnar" ? payload.count : payload.detections.length;
+}
+
+function drawDetections(payload) {
   overlayCtx.clearRect(0, 0, overlayCanvas.width, overlayCanvas.height);
   overlayCtx.lineWidth = 3;
   overlayCtx.font = "600 18px 'Avenir Next', sans-serif";
   overlayCtx.textBaseline = "top";
 
-  detections.forEach((detection) => {
-    const x = detection.x1;
-    const y = detection.y1;
-    const width = detection.x2 - detection.x1;
-    const height = detection.y2 - detection.y1;
-    const label = `${detection.label} ${Math.round(detection.confidence * 100)}%`;
-
-    overlayCtx.strokeStyle = "#f4a261";
-    overlayCtx.fillStyle = "rgba(244, 162, 97, 0.16)";
-    overlayCtx.strokeRect(x, y, width, height);
-    overlayCtx.fillRect(x, y, width, height);
-
-    const textWidth = overlayCtx.measureText(label).width + 16;
-    const textY = Math.max(0, y - 30);
-    overlayCtx.fillStyle = "#162026";
-    overlayCtx.fillRect(x, textY, textWidth, 28);
-    overlayCtx.fillStyle = "#fffaf4";
-    overlayCtx.fillText(label, x + 8, textY + 5);
+  if (payload.format !== "columnar") {
+    payload.detections.forEach((detection) => {
+      drawBox(detection.x1, detection.y1, detection.x2, detection.y2, detection.label, detection.confidence);
+    });
+    return;
+  }
+
+  // Columnar responses carry flat xyxy boxes and parallel score / class id arrays.
+  const { boxes, scores, class_ids: classIds, label_table: labels } = payload;
+  for (let index = 0; index < payload.count; index += 1) {
+    const offset = index * 4;
+    drawBox(boxes[offset], boxes[offset + 1], boxes[offset + 2], boxes[offset + 3], labels[classIds[index]], scores[index]);
+  }
+}
+
+function drawBox(x1, y1, x2, y2, labelName, confidence) {
+  const width = x2 - x1;
+  const height = y2 - y1;
+  const label = `${labelName} ${Math.round(confidence * 100)}%`;
+
+  overlayCtx.strokeStyle = "#f4a261";
+  overlayCtx.fillStyle = "rgba(244, 162, 97, 0.16)";
+  overlayCtx.strokeRect(x1, y1, width, height);
+  overlayCtx.fillRect(x1, y1, width, height);
+
+  const textWidth = overlayCtx.measureText(label).width + 16;
+  const textY = Math.max(0, y1 - 30);
+  overlayCtx.fillStyle = "#162026";
+  overlayCtx.fillRect(x1, textY, textWidth, 28);
+  overlayCtx.fillStyle = "#fffaf4";
+  overlayCtx.fillText(label, x1 + 8, textY + 5);
+}
+
+function captureJpegBlob() {
+  return new Promise((resolve, reject) => {
+    captureCanvas.toBlob(
+      (blob) => (blob ? resolve(blob) : reject(new Error("Frame encoding failed"))),
+      "image/jpeg",
+      0.72,
+    );
+  });
+}
+
+async function buildInferenceRequest() {
+  const { conf, imgsz, format, precision } = currentSettings();
+
+  if (transportSelect.value === "base64") {
+    const body = JSON.stringify({
+      image: captureCanvas.toDataURL("image/jpeg", 0.72),
+      conf,
+      imgsz,
+      format,
+      precision,
+    });
+    return {
+      url: "/api/infer",
+      init: { method: "POST", headers: { "Content-Type": "application/json" }, body },
+      bytes: body.length,
+    };
+  }
+
+  const blob = await captureJpegBlob();
+  const params = new URLSearchParams({ conf: String(conf), imgsz: String(imgsz), format, precision });
+  return {
+    url: `/api/infer/binary?${params}`,
+    init: { method: "POST", headers: { "Content-Type": "application/octet-stream" }, body: blob },
+    bytes: blob.size,
+  };
+}
+
+function currentSettings() {
+  return {
+    conf: Number(confInput.value),
+    imgsz: Number(imgszSelect.value),
+    format: "columnar",
+    precision: "f16",
+  };
+}
+
+function updateStats(objectCount, latency, bytes) {
+  const finishedAt = performance.now();
+  const throughput = lastInferenceAt ? 1000 / (finishedAt - lastInferenceAt) : 0;
+  lastInferenceAt = finishedAt;
+
+  objectsValue.textContent = `${objectCount} objects`;
+  latencyValue.textContent = `${Math.round(latency)} ms`;
+  throughputValue.textContent = `${throughput.toFixed(1)} fps`;
+  uploadValue.textContent = `${(bytes / 1024).toFixed(1)} KB/frame`;
+}
+
+function handleSocketMessage(event) {
+  const payload = JSON.parse(event.data);
+  if (payload.error && payload.retry_after) {
+    setStatus(`${payload.error}. Retrying in ${payload.retry_after}s.`);
+    return;
+  }
+  if (payload.error) {
+    console.error(payload.error);
+    setStatus("The server rejected a frame. Check the browser console for details.");
+    return;
+  }
+  if (payload.seq <= lastDrawnSeq) {
+    return;
+  }
+
+  const sent = pendingFrames.get(payload.seq);
+  for (const seq of pendingFrames.keys()) {
+    if (seq <= payload.seq) {
+      pendingFrames.delete(seq);
+    }
+  }
+  lastDrawnSeq = payload.seq;
+  drawDetections(payload);
+  if (sent) {
+    updateStats(detectionCount(payload), performance.now() - sent.startedAt, sent.bytes);
+  }
+  setStatus(`Streaming over WebSocket. Server skipped ${payload.dropped} stale frames so far.`);
+}
+
+function openInferSocket() {
+  closeInferSocket();
+  const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
+  const params = new URLSearchParams(Object.entries(currentSettings()).map(([key, value]) => [key, String(value)]));
+  inferSocket = new WebSocket(`${protocol}//${window.location.host}/ws/infer?${params}`);
+  inferSocket.addEventListener("message", handleSocketMessage);
+  inferSocket.addEventListener("close", () => {
+    if (sharedStream && transportSelect.value === "websocket") {
+      setStatus("Inference stream closed. Check that the local server is still running.");
+    }
   });
 }
 
+function closeInferSocket() {
+  if (inferSocket) {
+    inferSocket.close();
+    inferSocket = null;
+  }
+  pendingFrames.clear();
+  frameSeq = 0;
+  lastDrawnSeq = 0;
+}
+
+function sendSocketSettings() {
+  if (inferSocket && inferSocket.readyState === WebSocket.OPEN) {
+    inferSocket.send(JSON.stringify(currentSettings()));
+  }
+}
+
+async function sendFrameOverSocket() {
+  // Skip while the previous frame is still leaving the browser; the server keeps only the newest frame anyway.
+  if (!inferSocket || inferSocket.readyState !== WebSocket.OPEN || inferSocket.bufferedAmount > 0) {
+    return;
+  }
+
+  syncCanvasSize();
+  captureCtx.drawImage(overlayVideoEl, 0, 0, captureCanvas.width, captureCanvas.height);
+  const startedAt = performance.now();
+  const blob = await captureJpegBlob();
+
+  frameSeq += 1;
+  const header = new DataView(new ArrayBuffer(4));
+  header.setUint32(0, frameSeq);
+  pendingFrames.set(frameSeq, { startedAt, bytes: blob.size });
+  inferSocket.send(new Blob([header.buffer, blob]));
+}
+
 async function sendFrame() {
-  if (!sharedStream || requestInFlight || overlayVideoEl.readyState < 2) {
+  if (!sharedStream || overlayVideoEl.readyState < 2) {
+    return;
+  }
+  if (transportSelect.value === "websocket") {
+    await sendFrameOverSocket();
+    return;
+  }
+  if (requestInFlight || performance.now() < backoffUntil) {
     return;
   }
 
   requestInFlight = true;
   syncCanvasSize();
   captureCtx.drawImage(overlayVideoEl, 0, 0, captureCanvas.width, captureCanvas.height);
-  const image = captureCanvas.toDataURL("image/jpeg", 0.72);
 
   const startedAt = performance.now();
 
   try {
-    const response = await fetch("/api/infer", {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify({
-        image,
-        conf: Number(confInput.value),
-        imgsz: Number(imgszSelect.value),
-      }),
-    });
+    const request = await buildInferenceRequest();
+    const response = await fetch(request.url, request.init);
+
+    if (response.status === 503) {
+      const retryAfter = Number(response.headers.get("Retry-After") || 1);
+      backoffUntil = performance.now() + retryAfter * 1000;
+      const { detail } = await response.json();
+      setStatus(`${detail}. Pausing uploads for ${retryAfter}s.`);
+      return;
+    }
 
     if (!response.ok) {
       throw new Error(`Inference failed with status ${response.status}`);
     }
 
     const payload = await response.json();
-    drawDetections(payload.detections);
-
-    const finishedAt = performance.now();
-    const latency = finishedAt - startedAt;
-    const throughput = lastInferenceAt ? 1000 / (finishedAt - lastInferenceAt) : 0;
-    lastInferenceAt = finishedAt;
-
-    objectsValue.textContent = `${payload.detections.length} objects`;
-    latencyValue.textContent = `${Math.round(latency)} ms`;
-    throughputValue.textContent = `${throughput.toFixed(1)} fps`;
+    drawDetections(payload);
+    updateStats(detectionCount(payload), performance.now() - startedAt, request.bytes);
     setStatus("Inference is running. Adjust confidence if the boxes feel too noisy.");
   } catch (error) {
     console.error(error);
@@ -111,6 +264,9 @@ async function sendFrame() {
 
 function startInferenceLoop() {
   stopInferenceLoop();
+  if (transportSelect.value === "websocket") {
+    openInferSocket();
+  }
   const intervalMs = 1000 / Number(fpsSelect.value);
   inferenceTimer = window.setInterval(sendFrame, intervalMs);
 }
@@ -120,6 +276,7 @@ function stopInferenceLoop() {
     window.clearInterval(inferenceTimer);
     inferenceTimer = null;
   }
+  closeInferSocket();
 }
 
 function stopSharing() {
@@ -137,6 +294,7 @@ function stopSharing() {
   objectsValue.textContent = "0 objects";
   latencyValue.textContent = "0 ms";
   throughputValue.textContent = "0 fps";
+  uploadValue.textContent = "0 KB/frame";
   setStatus("Stopped. Start a new share when you want to test another video.");
 }
 
@@ -173,15 +331,34 @@ confInput.addEventListener("input", () => {
   confValue.textContent = Number(confInput.value).toFixed(2);
 });
 
+confInput.addEventListener("change", sendSocketSettings);
+imgszSelect.addEventListener("change", sendSocketSettings);
+
 fpsSelect.addEventListener("change", () => {
   if (sharedStream) {
     startInferenceLoop();
   }
 });
 
+transportSelect.addEventListener("change", () => {
+  if (sharedStream) {
+    startInferenceLoop();
+  }
+});
+
 startButton.addEventListener("click", startSharing);
 stopButton.addEventListener("click", stopSharing);
 
 window.addEventListener("resize", syncCanvasSize);
 
 setStatus("Ready. Start by sharing the YouTube tab or browser window.");
+
+// Preselect the imgsz the server picked from its deployment profile, when the page offers it.
+fetch("/health")
+  .then((response) => response.json())
+  .then(({ default_imgsz: defaultImgsz }) => {
+    if ([...imgszSelect.options].some((option) => Number(option.value) === defaultImgsz)) {
+      imgszSelect.value = String(defaultImgsz);
+    }
+  })
+  .catch(() => {});
@@ -0,0 +1,72 @@
+"""Shared setup for tests of the repository-root modules."""
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture
+def frontend_app(monkeypatch, tmp_path):
+    """yolo_frontend_app, imported against a placeholder checkpoint; the lifespan (model load) is not run."""
+    checkpoint = tmp_path / "placeholder.pt"
+    checkpoint.write_bytes(b"weights")
+    monkeypatch.setenv("ARRAKIS_MODEL_PATH", str(checkpoint))
+    return importlib.import_module("yolo_frontend_app")
+
+
+class _Boxes:
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class _Result:
+    def __init__(self, data: np.ndarray) -> None:
+        self.boxes = _Boxes(data)
+
+
+class _BrightRegionModel:
+    """predict stand-in that reports the bounding box of each frame's bright pixels as one class-0 box."""
+
+    names = {0: "person"}
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[int, int]] = []
+
+    def predict(self, frames, conf=0.25, imgsz=640, verbose=False, device=None):
+        frames = [frames] if isinstance(frames, np.ndarray) else frames
+        self.calls.append((len(frames), imgsz))
+        results = []
+        for frame in frames:
+            ys, xs = np.nonzero(frame[:, :, 0])
+            data = np.zeros((0, 6), dtype=np.float32)
+            if len(xs):
+                data = np.array([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1, 0.9, 0]], dtype=np.float32)
+            results.append(_Result(data))
+        return results
+
+
+@pytest.fixture
+def bright_region_model():
+    return _BrightRegionModel()
+
+
+@pytest.fixture
+def stub_frontend(frontend_app, monkeypatch):
+    """frontend_app serving a fresh registry whose checkpoints load as the bright-region stub model.
+
+    Enter `TestClient(stub_frontend.app)` to run the lifespan, which loads and warms the stub.
+    """
+    monkeypatch.setattr(frontend_app, "REGISTRY", frontend_app.build_registry(lambda path: _BrightRegionModel()))
+    monkeypatch.setattr(frontend_app, "READINESS", frontend_app.ModelReadiness())
+    return frontend_app
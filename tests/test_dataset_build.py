@@ -0,0 +1,164 @@
+"""Kaggle dataset build tests: VisDrone conversion, label merging and incremental rebuilds.
+
+Converted and merged labels are compared byte for byte with the original per-line implementations.
+"""
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+from PIL import Image
+
+import kaggle_train_visdrone_yolo26s as trainer
+
+IMAGE_SIZE = (200, 100)
+
+# Ragged rows (8, 9 and 7 fields) whose token total is a multiple of 8, plus rows the converter must drop.
+RAGGED_ANNOTATION = "10,20,30,40,1,4,0,0\n50,60,70,80,1,1,0,0,9\n100,20,300,400,1,6,0\n"
+ANNOTATIONS = {
+    "0000001.txt": RAGGED_ANNOTATION,
+    "0000002.txt": (
+        "684,8,273,116,0,0,0,0\n"  # ignored region
+        "-5,-5,20,20,1,2,0,1\n"  # clipped at the top-left corner
+        "190,90,50,50,1,10,0,0,\n"  # clipped at the bottom-right corner, trailing comma
+        "10,10,5,5,1,11,0,0\n"  # "others" class
+        "10,10,0,5,1,3,0,0\n"  # empty box
+        "1,2,3\n"  # truncated row
+    ),
+    "0000003.txt": "",
+}
+
+
+def _serial_yolo_label(text: str, image_width: int, image_height: int) -> str:
+    """The original line-by-line VisDrone-to-YOLO conversion."""
+    dw = 1.0 / image_width
+    dh = 1.0 / image_height
+    yolo_lines: list[str] = []
+    for raw_line in text.splitlines():
+        row = [value.strip() for value in raw_line.strip().split(",")]
+        if len(row) < 6 or row[4] == "0":
+            continue
+        x, y, w, h = (int(float(v)) for v in row[:4])
+        class_id = int(float(row[5])) - 1
+        if class_id < 0 or class_id > 9:
+            continue
+        x1 = max(0, x)
+        y1 = max(0, y)
+        x2 = min(image_width, x + w)
+        y2 = min(image_height, y + h)
+        if x2 <= x1 or y2 <= y1:
+            continue
+        w_clamped = x2 - x1
+        h_clamped = y2 - y1
+        yolo_lines.append(
+            f"{class_id} {(x1 + w_clamped / 2) * dw:.6f} {(y1 + h_clamped / 2) * dh:.6f} "
+            f"{w_clamped * dw:.6f} {h_clamped * dh:.6f}"
+        )
+    payload = "\n".join(yolo_lines)
+    return payload + "\n" if payload else payload
+
+
+def _serial_merged_label(text: str) -> str:
+    """The original line-by-line class merge."""
+    merged_lines: list[str] = []
+    for raw_line in text.splitlines():
+        parts = raw_line.strip().split()
+        if not parts:
+            continue
+        mapped_class = trainer.CLASS_MAP.get(int(float(parts[0])))
+        if mapped_class is not None:
+            merged_lines.append(" ".join([str(mapped_class), *parts[1:5]]))
+    payload = "\n".join(merged_lines)
+    return payload + "\n" if payload else payload
+
+
+def _raw_split(root: Path) -> Path:
+    split_dir = root / trainer.RAW_TRAIN_DIR_NAME
+    (split_dir / "images").mkdir(parents=True)
+    (split_dir / "annotations").mkdir()
+    for name, text in ANNOTATIONS.items():
+        Image.new("RGB", IMAGE_SIZE).save(split_dir / "images" / f"{Path(name).stem}.jpg")
+        (split_dir / "annotations" / name).write_text(text, encoding="utf-8")
+    return split_dir
+
+
+def _expected_labels() -> dict[str, str]:
+    return {name: _serial_yolo_label(text, *IMAGE_SIZE) for name, text in ANNOTATIONS.items()}
+
+
+def _read_labels(labels_dir: Path) -> dict[str, str]:
+    return {path.name: path.read_text(encoding="utf-8") for path in sorted(labels_dir.glob("*.txt"))}
+
+
+def test_ragged_rows_are_parsed_row_by_row():
+    rows = trainer.parse_visdrone_annotations(RAGGED_ANNOTATION)
+    assert rows.tolist() == [[10, 20, 30, 40, 1, 4], [50, 60, 70, 80, 1, 1], [100, 20, 300, 400, 1, 6]]
+
+
+def test_converted_labels_match_serial_converter(tmp_path):
+    split_dir = _raw_split(tmp_path / "raw")
+    out_root = tmp_path / "yolo"
+
+    assert trainer.convert_visdrone_det_split(split_dir, "train", out_root, workers=2)
+
+    assert _read_labels(out_root / "labels" / "train") == _expected_labels()
+
+
+def test_zip_conversion_matches_serial_converter(tmp_path):
+    split_dir = _raw_split(tmp_path / "raw")
+    zip_path = tmp_path / trainer.ZIP_NAMES["train"]
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for path in sorted(split_dir.rglob("*")):
+            archive.write(path, path.relative_to(tmp_path / "raw").as_posix())
+    out_root = tmp_path / "yolo"
+
+    assert trainer.convert_visdrone_det_zip(zip_path, "train", out_root)
+
+    assert _read_labels(out_root / "labels" / "train") == _expected_labels()
+    assert sorted(path.name for path in (out_root / "images" / "train").iterdir()) == [
+        f"{Path(name).stem}.jpg" for name in sorted(ANNOTATIONS)
+    ]
+
+
+def test_rebuild_only_converts_changed_annotations(tmp_path):
+    split_dir = _raw_split(tmp_path / "raw")
+    out_root = tmp_path / "yolo"
+    manifest: dict[str, object] = {}
+    trainer.convert_visdrone_det_split(split_dir, "train", out_root, manifest=manifest)
+
+    assert not trainer.convert_visdrone_det_split(split_dir, "train", out_root, manifest=manifest)
+
+    changed = "10,20,30,40,1,5,0,0\n"
+    (split_dir / "annotations" / "0000003.txt").write_text(changed, encoding="utf-8")
+    (split_dir / "annotations" / "0000002.txt").unlink()
+    assert trainer.convert_visdrone_det_split(split_dir, "train", out_root, manifest=manifest)
+    assert _read_labels(out_root / "labels" / "train") == {
+        "0000001.txt": _serial_yolo_label(RAGGED_ANNOTATION, *IMAGE_SIZE),
+        "0000003.txt": _serial_yolo_label(changed, *IMAGE_SIZE),
+    }
+
+
+def test_merged_labels_match_serial_merge(tmp_path):
+    source = tmp_path / "source.txt"
+    text = "0 0.5 0.5 0.1 0.1\n3 0.25 0.75 0.2 0.2 0.9 0.9\n9 0.1 0.1 0.1\n4 0.300000 0.4 0.5 0.6\n11 0.1 0.1 0.1 0.1\n"
+    source.write_text(text, encoding="utf-8")
+    destination = tmp_path / "merged" / "source.txt"
+
+    trainer.merge_label_file(source, destination)
+
+    # The truncated class-9 row is dropped rather than written with a missing coordinate.
+    assert destination.read_text(encoding="utf-8") == _serial_merged_label(text.replace("9 0.1 0.1 0.1\n", ""))
+
+
+def test_manifest_from_before_the_digest_rename_is_rebuilt(tmp_path):
+    split_dir = _raw_split(tmp_path / "raw")
+    out_root = tmp_path / "yolo"
+    manifest: dict[str, object] = {}
+    trainer.convert_visdrone_det_split(split_dir, "train", out_root, manifest=manifest)
+    # Entries used to record the content hash under "sha256".
+    for entry in manifest["train"]["files"].values():
+        entry["sha256"] = entry.pop("digest").removeprefix("sha256:")
+
+    assert trainer.convert_visdrone_det_split(split_dir, "train", out_root, manifest=manifest)
+    assert all("digest" in entry for entry in manifest["train"]["files"].values())
+    assert _read_labels(out_root / "labels" / "train") == _expected_labels()
@@ -0,0 +1,34 @@
+"""deployment_profile tests: the Pareto front and operating-point choice."""
+from __future__ import annotations
+
+from deployment_profile import OperatingPoint, choose_operating_point, pareto_front
+
+
+def _operating_point(backend: str, imgsz: int, mean_ms: float, map50_95: float, tile_size: int = 0) -> OperatingPoint:
+    return OperatingPoint(
+        backend=backend, imgsz=imgsz, tile_size=tile_size, map50=map50_95 * 1.5, map50_95=map50_95, mean_ms=mean_ms, peak_rss_mb=500.0
+    )
+
+
+POINTS = [
+    _operating_point("torch", 512, 40.0, 0.20),
+    _operating_point("torch", 640, 60.0, 0.24),
+    _operating_point("torch", 768, 90.0, 0.23),
+    _operating_point("torch", 960, 140.0, 0.28),
+    _operating_point("torch", 960, 400.0, 0.33, tile_size=640),
+    _operating_point("openvino", 960, 70.0, 0.27),
+]
+
+
+def test_pareto_front_drops_dominated_points():
+    front = pareto_front(point for point in POINTS if point.backend == "torch")
+    assert [(point.imgsz, point.tile_size) for point in front] == [(512, 0), (640, 0), (960, 0), (960, 640)]
+
+
+def test_choice_is_the_most_accurate_point_within_budget():
+    assert choose_operating_point(POINTS, 100.0, "torch", tile_sizes={0}).imgsz == 640
+    assert choose_operating_point(POINTS, 100.0, "openvino").imgsz == 960
+    assert choose_operating_point(POINTS, None, "torch").tiled
+    # Nothing fits: fall back to the fastest point rather than none.
+    assert choose_operating_point(POINTS, 10.0, "torch").imgsz == 512
+    assert choose_operating_point(POINTS, 100.0, "onnx") is None
@@ -0,0 +1,95 @@
+"""/health and readiness tests: the default imgsz from the deployment profile and gating until warmup ends."""
+from __future__ import annotations
+
+import base64
+import importlib
+import json
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from deployment_profile import PROFILE_ENV_VAR, PROFILE_VERSION
+
+
+@pytest.fixture
+def reload_frontend(frontend_app, monkeypatch):
+    """Re-import the app under the test's environment, then again without a profile afterwards."""
+    yield lambda: importlib.reload(frontend_app)
+    monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+    monkeypatch.delenv("ARRAKIS_PROFILE_BUDGET_MS", raising=False)
+    importlib.reload(frontend_app)
+
+
+@pytest.mark.parametrize(
+    ("profile", "budget"),
+    [
+        (None, "100"),
+        ({"version": PROFILE_VERSION - 1, "results": []}, None),
+        ({"version": PROFILE_VERSION}, None),
+        ("not json", None),
+        ({"version": PROFILE_VERSION, "results": []}, "fast"),
+    ],
+    ids=["missing", "stale", "no-results", "bad-json", "bad-budget"],
+)
+def test_unusable_profile_falls_back_to_default_imgsz(reload_frontend, monkeypatch, tmp_path, profile, budget):
+    path = tmp_path / "pareto_profile.json"
+    if profile is not None:
+        path.write_text(profile if isinstance(profile, str) else json.dumps(profile), encoding="utf-8")
+    monkeypatch.setenv(PROFILE_ENV_VAR, str(path))
+    if budget is not None:
+        monkeypatch.setenv("ARRAKIS_PROFILE_BUDGET_MS", budget)
+
+    frontend_app = reload_frontend()
+
+    assert TestClient(frontend_app.app).get("/health").json()["default_imgsz"] == 640
+
+
+def _requests(client, jpeg: bytes) -> dict[str, object]:
+    data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode()
+    return {
+        "/api/infer": client.post("/api/infer", json={"image": data_url}),
+        "/api/infer/binary": client.post("/api/infer/binary", content=jpeg, headers={"Content-Type": "application/octet-stream"}),
+    }
+
+
+def _stream(client, jpeg: bytes) -> dict[str, object]:
+    with client.websocket_connect("/ws/infer") as websocket:
+        websocket.send_bytes(struct.pack(">I", 1) + jpeg)
+        return websocket.receive_json()
+
+
+def test_inference_is_rejected_until_warmup_finishes(stub_frontend, monkeypatch):
+    warmed = threading.Event()
+    warm_model = stub_frontend.warm_model
+
+    def blocked_warm_model(entry):
+        assert warmed.wait(5.0)
+        return warm_model(entry)
+
+    monkeypatch.setattr(stub_frontend, "warm_model", blocked_warm_model)
+    jpeg = cv2.imencode(".jpg", np.zeros((64, 64, 3), dtype=np.uint8))[1].tobytes()
+
+    with TestClient(stub_frontend.app) as client:
+        for response in _requests(client, jpeg).values():
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "1"
+        message = _stream(client, jpeg)
+        assert message["error"].startswith("Model is not ready")
+        assert (message["seq"], message["retry_after"]) == (1, 1)
+        assert client.get("/health").json()["status"] != "ok"
+
+        warmed.set()
+        deadline = time.monotonic() + 5.0
+        while client.get("/health").json()["status"] != "ok":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        for response in _requests(client, jpeg).values():
+            assert response.status_code == 200
+        message = _stream(client, jpeg)
+        assert (message["seq"], message["detections"]) == (1, [])
@@ -0,0 +1,84 @@
+"""/api/infer and /api/infer/binary tests: upload encodings and request handling off the event loop."""
+from __future__ import annotations
+
+import base64
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+
+def test_data_url_is_decoded_off_the_event_loop(frontend_app, monkeypatch):
+    threads: dict[str, int] = {}
+    decode_data_url = frontend_app.decode_data_url
+
+    def recording_decode(image_data: str) -> bytes:
+        threads["decode"] = threading.get_ident()
+        return decode_data_url(image_data)
+
+    async def recording_inference(image_bytes, *args):
+        threads["event_loop"] = threading.get_ident()
+        assert image_bytes == b"jpeg-bytes"
+        raise HTTPException(status_code=503, detail="not ready")
+
+    monkeypatch.setattr(frontend_app, "decode_data_url", recording_decode)
+    monkeypatch.setattr(frontend_app, "run_inference", recording_inference)
+    image = "data:image/jpeg;base64," + base64.b64encode(b"jpeg-bytes").decode()
+
+    response = TestClient(frontend_app.app).post("/api/infer", json={"image": image})
+
+    assert response.status_code == 503
+    assert threads["decode"] != threads["event_loop"]
+
+
+def _bright_square_jpeg() -> bytes:
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    image[40:120, 100:200] = 255
+    return cv2.imencode(".jpg", image)[1].tobytes()
+
+
+@pytest.fixture
+def client(stub_frontend):
+    with TestClient(stub_frontend.app) as client:
+        deadline = time.monotonic() + 5.0
+        while not stub_frontend.READINESS.ready:
+            assert time.monotonic() < deadline, stub_frontend.READINESS.error
+            time.sleep(0.01)
+        yield client
+
+
+def _detections(response) -> list[dict[str, object]]:
+    assert response.status_code == 200, response.text
+    return response.json()["detections"]
+
+
+def test_upload_encodings_give_the_same_detections(client):
+    jpeg = _bright_square_jpeg()
+    params = {"conf": 0.25, "imgsz": 640}
+    data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode()
+
+    expected = _detections(client.post("/api/infer", json={"image": data_url, **params}))
+    raw = client.post("/api/infer/binary", params=params, content=jpeg, headers={"Content-Type": "application/octet-stream"})
+    multipart = client.post("/api/infer/binary", params=params, files={"image": ("frame.jpg", jpeg, "image/jpeg")})
+
+    assert len(expected) == 1 and expected[0]["label"] == "person"
+    assert _detections(raw) == expected
+    assert _detections(multipart) == expected
+
+
+def test_multipart_upload_without_an_image_field_is_rejected(client):
+    response = client.post("/api/infer/binary", files={"frame": ("frame.jpg", _bright_square_jpeg(), "image/jpeg")})
+
+    assert response.status_code == 400
+    assert "'image'" in response.json()["detail"]
+
+
+def test_empty_upload_is_rejected(client):
+    response = client.post("/api/infer/binary", content=b"", headers={"Content-Type": "application/octet-stream"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Empty image payload"
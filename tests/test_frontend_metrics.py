@@ -0,0 +1,15 @@
+"""/metrics tests: scheduler job totals are exported as a Prometheus counter."""
+from __future__ import annotations
+
+
+def test_scheduler_jobs_are_a_counter(frontend_app, monkeypatch):
+    stats = {**frontend_app.SCHEDULER.stats(), "submitted": 12, "rejected": 3, "failed": 1, "cancelled": 2}
+    monkeypatch.setattr(frontend_app.SCHEDULER, "stats", lambda: stats)
+
+    frontend_app.refresh_runtime_metrics()
+    text = frontend_app.METRICS.render()
+
+    assert "# TYPE arrakis_scheduler_jobs_total counter" in text
+    assert 'arrakis_scheduler_jobs_total{result="submitted"} 12.0' in text
+    assert 'arrakis_scheduler_jobs_total{result="rejected"} 3.0' in text
+    assert "arrakis_scheduler_jobs{" not in text
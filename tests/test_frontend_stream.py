@@ -0,0 +1,34 @@
+"""/ws/infer tests: settings updates and per-frame errors that must not end the stream."""
+from __future__ import annotations
+
+import struct
+
+from fastapi.testclient import TestClient
+
+
+def _frame(seq: int) -> bytes:
+    return struct.pack(">I", seq) + b"jpeg"
+
+
+def test_non_object_settings_are_rejected(frontend_app):
+    with TestClient(frontend_app.app).websocket_connect("/ws/infer") as websocket:
+        for text in ("5", "[]", "not json"):
+            websocket.send_text(text)
+            assert websocket.receive_json()["error"].startswith("Invalid stream settings")
+
+
+def test_inference_failures_are_reported_per_frame(frontend_app, monkeypatch):
+    async def failing_inference(*args, **kwargs):
+        raise RuntimeError("predictor crashed")
+
+    monkeypatch.setattr(frontend_app, "run_inference", failing_inference)
+    with TestClient(frontend_app.app).websocket_connect("/ws/infer") as websocket:
+        websocket.send_bytes(_frame(7))
+        assert websocket.receive_json() == {
+            "seq": 7,
+            "error": "Inference failed: RuntimeError: predictor crashed",
+            "dropped": 0,
+        }
+        websocket.send_text('{"conf": 0.5}')
+        websocket.send_bytes(_frame(8))
+        assert websocket.receive_json()["seq"] == 8
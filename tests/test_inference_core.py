@@ -0,0 +1,181 @@
+"""inference_core tests: reduced-scale JPEG decoding, merging tiled detections and columnar responses."""
+from __future__ import annotations
+
+import json
+
+import cv2
+import msgpack
+import numpy as np
+import pytest
+
+from inference_core import (
+    U16_SCALE,
+    DecodedFrame,
+    Detections,
+    TileSettings,
+    decode_image,
+    jpeg_size,
+    label_table,
+    nms_detections,
+    predict_tiled,
+    reduced_decode_factor,
+    tile_origins,
+)
+
+
+def _jpeg(width: int, height: int, progressive: bool = False) -> bytes:
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[: height // 2, : width // 2] = 255
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_PROGRESSIVE, int(progressive)])
+    assert ok
+    return encoded.tobytes()
+
+
+@pytest.mark.parametrize("progressive", [False, True], ids=["baseline", "progressive"])
+def test_jpeg_size_reads_the_sof_header(progressive):
+    assert jpeg_size(_jpeg(1280, 720, progressive)) == (1280, 720)
+
+
+def test_jpeg_size_is_none_for_other_or_truncated_input():
+    ok, png = cv2.imencode(".png", np.zeros((8, 8, 3), dtype=np.uint8))
+    assert ok
+    assert jpeg_size(png.tobytes()) is None
+    assert jpeg_size(_jpeg(1280, 720)[:20]) is None
+    assert jpeg_size(b"") is None
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "imgsz", "factor"),
+    [
+        (1280, 720, 640, 2),
+        (1280, 720, 641, 1),
+        (720, 1280, 640, 2),
+        (2560, 1440, 640, 4),
+        (5120, 2880, 640, 8),
+        (5119, 2880, 640, 4),
+        (640, 480, 640, 1),
+    ],
+)
+def test_reduced_decode_factor_keeps_the_long_side_at_imgsz(width, height, imgsz, factor):
+    assert reduced_decode_factor(width, height, imgsz) == factor
+
+
+def test_reduced_decode_keeps_original_dimensions():
+    frame = decode_image(_jpeg(2560, 1440), imgsz=640)
+
+    assert frame.image.shape[:2] == (360, 640)
+    assert (frame.width, frame.height) == (2560, 1440)
+    assert (frame.scale_x, frame.scale_y) == (4.0, 4.0)
+    assert decode_image(_jpeg(2560, 1440)).image.shape[:2] == (1440, 2560)
+
+
+def test_boxes_from_a_reduced_decode_map_back_to_the_original_frame(frontend_app):
+    frame = decode_image(_jpeg(2560, 1440), imgsz=640)
+    # The white quadrant as the model sees it in the 640x360 decode.
+    detections = Detections(
+        boxes=np.array([[0.0, 0.0, 320.0, 180.0]], dtype=np.float32),
+        scores=np.array([0.9], dtype=np.float32),
+        class_ids=np.array([0], dtype=np.int32),
+        names=label_table({0: "person"}),
+    )
+
+    response = frontend_app.format_detections(frame, detections, 0.25, None)
+
+    assert (response["width"], response["height"]) == (2560, 1440)
+    box = response["detections"][0]
+    assert (box["x1"], box["y1"], box["x2"], box["y2"]) == (0.0, 0.0, 1280.0, 720.0)
+
+
+def test_ios_merge_drops_box_cut_by_tile_edge():
+    detections = Detections(
+        boxes=np.array([[300.0, 10.0, 340.0, 50.0], [300.0, 10.0, 320.0, 50.0]], dtype=np.float32),
+        scores=np.array([0.9, 0.6], dtype=np.float32),
+        class_ids=np.array([0, 0], dtype=np.int32),
+    )
+
+    assert len(nms_detections(detections, 0.6)) == 2
+    assert nms_detections(detections, 0.6, metric="ios").boxes.tolist() == [[300.0, 10.0, 340.0, 50.0]]
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "size", "overlap", "origins"),
+    [
+        (300, 200, 640, 0.2, [(0, 0)]),
+        (1280, 640, 640, 0.5, [(0, 0), (320, 0), (640, 0)]),
+        (1000, 700, 640, 0.2, [(0, 0), (360, 0), (0, 60), (360, 60)]),
+    ],
+    ids=["smaller-than-tile", "exact-multiple", "ragged-remainder"],
+)
+def test_tile_origins_cover_the_frame(width, height, size, overlap, origins):
+    assert tile_origins(width, height, size, overlap) == origins
+    if width >= size and height >= size:
+        assert max(x for x, _ in origins) + size == width
+        assert max(y for _, y in origins) + size == height
+
+
+def test_tiled_boxes_are_translated_and_merged_across_overlaps(bright_region_model):
+    frame = np.zeros((400, 1000, 3), dtype=np.uint8)
+    # Inside both the x=0 and the x=200 tile (400 px tiles, 200 px stride).
+    frame[100:140, 350:390] = 255
+    model = bright_region_model
+
+    (detections,) = predict_tiled(model, [frame], 0.25, 640, TileSettings(size=400, overlap=0.5, full_frame=False))
+
+    assert model.calls == [(4, 400)]
+    assert detections.boxes.tolist() == [[350.0, 100.0, 390.0, 140.0]]
+    assert detections.labels().tolist() == ["person"]
+
+
+COLUMNAR_FRAME = DecodedFrame(image=np.zeros((720, 1280, 3), dtype=np.uint8), width=1280, height=720)
+COLUMNAR_DETECTIONS = Detections(
+    boxes=np.array([[10.3, 20.7, 500.2, 700.9], [1000.1, 5.5, 1279.0, 719.0], [0.0, 0.0, 1.4, 2.6]], dtype=np.float32),
+    scores=np.array([0.91, 0.4, 0.257], dtype=np.float32),
+    class_ids=np.array([2, 0, 2], dtype=np.int32),
+    names=label_table({0: "person", 1: "car", 2: "truck"}),
+)
+
+
+def _columnar_boxes(body: dict[str, object]) -> tuple[np.ndarray, np.ndarray]:
+    """Pixel boxes and scores the way a client reads a columnar body."""
+    boxes = np.asarray(body["boxes"], dtype=np.float64).reshape(-1, 4)
+    scores = np.asarray(body["scores"], dtype=np.float64)
+    if body["precision"] == "u16":
+        size = [body["width"], body["height"], body["width"], body["height"]]
+        return boxes / U16_SCALE * size, scores / U16_SCALE
+    return boxes, scores
+
+
+def _render(frontend_app, options):
+    return frontend_app.render_response(frontend_app.format_detections(COLUMNAR_FRAME, COLUMNAR_DETECTIONS, 0.25, options), options)
+
+
+@pytest.mark.parametrize("precision", ["f32", "f16", "u16"])
+def test_columnar_json_round_trip(frontend_app, precision):
+    options = frontend_app.ResponseOptions(format="columnar", precision=precision)
+    body = json.loads(_render(frontend_app, options).body)
+    rows = frontend_app.format_detections(COLUMNAR_FRAME, COLUMNAR_DETECTIONS, 0.25, None)["detections"]
+
+    assert body["count"] == len(rows) == 3
+    # static/app.js indexes these arrays directly, so they must be flat lists of plain numbers.
+    assert all(type(value) in (int, float) for value in body["boxes"] + body["scores"] + body["class_ids"])
+    boxes, scores = _columnar_boxes(body)
+    np.testing.assert_allclose(boxes, COLUMNAR_DETECTIONS.boxes, atol=1.0 if precision != "f32" else 1e-4)
+    np.testing.assert_allclose(scores, COLUMNAR_DETECTIONS.scores, atol=1e-3 if precision != "f32" else 1e-6)
+    assert [body["label_table"][str(class_id)] for class_id in body["class_ids"]] == [row["label"] for row in rows]
+
+
+@pytest.mark.parametrize("precision", ["f32", "f16", "u16"])
+def test_columnar_msgpack_arrays_match_json_lists(frontend_app, precision):
+    json_options = frontend_app.ResponseOptions(format="columnar", precision=precision)
+    binary_options = frontend_app.ResponseOptions(format="columnar", precision=precision, binary=True)
+    expected = json.loads(_render(frontend_app, json_options).body)
+
+    response = _render(frontend_app, binary_options)
+    body = msgpack.unpackb(response.body)
+
+    assert response.media_type == frontend_app.MSGPACK_MEDIA_TYPE
+    box_dtype = {"f32": "<f4", "f16": "<f2", "u16": "<u2"}[precision]
+    assert np.frombuffer(body["boxes"], dtype=box_dtype).tolist() == expected["boxes"]
+    assert np.frombuffer(body["scores"], dtype=box_dtype).tolist() == expected["scores"]
+    assert np.frombuffer(body["class_ids"], dtype="<u2").tolist() == expected["class_ids"]
+    assert body["label_table"] == expected["label_table"]
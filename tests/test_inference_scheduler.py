@@ -0,0 +1,147 @@
+"""InferenceScheduler tests: batching, load shedding and cancelled jobs."""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from inference_scheduler import InferenceScheduler, SchedulerSaturated, SchedulerSettings
+
+TIMEOUT_S = 5.0
+
+
+class _BlockingModel:
+    """predict_batch stand-in that holds the worker until released, recording each batch."""
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.batches: list[list[bytes]] = []
+
+    def __call__(self, frames, conf, imgsz, model, tiling):
+        self.batches.append(list(frames))
+        self.started.set()
+        assert self.release.wait(TIMEOUT_S)
+        return [f"result:{frame.decode()}" for frame in frames]
+
+
+def _scheduler(model, **settings) -> InferenceScheduler:
+    defaults = {"window_ms": 0.0, "max_batch_size": 4, "workers": 1, "queue_depth": 4}
+    scheduler = InferenceScheduler(
+        decode=lambda image_bytes, imgsz: image_bytes,
+        predict_batch=model,
+        postprocess=lambda frame, result, conf, options: result,
+        settings=SchedulerSettings(**{**defaults, **settings}),
+    )
+    scheduler.start()
+    return scheduler
+
+
+def test_groups_waiting_jobs_into_one_batch():
+    model = _BlockingModel()
+    model.release.set()
+    scheduler = _scheduler(model, window_ms=200.0, max_batch_size=3)
+    try:
+        futures = [scheduler.submit(f"{index}".encode(), 0.25, 640, "best") for index in range(3)]
+        assert [future.result(TIMEOUT_S) for future in futures] == ["result:0", "result:1", "result:2"]
+        assert model.batches == [[b"0", b"1", b"2"]]
+        assert scheduler.stats()["batch_size_counts"] == {3: 1}
+    finally:
+        scheduler.stop()
+
+
+def test_sheds_load_when_queue_is_full():
+    model = _BlockingModel()
+    scheduler = _scheduler(model, queue_depth=1)
+    try:
+        running = scheduler.submit(b"a", 0.25, 640, "best")
+        assert model.started.wait(TIMEOUT_S)
+        queued = scheduler.submit(b"b", 0.25, 640, "best")
+
+        with pytest.raises(SchedulerSaturated) as excinfo:
+            scheduler.submit(b"c", 0.25, 640, "best")
+        assert excinfo.value.retry_after_s >= 1
+
+        model.release.set()
+        assert running.result(TIMEOUT_S) == "result:a"
+        assert queued.result(TIMEOUT_S) == "result:b"
+        assert scheduler.stats()["rejected"] == 1
+    finally:
+        scheduler.stop()
+
+
+def test_job_cancelled_while_queued_is_skipped_and_worker_survives():
+    model = _BlockingModel()
+    scheduler = _scheduler(model)
+    try:
+        running = scheduler.submit(b"a", 0.25, 640, "best")
+        assert model.started.wait(TIMEOUT_S)
+        abandoned = scheduler.submit(b"b", 0.25, 640, "best")
+        assert abandoned.cancel()
+
+        model.release.set()
+        assert running.result(TIMEOUT_S) == "result:a"
+        assert scheduler.submit(b"c", 0.25, 640, "best").result(TIMEOUT_S) == "result:c"
+        assert [b"b"] not in model.batches
+        assert scheduler.stats()["cancelled"] == 1
+    finally:
+        scheduler.stop()
+
+
+def test_client_cancelling_in_flight_job_does_not_kill_worker():
+    model = _BlockingModel()
+    scheduler = _scheduler(model)
+
+    async def disconnect_mid_inference() -> None:
+        # What the /ws/infer handler does when its client goes away: cancel the awaited wrapper.
+        task = asyncio.ensure_future(asyncio.wrap_future(scheduler.submit(b"a", 0.25, 640, "best")))
+        await asyncio.get_running_loop().run_in_executor(None, model.started.wait, TIMEOUT_S)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    try:
+        asyncio.run(disconnect_mid_inference())
+        model.release.set()
+        assert scheduler.submit(b"b", 0.25, 640, "best").result(TIMEOUT_S) == "result:b"
+        assert all(thread.is_alive() for thread in scheduler._threads)
+    finally:
+        scheduler.stop()
+
+
+def test_predict_failure_fails_the_group_only():
+    calls = []
+
+    def flaky(frames, conf, imgsz, model, tiling):
+        calls.append(frames)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return list(frames)
+
+    scheduler = _scheduler(flaky)
+    try:
+        with pytest.raises(RuntimeError, match="boom"):
+            scheduler.submit(b"a", 0.25, 640, "best").result(TIMEOUT_S)
+        assert scheduler.submit(b"b", 0.25, 640, "best").result(TIMEOUT_S) == b"b"
+        assert scheduler.stats()["failed"] == 1
+    finally:
+        scheduler.stop()
+
+
+def test_stop_fails_waiting_jobs():
+    model = _BlockingModel()
+    scheduler = _scheduler(model)
+    scheduler.submit(b"a", 0.25, 640, "best")
+    assert model.started.wait(TIMEOUT_S)
+    waiting = scheduler.submit(b"b", 0.25, 640, "best")
+    cancelled = scheduler.submit(b"c", 0.25, 640, "best")
+    cancelled.cancel()
+
+    # Release the running batch only after stop() has drained the queue.
+    threading.Timer(0.2, model.release.set).start()
+    scheduler.stop()
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        waiting.result(TIMEOUT_S)
+    assert cancelled.cancelled()
@@ -0,0 +1,93 @@
+"""ModelRegistry tests: LRU eviction around acquire, the active model and registerable directories."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from model_registry import ModelRegistry
+
+
+class _RecordingLoader:
+    """Loader stand-in that records every load and how many models were resident at the time."""
+
+    def __init__(self) -> None:
+        self.registry: ModelRegistry | None = None
+        self.loads: list[str] = []
+        self.resident_at_load: list[int] = []
+
+    def __call__(self, path: Path) -> str:
+        self.loads.append(path.stem)
+        self.resident_at_load.append(len(self.registry.stats()["loaded"]))
+        return f"model:{path.stem}"
+
+
+def _registry(tmp_path: Path, names: list[str], max_loaded: int) -> tuple[ModelRegistry, _RecordingLoader]:
+    paths = {}
+    for name in names:
+        paths[name] = tmp_path / f"{name}.pt"
+        paths[name].write_bytes(b"weights")
+    loader = _RecordingLoader()
+    registry = ModelRegistry(loader, names[0], paths, max_loaded=max_loaded)
+    loader.registry = registry
+    return registry, loader
+
+
+def test_acquire_keeps_the_model_it_just_loaded(tmp_path):
+    registry, loader = _registry(tmp_path, ["active", "candidate"], max_loaded=1)
+    registry.acquire("active")
+    entry = registry.acquire("candidate")
+    assert entry.model == "model:candidate"
+    assert "candidate" in registry.stats()["loaded"]
+    registry.acquire("candidate")
+    assert loader.loads == ["active", "candidate"]
+
+
+def test_least_recently_used_model_is_evicted_before_the_next_load(tmp_path):
+    registry, loader = _registry(tmp_path, ["active", "a", "b"], max_loaded=2)
+    registry.acquire("active")
+    registry.acquire("a")
+    registry.acquire("b")
+    stats = registry.stats()
+    assert stats["lru_order"] == ["active", "b"]
+    assert stats["evictions"] == 1
+    # "a" was dropped before "b" loaded, so no more than max_loaded models were ever resident.
+    assert max(loader.resident_at_load) <= 1
+
+
+def test_active_model_is_never_evicted(tmp_path):
+    registry, _ = _registry(tmp_path, ["active", "a", "b"], max_loaded=1)
+    registry.acquire("active")
+    registry.acquire("a")
+    registry.acquire("b")
+    assert registry.stats()["lru_order"] == ["active", "b"]
+    with pytest.raises(ValueError):
+        registry.evict("active")
+
+
+def test_activate_swaps_and_evicts_the_previous_model(tmp_path):
+    registry, _ = _registry(tmp_path, ["active", "candidate"], max_loaded=1)
+    registry.acquire("active")
+    registry.activate("candidate")
+    stats = registry.stats()
+    assert stats["active"] == "candidate"
+    assert stats["lru_order"] == ["candidate"]
+    assert stats["swaps"] == 1
+
+
+def test_register_rejects_paths_outside_allowed_dirs(tmp_path):
+    registry, _ = _registry(tmp_path, ["active"], max_loaded=1)
+    allowed = tmp_path / "models"
+    allowed.mkdir()
+    (allowed / "candidate.pt").write_bytes(b"weights")
+    outside = tmp_path / "outside.pt"
+    outside.write_bytes(b"weights")
+
+    with pytest.raises(PermissionError):
+        registry.register("outside", outside, allowed_dirs=[allowed])
+    with pytest.raises(PermissionError):
+        registry.register("escape", allowed / ".." / "outside.pt", allowed_dirs=[allowed])
+    with pytest.raises(PermissionError):
+        registry.register("candidate", allowed / "candidate.pt", allowed_dirs=[])
+    assert registry.register("candidate", allowed / "candidate.pt", allowed_dirs=[allowed]) == (allowed / "candidate.pt").resolve()
+    assert "candidate" in registry.names()
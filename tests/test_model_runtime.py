@@ -0,0 +1,43 @@
+"""model_runtime tests: export cache keys shared by the frontend and the flight detector."""
+from __future__ import annotations
+
+from model_runtime import exported_model_path
+
+
+def test_export_cache_is_keyed_by_checkpoint_contents(tmp_path):
+    checkpoint = tmp_path / "best.pt"
+    checkpoint.write_bytes(b"weights-v1")
+    first = exported_model_path(checkpoint, "onnx")
+    assert first == exported_model_path(checkpoint, "onnx")
+    assert first.parent == tmp_path / ".arrakis_exports"
+    assert first.suffix == ".onnx"
+    assert exported_model_path(checkpoint, "openvino").name.endswith("_openvino_model")
+
+    checkpoint.write_bytes(b"weights-v2")
+    assert exported_model_path(checkpoint, "onnx") != first
+
+
+def _calibration_dataset(root, val_images: list[str]):
+    (root / "images" / "val").mkdir(parents=True)
+    for name in val_images:
+        (root / "images" / "val" / name).write_bytes(b"jpeg")
+    data_yaml = root / "data.yaml"
+    data_yaml.write_text(f"path: {root}\ntrain: images/train\nval: images/val\n", encoding="utf-8")
+    return data_yaml
+
+
+def test_int8_cache_follows_the_calibration_dataset(tmp_path):
+    checkpoint = tmp_path / "best.pt"
+    checkpoint.write_bytes(b"weights")
+    data_yaml = _calibration_dataset(tmp_path / "data", ["a.jpg", "b.jpg"])
+    first = exported_model_path(checkpoint, "openvino-int8", data_yaml)
+    assert first == exported_model_path(checkpoint, "openvino-int8", data_yaml)
+    assert first != exported_model_path(checkpoint, "openvino")
+
+    # Re-split at the same path: one val image moves out.
+    (tmp_path / "data" / "images" / "val" / "b.jpg").unlink()
+    resplit = exported_model_path(checkpoint, "openvino-int8", data_yaml)
+    assert resplit != first
+
+    data_yaml.write_text(data_yaml.read_text(encoding="utf-8") + "names: {0: person}\n", encoding="utf-8")
+    assert exported_model_path(checkpoint, "openvino-int8", data_yaml) != resplit
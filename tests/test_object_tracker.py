@@ -0,0 +1,37 @@
+"""BoxTracker tests: track identity, motion extrapolation and track expiry."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from inference_core import Detections
+from object_tracker import BoxTracker
+
+
+def _detections(xs: list[float]) -> Detections:
+    return Detections(
+        boxes=np.array([(x, 0.4, x + 0.1, 0.6) for x in xs], dtype=np.float32).reshape(-1, 4),
+        scores=np.full(len(xs), 0.8, dtype=np.float32),
+        class_ids=np.zeros(len(xs), dtype=np.int32),
+    )
+
+
+def test_tracker_keeps_ids_and_extrapolates_motion():
+    tracker = BoxTracker()
+    for step in range(4):
+        tracker.update(_detections([0.1 + 0.05 * step]), float(step))
+
+    predicted = tracker.predict(3.5)
+
+    assert predicted.track_ids.tolist() == [1]
+    assert predicted.boxes[0, 0] == pytest.approx(0.275, abs=0.01)
+
+
+def test_unmatched_track_is_hidden_then_dropped():
+    tracker = BoxTracker(max_misses=1)
+    tracker.update(_detections([0.1]), 0.0)
+
+    assert len(tracker.update(_detections([]), 1.0)) == 0
+    assert len(tracker) == 1
+    tracker.update(_detections([]), 2.0)
+    assert len(tracker) == 0
@@ -0,0 +1,171 @@
+"""RealtimePipeline and ChangeGate tests with a fake frame source and a fake model."""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from inference_core import Detections
+from realtime_pipeline import ChangeGate, LatestSlot, RealtimePipeline
+
+TIMEOUT_S = 5.0
+
+
+def _frames(count: int) -> list[np.ndarray]:
+    return [np.full((90, 160, 3), index, dtype=np.uint8) for index in range(count)]
+
+
+def _reader(frames: list[np.ndarray]):
+    """A finite source: returns each frame once, then None."""
+
+    @contextmanager
+    def open_reader():
+        remaining = iter(frames)
+        yield lambda: next(remaining, None)
+
+    return open_reader
+
+
+def _detections_for(frame: np.ndarray) -> Detections:
+    """One box whose class id records which frame it was inferred on."""
+    return Detections(
+        boxes=np.array([[0.0, 0.0, 10.0, 10.0]], dtype=np.float32),
+        scores=np.array([0.9], dtype=np.float32),
+        class_ids=np.array([int(frame[0, 0, 0])], dtype=np.int32),
+    )
+
+
+def _slow_infer(frame: np.ndarray) -> Detections:
+    time.sleep(0.05)
+    return _detections_for(frame)
+
+
+def _run(pipeline: RealtimePipeline) -> list[tuple[np.ndarray, Detections]]:
+    """Drive the caller's render loop until the source is exhausted and its last frame shown."""
+    deadline = time.monotonic() + TIMEOUT_S
+    pipeline.start()
+    try:
+        shown = []
+        while True:
+            preview = pipeline.next_preview()
+            if preview is not None:
+                shown.append(preview)
+            elif pipeline.finished:
+                return shown
+            assert time.monotonic() < deadline, "pipeline did not finish"
+    finally:
+        pipeline.stop()
+
+
+def test_pipelined_report_has_the_serial_stages():
+    pipeline = RealtimePipeline(_reader(_frames(3)), _detections_for, lambda image, detections: (image, detections))
+
+    _run(pipeline)
+
+    latency = pipeline.stats.summary()["latency_ms"]
+    assert {"capture", "infer", "plot", "total", "end_to_end"} <= set(latency)
+    assert latency["total"]["max"] >= latency["end_to_end"]["max"] > 0.0
+
+
+def test_latest_slot_overwrites_and_counts_drops():
+    slot = LatestSlot()
+    slot.put("a")
+    slot.put("b")
+
+    assert slot.get_newer(0, TIMEOUT_S) == (2, "b")
+    assert slot.dropped == 1
+
+    slot.put("c")
+    assert slot.latest() == (3, "c")
+    slot.put("d")
+    slot.put("e")
+    assert slot.dropped == 2
+    assert slot.get_newer(5, 0.0) is None
+
+
+def test_latest_slot_close_wakes_waiting_readers():
+    slot = LatestSlot()
+    threading.Timer(0.05, slot.close).start()
+
+    assert slot.get_newer(0, TIMEOUT_S) is None
+    assert slot.closed
+
+
+def test_pipeline_shows_the_final_inference_before_finishing():
+    frames = _frames(5)
+    pipeline = RealtimePipeline(_reader(frames), _slow_infer, lambda image, detections: (image, detections))
+
+    shown = _run(pipeline)
+
+    last_image, last_detections = shown[-1]
+    assert int(last_image[0, 0, 0]) == len(frames) - 1
+    # The last frame is inferred after it was first shown; its boxes must still reach the screen.
+    assert last_detections.class_ids.tolist() == [len(frames) - 1]
+    assert not any(thread.name.startswith("realtime-") for thread in threading.enumerate())
+
+
+class _CountingModel:
+    """Records the shape of every frame it is asked to infer."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[int, int]] = []
+
+    def __call__(self, frame: np.ndarray) -> Detections:
+        self.calls.append(frame.shape[:2])
+        return _detections_for(frame)
+
+
+def _screen(value: int = 0) -> np.ndarray:
+    return np.full((360, 640, 3), value, dtype=np.uint8)
+
+
+def test_change_gate_skips_identical_frames():
+    model = _CountingModel()
+    gate = ChangeGate(model, threshold=2.0)
+
+    first = gate(_screen())
+    assert gate(_screen()) is first
+    assert gate(_screen(1)) is first
+
+    assert model.calls == [(360, 640)]
+    assert gate.counts == {"full": 1, "partial": 0, "skipped": 2}
+
+
+def test_change_gate_reinfers_above_the_threshold():
+    model = _CountingModel()
+    gate = ChangeGate(model, threshold=2.0)
+    gate(_screen())
+
+    assert gate(_screen(50)).class_ids.tolist() == [50]
+    assert gate.counts == {"full": 2, "partial": 0, "skipped": 0}
+
+
+def test_change_gate_reinfers_only_changed_tiles():
+    model = _CountingModel()
+    gate = ChangeGate(model, threshold=2.0, partial=True)
+    gate(_screen())
+    # One 40x40 grid tile (of 16x9) changes; the crop is padded by one tile on each side.
+    frame = _screen()
+    frame[160:200, 320:360] = 255
+
+    detections = gate(frame)
+
+    assert model.calls == [(360, 640), (120, 120)]
+    assert gate.counts == {"full": 1, "partial": 1, "skipped": 0}
+    # The fresh box is translated back to the crop's origin; the old one sat outside the crop and is kept.
+    assert detections.boxes.tolist() == [[0.0, 0.0, 10.0, 10.0], [280.0, 120.0, 290.0, 130.0]]
+    assert gate(frame) is detections
+    assert gate.counts["skipped"] == 1
+
+
+def test_change_gate_falls_back_to_full_inference_for_large_changes():
+    model = _CountingModel()
+    gate = ChangeGate(model, threshold=2.0, partial=True)
+    gate(_screen())
+
+    gate(_screen(255))
+
+    assert model.calls == [(360, 640), (360, 640)]
+    assert gate.counts == {"full": 2, "partial": 0, "skipped": 0}
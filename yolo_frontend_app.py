@@ -1,33 +1,326 @@
+import asyncio
 import base64
+import json
+import os
+import struct
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Literal
 
-import cv2
 import numpy as np
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
-from ultralytics import YOLO
+from starlette.concurrency import run_in_threadpool
 
-from model_runtime import MODEL_ENV_VAR, resolve_device, resolve_model_path
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+from inference_core import (
+    DecodedFrame,
+    Detections,
+    TileSettings,
+    columnar_detections,
+    decode_image,
+    filter_detections,
+    predict_detections,
+    predict_tiled,
+)
+from deployment_profile import choose_operating_point, load_operating_points
+from inference_scheduler import InferenceScheduler, SchedulerSaturated, scheduler_settings_from_env
+from model_registry import LoadedModel, build_registry, registerable_model_dirs
+from metrics import MetricsRegistry
+from model_runtime import MODEL_ENV_VAR, load_inference_model, resolve_backend, resolve_device
 
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
-MODEL_PATH = resolve_model_path()
 DEVICE = resolve_device()
-MODEL = YOLO(str(MODEL_PATH))
+BACKEND = resolve_backend()
+WARMUP_IMGSZ_ENV_VAR = "ARRAKIS_WARMUP_IMGSZ"
+REDUCED_DECODE_ENV_VAR = "ARRAKIS_REDUCED_DECODE"
+REDUCED_DECODE = os.getenv(REDUCED_DECODE_ENV_VAR, "1") != "0"
+DEFAULT_WARMUP_IMGSZ = (512, 640, 768, 960)
+WARMUP_FRAME_SHAPE = (720, 1280, 3)
+# The active model is loaded and warmed in a background thread started from the app lifespan.
+REGISTRY = build_registry(lambda path: load_inference_model(path, BACKEND))
+SATURATED_STREAM_BACKOFF_S = 0.05
+PROFILE_BUDGET_ENV_VAR = "ARRAKIS_PROFILE_BUDGET_MS"
+FALLBACK_IMGSZ = 640
 
-print(f"Loaded frontend model: {MODEL_PATH} on {DEVICE} (override with {MODEL_ENV_VAR})")
 
-app = FastAPI(title="YOLO26s Local Frontend")
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+def default_imgsz_from_profile() -> int:
+    """imgsz of the most accurate untiled point for BACKEND in the deployment profile within ARRAKIS_PROFILE_BUDGET_MS.
+
+    The profile is only a hint, so an unreadable or stale one falls back to FALLBACK_IMGSZ.
+    """
+    try:
+        budget = os.getenv(PROFILE_BUDGET_ENV_VAR)
+        points = load_operating_points()
+        point = choose_operating_point(points, float(budget) if budget else None, BACKEND, tile_sizes=(0,))
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Ignoring unreadable deployment profile: {exc}")
+        return FALLBACK_IMGSZ
+    return point.imgsz if point else FALLBACK_IMGSZ
+
+
+DEFAULT_IMGSZ = default_imgsz_from_profile()
+
+METRICS = MetricsRegistry()
+STAGE_SECONDS = METRICS.histogram(
+    "arrakis_infer_stage_seconds",
+    "Time per frame in each inference stage: base64_decode, imdecode, preprocess, predict, postprocess, serialize.",
+    ("stage",),
+)
+REQUEST_SECONDS = METRICS.histogram("arrakis_infer_request_seconds", "End-to-end inference request latency.", ("endpoint",))
+REQUESTS_TOTAL = METRICS.counter("arrakis_infer_requests_total", "Inference requests by endpoint and status code.", ("endpoint", "status"))
+REQUESTS_IN_FLIGHT = METRICS.gauge("arrakis_infer_requests_in_flight", "Inference requests currently being handled.", ("endpoint",))
+SCHEDULER_QUEUED = METRICS.gauge("arrakis_scheduler_queued", "Jobs waiting for an inference worker.")
+SCHEDULER_IN_FLIGHT = METRICS.gauge("arrakis_scheduler_in_flight", "Jobs currently on an inference worker.")
+SCHEDULER_JOBS = METRICS.counter("arrakis_scheduler_jobs_total", "Scheduler jobs since start by result.", ("result",))
+MODEL_READY = METRICS.gauge("arrakis_model_ready", "1 once the active model is loaded and warm.")
+MODEL_INFO = METRICS.gauge("arrakis_model_info", "Loaded models; the value is 1.", ("name", "path", "backend", "device", "active"))
+MODEL_LOAD_SECONDS = METRICS.gauge("arrakis_model_load_seconds", "Checkpoint load time per loaded model.", ("name",))
+MODEL_WARMUP_SECONDS = METRICS.gauge("arrakis_model_warmup_seconds", "Warmup predict time of the active model per imgsz.", ("imgsz",))
+
+
+@dataclass
+class ModelReadiness:
+    state: str = "loading"
+    load_ms: float | None = None
+    warmup_ms: dict[int, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+
+READINESS = ModelReadiness()
+
+
+ResponseFormat = Literal["objects", "columnar"]
+BoxPrecision = Literal["f32", "f16", "u16"]
+MSGPACK_MEDIA_TYPE = "application/msgpack"
 
 
 class InferenceRequest(BaseModel):
     image: str
     conf: float = Field(default=0.25, ge=0.01, le=1.0)
-    imgsz: int = Field(default=640, ge=64, le=1920)
+    imgsz: int = Field(default=DEFAULT_IMGSZ, ge=64, le=1920)
+    model: str | None = None
+    format: ResponseFormat = "objects"
+    precision: BoxPrecision = "f32"
+    tile_size: int = Field(default=0, ge=0, le=1920)
+    tile_overlap: float = Field(default=0.2, ge=0.0, le=0.9)
+
+
+class StreamSettings(BaseModel):
+    conf: float = Field(default=0.25, ge=0.01, le=1.0)
+    imgsz: int = Field(default=DEFAULT_IMGSZ, ge=64, le=1920)
+    model: str | None = None
+    format: ResponseFormat = "objects"
+    precision: BoxPrecision = "f32"
+    tile_size: int = Field(default=0, ge=0, le=1920)
+    tile_overlap: float = Field(default=0.2, ge=0.0, le=0.9)
+
+
+class RegisterModelRequest(BaseModel):
+    name: str = Field(min_length=1, max_length=64)
+    path: str
+
+
+class ActivateModelRequest(BaseModel):
+    name: str
+
+
+@dataclass(frozen=True)
+class ResponseOptions:
+    format: ResponseFormat = "objects"
+    precision: BoxPrecision = "f32"
+    # Columnar arrays become raw bytes when the body is msgpack-encoded.
+    binary: bool = False
+
+
+@dataclass
+class StreamFrame:
+    seq: int
+    image_bytes: bytes
+    conf: float
+    imgsz: int
+    model: str | None
+    options: ResponseOptions
+    tiling: TileSettings | None = None
+
+
+FRAME_HEADER = struct.Struct(">I")
+
+
+@contextmanager
+def observe_stage(stage: str):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started_at, stage=stage)
+
+
+@contextmanager
+def track_request(endpoint: str):
+    REQUESTS_IN_FLIGHT.inc(endpoint=endpoint)
+    started_at = time.perf_counter()
+    status = 200
+    try:
+        yield
+    except HTTPException as exc:
+        status = exc.status_code
+        raise
+    except Exception:
+        status = 500
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+        REQUESTS_TOTAL.inc(endpoint=endpoint, status=str(status))
+        REQUEST_SECONDS.observe(time.perf_counter() - started_at, endpoint=endpoint)
+
+
+def decode_image_bytes(image_bytes: bytes, imgsz: int | None) -> DecodedFrame:
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail="Empty image payload")
+    with observe_stage("imdecode"):
+        frame = decode_image(image_bytes, imgsz if REDUCED_DECODE else None)
+    if frame is None:
+        raise HTTPException(status_code=400, detail="Could not decode image")
+    return frame
+
+
+def decode_data_url(image_data: str) -> bytes:
+    payload = image_data.split(",", 1)[1] if "," in image_data else image_data
+    try:
+        with observe_stage("base64_decode"):
+            return base64.b64decode(payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid base64 image payload") from exc
+
+
+def tile_settings(tile_size: int, tile_overlap: float) -> TileSettings | None:
+    if tile_size == 0:
+        return None
+    if tile_size < 64:
+        raise HTTPException(status_code=422, detail="tile_size must be 0 (off) or at least 64")
+    return TileSettings(size=tile_size, overlap=tile_overlap)
+
+
+def predict_batch(
+    frames: list[DecodedFrame],
+    conf: float,
+    imgsz: int,
+    model_name: str,
+    tiling: TileSettings | None = None,
+) -> list[Detections]:
+    entry = REGISTRY.acquire(model_name)
+    images = [frame.image for frame in frames]
+    # Scheduler workers overlap decode and postprocessing; each model runs one batch at a time.
+    with entry.lock:
+        if tiling is not None:
+            return predict_tiled(entry.model, images, conf, imgsz, tiling, DEVICE)
+        return predict_detections(entry.model, images, conf, imgsz, DEVICE)
+
+
+def format_detections(frame: DecodedFrame, detections: Detections, conf: float, options: ResponseOptions | None) -> dict[str, object]:
+    width, height = frame.width, frame.height
+    # Batched predicts run at the lowest conf in the batch.
+    detections = filter_detections(detections, conf).rescaled(frame.scale_x, frame.scale_y)
+    if options is not None and options.format == "columnar":
+        return {
+            "width": width,
+            "height": height,
+            **columnar_detections(detections, width, height, options.precision, options.binary),
+        }
+    columns = zip(*detections.boxes.T.tolist(), detections.scores.tolist(), detections.class_ids.tolist(), detections.labels().tolist())
+    return {
+        "width": width,
+        "height": height,
+        "detections": [
+            {"x1": x1, "y1": y1, "x2": x2, "y2": y2, "confidence": score, "class_id": class_id, "label": label}
+            for x1, y1, x2, y2, score, class_id, label in columns
+        ],
+    }
+
+
+def build_response(frame: DecodedFrame, detections: Detections, conf: float, options: ResponseOptions | None) -> dict[str, object]:
+    started_at = time.perf_counter()
+    response = format_detections(frame, detections, conf, options)
+    # Ultralytics reports its own per-image preprocess / forward / NMS split.
+    speed_ms = detections.speed or {}
+    if "preprocess" in speed_ms:
+        STAGE_SECONDS.observe(speed_ms["preprocess"] / 1000.0, stage="preprocess")
+    if "inference" in speed_ms:
+        STAGE_SECONDS.observe(speed_ms["inference"] / 1000.0, stage="predict")
+    postprocess_s = speed_ms.get("postprocess", 0.0) / 1000.0 + time.perf_counter() - started_at
+    STAGE_SECONDS.observe(postprocess_s, stage="postprocess")
+    return response
+
+
+def warmup_imgsz_from_env() -> tuple[int, ...]:
+    raw = os.getenv(WARMUP_IMGSZ_ENV_VAR)
+    if not raw:
+        return DEFAULT_WARMUP_IMGSZ
+    return tuple(int(value) for value in raw.split(",") if value.strip())
+
+
+def warm_model(entry: LoadedModel) -> dict[int, float]:
+    warmup_ms: dict[int, float] = {}
+    dummy_frame = np.zeros(WARMUP_FRAME_SHAPE, dtype=np.uint8)
+    for imgsz in warmup_imgsz_from_env():
+        started_at = time.perf_counter()
+        entry.model.predict(dummy_frame, imgsz=imgsz, verbose=False, device=DEVICE)
+        warmup_ms[imgsz] = (time.perf_counter() - started_at) * 1000.0
+    return warmup_ms
+
+
+def activate_model(name: str) -> LoadedModel:
+    def prepare(entry: LoadedModel) -> None:
+        READINESS.load_ms = entry.load_ms
+        print(f"Loaded frontend model {entry.name}: {entry.path} on {DEVICE} via {BACKEND} (override with {MODEL_ENV_VAR})")
+        READINESS.warmup_ms = warm_model(entry)
+        print(f"Frontend model {entry.name} warm: {READINESS.warmup_ms}")
+
+    return REGISTRY.activate(name, prepare)
+
+
+def load_and_warm_model() -> None:
+    try:
+        READINESS.state = "warming"
+        activate_model(REGISTRY.active_name)
+        READINESS.state = "ready"
+    except Exception as exc:
+        READINESS.state = "failed"
+        READINESS.error = f"{type(exc).__name__}: {exc}"
+        print(f"Frontend model failed to load: {READINESS.error}")
+
+
+SCHEDULER = InferenceScheduler(decode_image_bytes, predict_batch, build_response, scheduler_settings_from_env())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    SCHEDULER.start()
+    threading.Thread(target=load_and_warm_model, name="model-loader", daemon=True).start()
+    try:
+        yield
+    finally:
+        SCHEDULER.stop()
+
+
+app = FastAPI(title="YOLO26s Local Frontend", lifespan=lifespan)
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
 @app.get("/")
@@ -36,54 +329,283 @@ def read_index() -> FileResponse:
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
+def health() -> dict[str, object]:
+    scheduler = SCHEDULER.stats()
+    if not READINESS.ready:
+        status = READINESS.state
+    else:
+        status = "saturated" if scheduler["queued"] >= scheduler["queue_depth"] else "ok"
     return {
-        "status": "ok",
-        "model": str(MODEL_PATH),
+        "status": status,
+        "model": str(REGISTRY.path_for(REGISTRY.active_name)),
         "device": DEVICE,
+        "backend": BACKEND,
+        "default_imgsz": DEFAULT_IMGSZ,
+        "readiness": {
+            "state": READINESS.state,
+            "load_ms": READINESS.load_ms,
+            "warmup_ms": READINESS.warmup_ms,
+            "error": READINESS.error,
+        },
+        "scheduler": scheduler,
+        "models": REGISTRY.stats(),
     }
 
 
-def decode_data_url(image_data: str) -> np.ndarray:
-    payload = image_data.split(",", 1)[1] if "," in image_data else image_data
+def refresh_runtime_metrics() -> None:
+    scheduler = SCHEDULER.stats()
+    SCHEDULER_QUEUED.set(scheduler["queued"])
+    SCHEDULER_IN_FLIGHT.set(scheduler["in_flight"])
+    for result in ("submitted", "rejected", "failed", "cancelled"):
+        SCHEDULER_JOBS.set_total(scheduler[result], result=result)
+
+    MODEL_READY.set(1 if READINESS.ready else 0)
+    models = REGISTRY.stats()
+    MODEL_INFO.clear()
+    MODEL_LOAD_SECONDS.clear()
+    for name, loaded in models["loaded"].items():
+        active = str(name == models["active"]).lower()
+        MODEL_INFO.set(1, name=name, path=loaded["path"], backend=BACKEND, device=DEVICE, active=active)
+        MODEL_LOAD_SECONDS.set(loaded["load_ms"] / 1000.0, name=name)
+    MODEL_WARMUP_SECONDS.clear()
+    for imgsz, warmup_ms in READINESS.warmup_ms.items():
+        MODEL_WARMUP_SECONDS.set(warmup_ms / 1000.0, imgsz=str(imgsz))
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    refresh_runtime_metrics()
+    return Response(METRICS.render(), media_type=MetricsRegistry.content_type)
+
+
+async def read_upload_bytes(request: Request) -> bytes:
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("image")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart upload needs an 'image' file field")
+        return await upload.read()
+    return await request.body()
+
+
+def response_options(request: Request, format: ResponseFormat, precision: BoxPrecision) -> ResponseOptions:
+    accept = request.headers.get("accept", "")
+    binary = MSGPACK_MEDIA_TYPE in accept
+    if binary and msgpack is None:
+        raise HTTPException(status_code=406, detail="msgpack responses need: pip install msgpack")
+    return ResponseOptions(format=format, precision=precision, binary=binary)
+
+
+def render_response(response: dict[str, object], options: ResponseOptions) -> Response:
+    with observe_stage("serialize"):
+        if options.binary:
+            return Response(msgpack.packb(response), media_type=MSGPACK_MEDIA_TYPE)
+        return Response(json.dumps(response, separators=(",", ":")), media_type="application/json")
+
+
+async def run_inference(
+    image_bytes: bytes,
+    conf: float,
+    imgsz: int,
+    model: str | None = None,
+    options: ResponseOptions | None = None,
+    tiling: TileSettings | None = None,
+) -> dict[str, object]:
+    if not READINESS.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model is not ready ({READINESS.state})",
+            headers={"Retry-After": "1"},
+        )
+    # Bind the request to the model that is active now, so a hot swap never splits a batch.
+    model_name = model or REGISTRY.active_name
+    if model_name not in REGISTRY.names():
+        raise HTTPException(status_code=404, detail=f"Unknown model {model_name!r}")
+    try:
+        future = SCHEDULER.submit(image_bytes, conf, imgsz, model_name, options, tiling)
+    except SchedulerSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Inference queue is full, retry later",
+            headers={"Retry-After": str(exc.retry_after_s)},
+        ) from exc
+    response = await asyncio.wrap_future(future)
+    return {**response, "model": model_name}
+
+
+@app.post("/api/infer")
+async def infer(payload: InferenceRequest, request: Request) -> Response:
+    with track_request("infer"):
+        options = response_options(request, payload.format, payload.precision)
+        tiling = tile_settings(payload.tile_size, payload.tile_overlap)
+        # Multi-MB data URLs take milliseconds to decode, so keep them off the event loop.
+        image_bytes = await run_in_threadpool(decode_data_url, payload.image)
+        response = await run_inference(image_bytes, payload.conf, payload.imgsz, payload.model, options, tiling)
+        return render_response(response, options)
+
+
+@app.post("/api/infer/binary")
+async def infer_binary(
+    request: Request,
+    conf: float = Query(default=0.25, ge=0.01, le=1.0),
+    imgsz: int = Query(default=DEFAULT_IMGSZ, ge=64, le=1920),
+    model: str | None = Query(default=None),
+    format: ResponseFormat = Query(default="objects"),
+    precision: BoxPrecision = Query(default="f32"),
+    tile_size: int = Query(default=0, ge=0, le=1920),
+    tile_overlap: float = Query(default=0.2, ge=0.0, le=0.9),
+) -> Response:
+    with track_request("infer_binary"):
+        options = response_options(request, format, precision)
+        tiling = tile_settings(tile_size, tile_overlap)
+        response = await run_inference(await read_upload_bytes(request), conf, imgsz, model, options, tiling)
+        return render_response(response, options)
+
+
+@app.get("/api/models")
+def list_models() -> dict[str, object]:
+    return REGISTRY.stats()
+
+
+@app.post("/api/models")
+def register_model(request: RegisterModelRequest) -> dict[str, object]:
+    # Registered checkpoints are unpickled by torch.load, so only operator-approved directories are accepted.
     try:
-        image_bytes = base64.b64decode(payload)
+        REGISTRY.register(request.name, request.path, allowed_dirs=registerable_model_dirs())
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
     except ValueError as exc:
-        raise HTTPException(status_code=400, detail="Invalid base64 image payload") from exc
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return REGISTRY.stats()
 
-    frame = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
-    if frame is None:
-        raise HTTPException(status_code=400, detail="Could not decode image")
-    return frame
 
+@app.post("/api/models/active")
+async def set_active_model(request: ActivateModelRequest) -> dict[str, object]:
+    if request.name not in REGISTRY.names():
+        raise HTTPException(status_code=404, detail=f"Unknown model {request.name!r}")
+    # The previous model keeps serving until the new one is loaded and warm.
+    try:
+        await asyncio.to_thread(activate_model, request.name)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Could not activate {request.name!r}: {exc}") from exc
+    return REGISTRY.stats()
 
-@app.post("/api/infer")
-def infer(request: InferenceRequest) -> dict[str, object]:
-    frame = decode_data_url(request.image)
-    height, width = frame.shape[:2]
-
-    result = MODEL.predict(frame, conf=request.conf, imgsz=request.imgsz, verbose=False, device=DEVICE)[0]
-    detections: list[dict[str, float | int | str]] = []
-
-    if result.boxes is not None:
-        names = result.names
-        for box in result.boxes:
-            xyxy = box.xyxy[0].tolist()
-            class_id = int(box.cls.item())
-            detections.append(
-                {
-                    "x1": float(xyxy[0]),
-                    "y1": float(xyxy[1]),
-                    "x2": float(xyxy[2]),
-                    "y2": float(xyxy[3]),
-                    "confidence": float(box.conf.item()),
-                    "class_id": class_id,
-                    "label": str(names[class_id]),
-                }
+
+class LatestFrameSlot:
+    """Single-slot mailbox: a newer frame replaces one that has not been picked up yet."""
+
+    def __init__(self) -> None:
+        self._frame: StreamFrame | None = None
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, frame: StreamFrame) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self._ready.set()
+
+    async def take(self) -> StreamFrame:
+        await self._ready.wait()
+        self._ready.clear()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+async def receive_stream_frames(websocket: WebSocket, slot: LatestFrameSlot, settings: StreamSettings) -> None:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        if message.get("text") is not None:
+            try:
+                update = json.loads(message["text"])
+                if not isinstance(update, dict):
+                    raise ValueError("expected a JSON object")
+                settings = StreamSettings.model_validate({**settings.model_dump(), **update})
+            except ValueError as exc:
+                await websocket.send_json({"error": f"Invalid stream settings: {exc}"})
+            continue
+
+        payload = message.get("bytes") or b""
+        if len(payload) <= FRAME_HEADER.size:
+            continue
+        (seq,) = FRAME_HEADER.unpack_from(payload)
+        options = ResponseOptions(format=settings.format, precision=settings.precision)
+        try:
+            tiling = tile_settings(settings.tile_size, settings.tile_overlap)
+        except HTTPException as exc:
+            await websocket.send_json({"seq": seq, "error": exc.detail})
+            continue
+        slot.put(StreamFrame(seq, payload[FRAME_HEADER.size :], settings.conf, settings.imgsz, settings.model, options, tiling))
+
+
+async def process_stream_frames(websocket: WebSocket, slot: LatestFrameSlot) -> None:
+    while True:
+        frame = await slot.take()
+        try:
+            with track_request("ws_infer"):
+                response = await run_inference(frame.image_bytes, frame.conf, frame.imgsz, frame.model, frame.options, frame.tiling)
+        except HTTPException as exc:
+            if exc.status_code == 503 and READINESS.ready:
+                # Shed this frame; the next one the client sends will replace it.
+                slot.dropped += 1
+                await asyncio.sleep(SATURATED_STREAM_BACKOFF_S)
+                continue
+            message = {"seq": frame.seq, "error": exc.detail, "dropped": slot.dropped}
+            if exc.status_code == 503:
+                # Still loading or warming up: tell the client when to retry, as the HTTP endpoints do.
+                message["retry_after"] = int(exc.headers["Retry-After"])
+            await websocket.send_json(message)
+            continue
+        except Exception as exc:
+            # A failed frame is reported like an HTTP error so the stream keeps serving later frames.
+            await websocket.send_json(
+                {"seq": frame.seq, "error": f"Inference failed: {type(exc).__name__}: {exc}", "dropped": slot.dropped}
             )
+            continue
+        with observe_stage("serialize"):
+            message = json.dumps({"seq": frame.seq, "dropped": slot.dropped, **response}, separators=(",", ":"))
+        await websocket.send_text(message)
 
-    return {
-        "width": width,
-        "height": height,
-        "detections": detections,
-    }
+
+@app.websocket("/ws/infer")
+async def websocket_infer(
+    websocket: WebSocket,
+    conf: float = Query(default=0.25, ge=0.01, le=1.0),
+    imgsz: int = Query(default=DEFAULT_IMGSZ, ge=64, le=1920),
+    model: str | None = Query(default=None),
+    format: ResponseFormat = Query(default="objects"),
+    precision: BoxPrecision = Query(default="f32"),
+    tile_size: int = Query(default=0, ge=0, le=1920),
+    tile_overlap: float = Query(default=0.2, ge=0.0, le=0.9),
+) -> None:
+    # Binary messages are a 4-byte big-endian frame sequence number followed by JPEG/PNG bytes.
+    # Text messages are JSON settings updates, e.g. {"conf": 0.4, "imgsz": 960, "format": "columnar"}.
+    await websocket.accept()
+    slot = LatestFrameSlot()
+    settings = StreamSettings(
+        conf=conf,
+        imgsz=imgsz,
+        model=model,
+        format=format,
+        precision=precision,
+        tile_size=tile_size,
+        tile_overlap=tile_overlap,
+    )
+    tasks = [
+        asyncio.create_task(receive_stream_frames(websocket, slot, settings)),
+        asyncio.create_task(process_stream_frames(websocket, slot)),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()